@@ -0,0 +1,73 @@
+"""Benchmark: full-text fetch and extraction throughput.
+
+Serves HTML article pages from a local stub (``--hosts`` ports, so per-host
+limits apply) and enriches ``--articles`` articles with ``FullTextFetcher``,
+cold and then from the cache. It also times extraction alone on an in-memory
+page, without the network.
+
+Usage:
+  python benchmarks/bench_fulltext.py --articles 200 --page-kb 64 --max-kb 32 --latency 0.05
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.stubs import start_article_stub  # noqa: E402
+from collector.app import normalize_url  # noqa: E402
+from collector.fulltext import FullTextFetcher, MainTextParser  # noqa: E402
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--articles", type=int, default=200)
+    p.add_argument("--hosts", type=int, default=4)
+    p.add_argument("--page-kb", type=int, default=64, help="Size of each served page")
+    p.add_argument("--max-kb", type=int, default=32, help="Byte budget per page (FULLTEXT_MAX_BYTES)")
+    p.add_argument("--latency", type=float, default=0.05, help="Server latency per page (s)")
+    p.add_argument("--per-host", type=int, default=4)
+    p.add_argument("--concurrency", type=int, default=16)
+    args = p.parse_args()
+
+    servers = [start_article_stub(latency=args.latency, page_bytes=args.page_kb * 1024, seed=i)
+               for i in range(args.hosts)]
+    articles = [{"title": f"a{i}", "description": "teaser",
+                 "source_url": f"{servers[i % args.hosts][1]}/story/{i}"} for i in range(args.articles)]
+    fetcher = FullTextFetcher(max_bytes=args.max_kb * 1024, per_host=args.per_host,
+                              concurrency=args.concurrency, normalize=normalize_url)
+    try:
+        start = time.perf_counter()
+        enriched = fetcher.enrich(articles)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        fetcher.enrich(articles)
+        warm = time.perf_counter() - start
+    finally:
+        for server, _ in servers:
+            server.shutdown()
+
+    stats = fetcher.stats()
+    chars = sum(len(a["description"]) for a in enriched)
+    ok = sum(1 for a in enriched if "teaser" in a)
+    print(f"articles {args.articles} over {args.hosts} hosts, per-host {args.per_host}, concurrency {args.concurrency}")
+    print(f"cold     {args.articles / cold:>9.1f} pages/s  {stats['bytes_read'] / cold / 2**20:>7.2f} MB/s read  "
+          f"{chars / cold / 2**20:>7.2f} MB/s text  ({ok} enriched, {stats['failures']} failed)")
+    print(f"cached   {args.articles / warm:>9.1f} pages/s")
+    print(f"read     {stats['bytes_read'] / args.articles / 1024:>9.1f} KB/page of {args.page_kb} KB served")
+
+    html = "<html><body><nav><p>menu</p></nav><article>" + "".join(
+        f"<p>{a['description'][:400]}</p>" for a in enriched[:50]) * 4 + "</article></body></html>"
+    data = html.encode()
+    start = time.perf_counter()
+    rounds = 20
+    for _ in range(rounds):
+        parser = MainTextParser(max_chars=10 ** 9)
+        parser.feed(html)
+        parser.text()
+    parse_s = time.perf_counter() - start
+    print(f"extract  {len(data) * rounds / parse_s / 2**20:>9.2f} MB/s of HTML (parser only)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Micro-benchmark: bare requests.post vs the pooled keep-alive session.
+
+Starts a local HTTP/1.1 stub server and measures requests/second for both
+clients, serially and from a thread pool.
+
+Usage:
+  python benchmarks/bench_http_pool.py --requests 2000 --concurrency 8
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import httpclient  # noqa: E402
+from benchmarks.stubs import read_body, send_json, start_stub_server  # noqa: E402
+
+
+def handle(request):
+    read_body(request)
+    send_json(request, {"ok": True})
+
+
+def run(label, post, url, n, concurrency):
+    payload = {"prompt": "Summarize this: benchmark"}
+
+    def one(_):
+        post(url, json=payload, timeout=10).raise_for_status()
+
+    start = time.perf_counter()
+    if concurrency <= 1:
+        for i in range(n):
+            one(i)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(one, range(n)))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {n / elapsed:>10.1f} req/s  ({elapsed:.2f}s for {n})")
+    return n / elapsed
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--requests", type=int, default=2000)
+    p.add_argument("--concurrency", type=int, default=8)
+    args = p.parse_args()
+
+    server, url = start_stub_server(handle, keep_alive=True)
+    url += "/api/generate"
+
+    try:
+        for conc in (1, args.concurrency):
+            bare = run(f"bare requests.post (c={conc})", requests.post, url, args.requests, conc)
+            pooled = run(f"pooled session (c={conc})", httpclient.post, url, args.requests, conc)
+            print(f"{'speedup':<32} {pooled / bare:>10.2f}x\n")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
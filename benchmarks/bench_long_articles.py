@@ -0,0 +1,59 @@
+"""Benchmark: summarization latency of long articles vs chunk concurrency.
+
+Summarizes articles of increasing length (in chunks of
+``SUMMARIZE_CHUNK_TOKENS``) through ``/summarize`` against the LLM stub,
+once per chunk concurrency. With map-reduce chunking latency grows with
+``chunks / concurrency`` rather than with the text length.
+
+Usage:
+  python benchmarks/bench_long_articles.py --llm-latency 0.2 --concurrency 1 4 8
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.stubs import make_description, start_llm_stub  # noqa: E402
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--chunks", type=int, nargs="+", default=[1, 2, 4, 8, 16], help="Article lengths in chunks")
+    p.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    p.add_argument("--chunk-tokens", type=int, default=500)
+    p.add_argument("--llm-latency", type=float, default=0.1)
+    args = p.parse_args()
+
+    server, url = start_llm_stub(latency=args.llm_latency)
+    os.environ.update({
+        "LLM_BACKEND": "ollama", "LOCAL_LLM_API_URL": url, "LLM_BREAKER": "0",
+        "SUMMARY_CACHE_SIZE": "0", "SUMMARIZE_CHUNK_TOKENS": str(args.chunk_tokens),
+        "SUMMARIZE_MAX_CHUNKS": str(max(args.chunks)),
+    })
+    from summarizer.app import app  # noqa: E402
+
+    client = app.test_client()
+    rng = random.Random(0)
+    print(f"llm latency {args.llm_latency * 1000:.0f} ms, {args.chunk_tokens} tokens per chunk; seconds per article")
+    print(f"{'chunks':>7} {'tokens':>7}" + "".join(f" {f'conc={c}':>9}" for c in args.concurrency))
+    try:
+        for chunks in args.chunks:
+            text = ""
+            while len(text) // 4 < chunks * args.chunk_tokens * 0.9:
+                text += make_description(rng, sentences=5) + " "
+            row = f"{chunks:>7} {len(text) // 4:>7}"
+            for concurrency in args.concurrency:
+                os.environ["SUMMARIZE_CHUNK_CONCURRENCY"] = str(concurrency)
+                start = time.perf_counter()
+                resp = client.post("/summarize", json={"articles": [{"title": "long", "description": text}]})
+                assert resp.status_code == 200, resp.status_code
+                row += f" {time.perf_counter() - start:>9.2f}"
+            print(row)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark: MinHash/LSH near-duplicate clustering on synthetic articles.
+
+Generates base stories plus syndicated copies (source suffix on the title,
+a word or two changed in the description), clusters them and reports
+throughput, how many summarize calls clustering saves, and pairwise
+precision/recall of the duplicate links against the known stories.
+
+Usage:
+  python benchmarks/bench_neardup.py --articles 100000 --dup-rate 0.4
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.neardup import NearDuplicateIndex, article_text  # noqa: E402
+
+SOURCES = ["Reuters", "AP", "BBC News", "CNN", "Bloomberg", "The Verge", "Yahoo Finance"]
+
+
+def make_articles(n, dup_rate, seed=0):
+    rng = random.Random(seed)
+    vocab = [f"w{i}" for i in range(20000)]
+    articles, story_ids, stories = [], [], []
+    while len(articles) < n:
+        if stories and rng.random() < dup_rate:
+            story = rng.randrange(len(stories))
+            title, words = stories[story]
+            words = list(words)
+            for _ in range(rng.randint(0, 2)):
+                words[rng.randrange(len(words))] = rng.choice(vocab)
+            title = f"{title} - {rng.choice(SOURCES)}"
+        else:
+            story = len(stories)
+            title = " ".join(rng.choice(vocab) for _ in range(rng.randint(6, 12)))
+            words = [rng.choice(vocab) for _ in range(rng.randint(25, 45))]
+            stories.append((title, words))
+        articles.append({"title": title, "description": " ".join(words)})
+        story_ids.append(story)
+    return articles, story_ids
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--articles", type=int, default=100000)
+    p.add_argument("--dup-rate", type=float, default=0.4, help="Fraction of articles that copy an earlier story")
+    p.add_argument("--threshold", type=float, default=0.5)
+    args = p.parse_args()
+
+    articles, story_ids = make_articles(args.articles, args.dup_rate)
+    index = NearDuplicateIndex(threshold=args.threshold)
+    start = time.perf_counter()
+    reps = []
+    for i, article in enumerate(articles):
+        rep = index.add(i, article_text(article))
+        reps.append(i if rep is None else rep)
+    elapsed = time.perf_counter() - start
+
+    # Each non-representative is one predicted duplicate link
+    linked = [(i, rep) for i, rep in enumerate(reps) if rep != i]
+    correct = sum(1 for i, rep in linked if story_ids[i] == story_ids[rep])
+    true_dups = len(story_ids) - len(set(story_ids))
+    print(f"articles:        {len(articles)}")
+    print(f"stories:         {len(set(story_ids))}")
+    print(f"clusters:        {index.clusters}")
+    print(f"time:            {elapsed:.2f}s ({len(articles) / elapsed:,.0f} articles/s)")
+    print(f"summarize calls: {index.clusters} instead of {len(articles)} "
+          f"({1 - index.clusters / len(articles):.1%} saved)")
+    print(f"precision:       {correct / len(linked) if linked else 1.0:.4f}")
+    print(f"recall:          {correct / true_dups if true_dups else 1.0:.4f}")
+
+
+if __name__ == "__main__":
+    main()
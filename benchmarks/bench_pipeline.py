@@ -0,0 +1,201 @@
+"""End-to-end pipeline benchmark against local stub dependencies.
+
+Starts stub NewsAPI and LLM servers (configurable latency, jitter and error
+rate) and the real collector, summarizer and sentiment services, then:
+
+1. runs the async coordinator pipeline (``coordinator.orchestrate``) over
+   ``--topics`` topics for ``--rounds`` rounds, and
+2. drives each service's HTTP API directly at ``--concurrency``.
+
+It reports pipeline throughput, per-stage and per-endpoint latency
+percentiles, and service memory (RSS summed over each service's processes),
+and writes everything as JSON to ``--output`` so results can be compared
+between releases.
+
+Usage:
+  python benchmarks/bench_pipeline.py --topics 8 --llm-latency 0.2 --llm-jitter 0.1 \\
+      --llm-error-rate 0.02 --output bench_pipeline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import coordinator  # noqa: E402
+from common import stats  # noqa: E402
+from benchmarks.loadtest import drive, start_service, stop_service  # noqa: E402
+from benchmarks.stubs import make_description, start_llm_stub, start_newsapi_stub  # noqa: E402
+
+SERVICES = ("collector", "summarizer", "sentiment")
+
+
+def rss_mb(pid):
+    """Resident memory of ``pid`` and all of its descendants in MB (None if /proc is unavailable)."""
+    parents = {}
+    try:
+        for entry in os.listdir("/proc"):
+            if entry.isdigit():
+                try:
+                    with open(f"/proc/{entry}/stat") as f:
+                        # Fields after the ")" that ends the command name: state, ppid, ...
+                        parents[int(entry)] = int(f.read().rsplit(")", 1)[1].split()[1])
+                except (OSError, IndexError, ValueError):
+                    pass
+    except OSError:
+        return None
+    tree, frontier = {pid}, [pid]
+    while frontier:
+        parent = frontier.pop()
+        children = [p for p, pp in parents.items() if pp == parent and p not in tree]
+        tree.update(children)
+        frontier.extend(children)
+    total_kb = 0
+    for p in tree:
+        try:
+            with open(f"/proc/{p}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+        except OSError:
+            pass
+    return round(total_kb / 1024, 1)
+
+
+def _percentiles_ms(values):
+    return {f"p{pct}_ms": round(stats.percentile(values, pct) * 1000, 1) for pct in (50, 95, 99)}
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--topics", type=int, default=4, help="Topics collected per pipeline round")
+    p.add_argument("--rounds", type=int, default=2, help="Pipeline rounds (new topics each round)")
+    p.add_argument("--summarize-workers", type=int, default=4)
+    p.add_argument("--sentiment-workers", type=int, default=2)
+    p.add_argument("--http-requests", type=int, default=200, help="Direct requests per service")
+    p.add_argument("--concurrency", type=int, default=8, help="Client threads for direct requests")
+    p.add_argument("--mode", choices=["serve", "dev"], default="serve")
+    p.add_argument("--workers", type=int, default=2, help="Server worker processes (serve mode)")
+    p.add_argument("--threads", type=int, default=8, help="Threads per server worker (serve mode)")
+    for stub, latency in (("news", 0.05), ("llm", 0.2)):
+        p.add_argument(f"--{stub}-latency", type=float, default=latency)
+        p.add_argument(f"--{stub}-jitter", type=float, default=0.0)
+        p.add_argument(f"--{stub}-error-rate", type=float, default=0.0)
+    p.add_argument("--cache", action="store_true", help="Keep the NewsAPI and summary caches enabled")
+    p.add_argument("--output", help="Write the JSON report to this file (default: stdout only)")
+    args = p.parse_args()
+
+    news, news_url = start_newsapi_stub(args.news_latency, args.news_jitter, args.news_error_rate, seed=1)
+    llm, llm_url = start_llm_stub(args.llm_latency, args.llm_jitter, args.llm_error_rate, seed=2)
+    state_dir = tempfile.mkdtemp()
+    env = {
+        "NEWS_API_KEY": "stub",
+        "NEWS_API_URL": news_url,
+        "LOCAL_LLM_API_URL": llm_url,
+        "LLM_BACKEND": "ollama",
+        "SUMMARY_JOBS_PATH": os.path.join(state_dir, "jobs.db"),
+    }
+    if args.mode == "serve" and args.workers > 1:
+        # Moods and trends shared by the workers; a fresh file per run so runs do not skew each other
+        env["SENTIMENT_STATE_PATH"] = os.path.join(state_dir, "sentiment_state.db")
+    if not args.cache:
+        env.update({"NEWS_CACHE_SIZE": "0", "SUMMARY_CACHE_SIZE": "0"})
+
+    procs, urls = {}, {}
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "config": vars(args),
+    }
+    try:
+        for service in SERVICES:
+            procs[service], urls[service] = start_service(service, args.mode, env, args.workers, args.threads)
+        idle = {s: rss_mb(proc.pid) for s, proc in procs.items()}
+
+        rounds = []
+        for r in range(args.rounds):
+            topics = [f"topic{r}-{i}" for i in range(args.topics)]
+            rounds.append(asyncio.run(coordinator.orchestrate(
+                topics, urls["collector"], urls["summarizer"], urls["sentiment"],
+                summarize_workers=args.summarize_workers, sentiment_workers=args.sentiment_workers,
+            )))
+        seconds = sum(r["total_seconds"] for r in rounds)
+        articles = sum(t["collected"] for r in rounds for t in r["topics"].values())
+        stages = {}
+        for stage in rounds[0]["stages"]:
+            per_round = [r["stages"][stage] for r in rounds]
+            stages[stage] = {
+                "calls": sum(s["calls"] for s in per_round),
+                "busy_seconds": round(sum(s["busy_seconds"] for s in per_round), 4),
+                # Percentiles are per round; report the worst round
+                **{k: max(s[k] for s in per_round) for k in ("p50_ms", "p95_ms", "p99_ms", "max_ms")},
+            }
+        report["pipeline"] = {
+            "rounds": args.rounds,
+            "articles": articles,
+            "seconds": round(seconds, 4),
+            "articles_per_second": round(articles / seconds, 2) if seconds else 0.0,
+            "errors": sum(t["errors"] for r in rounds for t in r["topics"].values()),
+            "failed_topics": sum(1 for r in rounds for t in r["topics"].values() if not t["ok"]),
+            "stages": stages,
+        }
+
+        rng = random.Random(0)
+        summaries = [{"title": f"t{i}", "summary": make_description(rng)} for i in range(20)]
+        requests_by_service = {
+            "collector": lambda i: ("/collect", {"topic": f"http{i % 25}"}),
+            "summarizer": lambda i: ("/summarize", {"articles": [
+                {"title": f"h{i}", "description": make_description(random.Random(i)), "source_url": None}]}),
+            "sentiment": lambda i: ("/analyze", {"summaries": summaries, "topic": "bench"}),
+        }
+        report["http"] = {}
+        for service in SERVICES:
+            elapsed, latencies, errors = drive(
+                urls[service], requests_by_service[service], args.http_requests, args.concurrency)
+            report["http"][service] = {
+                "requests": len(latencies),
+                "requests_per_second": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+                **_percentiles_ms(latencies),
+                "errors": errors,
+            }
+
+        report["memory_mb"] = {
+            service: {"idle": idle[service], "after": rss_mb(proc.pid)} for service, proc in procs.items()
+        }
+        report["memory_mb"]["harness_peak"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    finally:
+        for proc in procs.values():
+            stop_service(proc)
+        news.shutdown()
+        llm.shutdown()
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
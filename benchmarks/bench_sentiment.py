@@ -0,0 +1,64 @@
+"""Benchmark: TextBlob per-summary scoring vs the batch sentiment engine.
+
+Generates synthetic news-style summaries from the pattern lexicon plus
+negations, intensifiers and punctuation, scores them both ways and reports
+throughput and the largest polarity difference.
+
+Usage:
+  python benchmarks/bench_sentiment.py --summaries 10000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+from textblob import TextBlob
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sentiment.engine import TOLERANCE, BatchSentimentEngine  # noqa: E402
+
+FILLER = ["the", "a", "market", "company", "said", "on", "Monday", "U.S.", "shares", "report",
+          "not", "never", "very", "really", "isn't", ",", ".", "!", "(!)", ":-)"]
+
+
+def make_summaries(engine, n, seed=0):
+    rng = random.Random(seed)
+    lexicon = sorted(engine.index)
+    vocab = FILLER * 40 + lexicon
+    return [" ".join(rng.choice(vocab) for _ in range(rng.randint(8, 40))) for _ in range(n)]
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--summaries", type=int, default=10000)
+    args = p.parse_args()
+
+    start = time.perf_counter()
+    engine = BatchSentimentEngine()
+    build = time.perf_counter() - start
+    texts = make_summaries(engine, args.summaries)
+
+    start = time.perf_counter()
+    expected = [TextBlob(t).sentiment.polarity for t in texts]
+    textblob_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    got = engine.polarities(texts)
+    cold_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    engine.polarities(texts)
+    warm_s = time.perf_counter() - start
+
+    max_diff = max(abs(a - b) for a, b in zip(got, expected))
+    n = len(texts)
+    print(f"index build          {build * 1000:>10.1f} ms")
+    print(f"textblob             {n / textblob_s:>10.0f} summaries/s")
+    print(f"batch (cold tokens)  {n / cold_s:>10.0f} summaries/s  ({textblob_s / cold_s:.1f}x)")
+    print(f"batch (warm tokens)  {n / warm_s:>10.0f} summaries/s  ({textblob_s / warm_s:.1f}x)")
+    print(f"max |diff|           {max_diff:.2e} (tolerance {TOLERANCE:.0e})")
+
+
+if __name__ == "__main__":
+    main()
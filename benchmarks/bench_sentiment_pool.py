@@ -0,0 +1,47 @@
+"""Benchmark: /analyze scoring throughput vs number of worker processes.
+
+Usage:
+  python benchmarks/bench_sentiment_pool.py --summaries 20000 --engine textblob
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sentiment import workers  # noqa: E402
+
+WORDS = ["the", "market", "rallied", "after", "a", "great", "quarter", "but", "analysts", "warned",
+         "of", "terrible", "risks", "not", "very", "good", "news", "for", "investors", "!"]
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--summaries", type=int, default=20000)
+    p.add_argument("--engine", choices=["batch", "textblob"], default="textblob")
+    p.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = p.parse_args()
+    os.environ["SENTIMENT_ENGINE"] = args.engine
+
+    rng = random.Random(0)
+    texts = [" ".join(rng.choice(WORDS) for _ in range(30)) for _ in range(args.summaries)]
+
+    start = time.perf_counter()
+    workers.score_polarities(texts)
+    base = args.summaries / (time.perf_counter() - start)
+    print(f"inline          {base:>10.0f} summaries/s")
+
+    n = 2
+    while n <= args.max_workers:
+        workers.get_pool(n)  # pre-fork outside the timed region
+        start = time.perf_counter()
+        workers.score_parallel(texts, n)
+        rate = args.summaries / (time.perf_counter() - start)
+        print(f"{n:>2} workers      {rate:>10.0f} summaries/s  ({rate / base:.2f}x)")
+        n *= 2
+    workers.shutdown_pool()
+
+
+if __name__ == "__main__":
+    main()
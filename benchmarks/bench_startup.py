@@ -0,0 +1,95 @@
+"""Benchmark: cold start to ready for each service.
+
+Launches each service ``--runs`` times with ``python -m common.serve`` and
+measures, from process spawn:
+
+- live: the first 200 from ``GET /`` (liveness),
+- ready: the first 200 from ``GET /ready`` (warm-up finished),
+- first request: latency of the first real request once ready.
+
+It also prints the service's own ``startup_seconds`` and ``warm_up_seconds``
+from ``/ready``.
+
+Usage:
+  python benchmarks/bench_startup.py --mode serve --workers 2
+  python benchmarks/bench_startup.py --mode dev --services sentiment
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from benchmarks.loadtest import stop_service  # noqa: E402
+from benchmarks.stubs import free_port  # noqa: E402
+
+FIRST_REQUESTS = {
+    "collector": ("/collect", {"topic": "startup"}),
+    "summarizer": ("/summarize", {"articles": [{"title": "t", "description": "A short article. It has text."}]}),
+    "sentiment": ("/analyze", {"summaries": [{"summary": "A great and wonderful day."}]}),
+}
+
+
+def _poll(url, deadline):
+    while time.time() < deadline:
+        try:
+            if requests.get(url, timeout=1).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.005)
+    return False
+
+
+def measure(service, mode, workers, threads, env):
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    cmd = [sys.executable, "-m", "common.serve", service, "--bind", f"127.0.0.1:{port}"]
+    cmd += ["--dev"] if mode == "dev" else ["--workers", str(workers), "--threads", str(threads)]
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=dict(os.environ, **env),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.time() + 60
+        if not _poll(url + "/", deadline):
+            raise RuntimeError(f"{service} never became live")
+        live = time.perf_counter() - start
+        if not _poll(url + "/ready", deadline):
+            raise RuntimeError(f"{service} never became ready")
+        ready = time.perf_counter() - start
+        status = requests.get(url + "/ready", timeout=5).json()
+        path, payload = FIRST_REQUESTS[service]
+        t = time.perf_counter()
+        requests.post(url + path, json=payload, timeout=30)
+        first = time.perf_counter() - t
+    finally:
+        stop_service(proc)
+    return live, ready, first, status
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--services", nargs="+", default=["collector", "summarizer", "sentiment"])
+    p.add_argument("--mode", choices=["serve", "dev"], default="serve")
+    p.add_argument("--workers", type=int, default=2)
+    p.add_argument("--threads", type=int, default=4)
+    p.add_argument("--runs", type=int, default=3)
+    args = p.parse_args()
+
+    env = {"LLM_BACKEND": "extractive", "SUMMARY_JOBS_PATH": os.path.join(tempfile.mkdtemp(), "jobs.db")}
+    print(f"mode={args.mode} runs={args.runs} (best run shown; times from process spawn)")
+    print(f"{'service':<11} {'live ms':>9} {'ready ms':>9} {'first req ms':>13} {'startup s':>10} {'warm-up s':>10}")
+    for service in args.services:
+        runs = [measure(service, args.mode, args.workers, args.threads, env) for _ in range(args.runs)]
+        live, ready, first, status = min(runs, key=lambda r: r[1])
+        print(f"{service:<11} {live * 1000:>9.0f} {ready * 1000:>9.0f} {first * 1000:>13.1f} "
+              f"{status['startup_seconds']:>10.3f} {status['warm_up_seconds']:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
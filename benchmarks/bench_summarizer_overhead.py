@@ -0,0 +1,71 @@
+"""Benchmark: summarizer orchestration overhead with the in-process extractive backend.
+
+Runs /summarize through Flask's test client with LLM_BACKEND=extractive, so
+throughput reflects request handling, caching, batching and fan-out rather than
+model time. Backend-only time is reported separately.
+
+Usage:
+  python benchmarks/bench_summarizer_overhead.py --articles 5000 --batch-size 1
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORDS = ("markets regulators chips energy launch outage merger earnings climate election "
+         "researchers startup funding quarter record growth decline policy court ruling").split()
+
+
+def make_articles(n, seed=0):
+    rng = random.Random(seed)
+    articles = []
+    for i in range(n):
+        sentences = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 14))).capitalize() + "."
+                     for _ in range(rng.randint(2, 5))]
+        articles.append({"title": f"Article {i}", "description": " ".join(sentences), "source_url": f"https://example.com/{i}"})
+    return articles
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--articles", type=int, default=5000)
+    p.add_argument("--request-size", type=int, default=50, help="Articles per /summarize request")
+    p.add_argument("--batch-size", type=int, default=1, help="LLM_BATCH_SIZE")
+    p.add_argument("--concurrency", type=int, default=4, help="LLM_MAX_CONCURRENCY")
+    p.add_argument("--cache", action="store_true", help="Keep the summary cache enabled")
+    args = p.parse_args()
+
+    os.environ["LLM_BACKEND"] = "extractive"
+    os.environ["LLM_BATCH_SIZE"] = str(args.batch_size)
+    os.environ["LLM_MAX_CONCURRENCY"] = str(args.concurrency)
+    if not args.cache:
+        os.environ["SUMMARY_CACHE_SIZE"] = "0"
+
+    from summarizer.app import app
+    from summarizer.backends import get_backend
+
+    articles = make_articles(args.articles)
+    backend = get_backend()
+    start = time.perf_counter()
+    for a in articles:
+        backend.generate(f"Summarize this: {a['description']}")
+    backend_s = time.perf_counter() - start
+
+    client = app.test_client()
+    start = time.perf_counter()
+    for i in range(0, len(articles), args.request_size):
+        resp = client.post("/summarize", json={"articles": articles[i:i + args.request_size]})
+        assert resp.status_code == 200
+    total_s = time.perf_counter() - start
+
+    n = len(articles)
+    print(f"backend only      {n / backend_s:>10.0f} articles/s")
+    print(f"/summarize        {n / total_s:>10.0f} articles/s")
+    print(f"overhead/article  {(total_s - backend_s) / n * 1e6:>10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark: trend store ingest rate, query latency and memory.
+
+Spreads ``--batches`` /analyze-sized batches of polarities over ``--topics``
+topics and ``--days`` of simulated time, then queries every topic's trend.
+Like the service, it measures the in-memory ring buffers unless
+``--state-path`` (default ``$SENTIMENT_STATE_PATH``) names the SQLite store
+that several workers share.
+
+Usage:
+  python benchmarks/bench_trends.py --topics 5000 --batches 200000
+  python benchmarks/bench_trends.py --state-path /tmp/trends.db --batches 20000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.stats import percentile  # noqa: E402
+from sentiment.shared import SharedTrendStore  # noqa: E402
+from sentiment.trends import TrendStore  # noqa: E402
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--topics", type=int, default=5000)
+    p.add_argument("--batches", type=int, default=200000)
+    p.add_argument("--batch-size", type=int, default=5, help="Polarities per batch (one /analyze request)")
+    p.add_argument("--days", type=float, default=7.0, help="Simulated time the batches span")
+    p.add_argument("--bucket-seconds", type=int, default=900)
+    p.add_argument("--state-path", default=os.getenv("SENTIMENT_STATE_PATH", ""),
+                   help="SQLite file of the shared store (default: in-memory ring buffers)")
+    args = p.parse_args()
+
+    rng = random.Random(0)
+    if args.state_path:
+        if os.path.exists(args.state_path):
+            sys.exit(f"{args.state_path} exists; pass a new file so earlier runs do not skew this one")
+        store = SharedTrendStore(args.state_path, bucket_seconds=args.bucket_seconds, max_topics=args.topics)
+    else:
+        store = TrendStore(bucket_seconds=args.bucket_seconds, max_topics=args.topics)
+    topics = [f"topic{i}" for i in range(args.topics)]
+    span = args.days * 86400
+    batches = [(rng.choice(topics), [rng.uniform(-1, 1) for _ in range(args.batch_size)], span * i / args.batches)
+               for i in range(args.batches)]
+
+    start = time.perf_counter()
+    for topic, polarities, now in batches:
+        store.add(topic, polarities, now=now)
+    ingest_s = time.perf_counter() - start
+
+    latencies = []
+    for topic in topics:
+        start = time.perf_counter()
+        store.get(topic, now=span)
+        latencies.append(time.perf_counter() - start)
+
+    points = args.batches * args.batch_size
+    kind = f"shared SQLite {args.state_path}" if args.state_path else "in-memory ring buffers"
+    print(f"store {kind}  topics {len(store)}  buckets/topic {store.buckets}  polarities {points}")
+    print(f"ingest   {args.batches / ingest_s:>10.0f} batches/s  {points / ingest_s:>10.0f} polarities/s")
+    print(f"query    p50 {percentile(latencies, 50) * 1e6:>8.1f} us  p99 {percentile(latencies, 99) * 1e6:>8.1f} us")
+    if args.state_path:
+        store.close()
+        size = sum(os.path.getsize(args.state_path + suffix) for suffix in ("", "-wal")
+                   if os.path.exists(args.state_path + suffix))
+        print(f"disk     {size / 2**20:>10.1f} MB in {args.state_path} ({size / len(latencies) / 1024:.1f} KB/topic)")
+    else:
+        print(f"memory   {store.memory_bytes() / 2**20:>10.1f} MB in bucket arrays "
+              f"({store.memory_bytes() / len(store) / 1024:.1f} KB/topic)")
+
+
+if __name__ == "__main__":
+    main()
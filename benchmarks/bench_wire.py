@@ -0,0 +1,82 @@
+"""Benchmark: bytes on the wire and parse time for the service payloads.
+
+Builds 1k-article payloads shaped like /collect responses, /summarize
+responses with and without ``llm_output`` (an Ollama-style answer including
+its token ``context``), and /analyze requests, then encodes each one as
+JSON and MessagePack, uncompressed and with gzip/zstd (see common/wire.py).
+
+Usage:
+  python benchmarks/bench_wire.py --articles 1000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.stubs import make_description  # noqa: E402
+from common import wire  # noqa: E402
+
+
+def payloads(n, seed=0):
+    rng = random.Random(seed)
+    articles = [{"title": f"Story {i}: {make_description(rng, 1)[:60]}", "description": make_description(rng),
+                 "source_url": f"https://news.example/{i}"} for i in range(n)]
+    summaries = []
+    for a in articles:
+        summary = a["description"].split(". ")[0] + "."
+        summaries.append({
+            "title": a["title"],
+            "summary": summary,
+            "source_url": a["source_url"],
+            "llm_output": {
+                "model": "llama2", "created_at": "2025-01-01T00:00:00.000000Z", "response": summary, "done": True,
+                "context": [rng.randrange(32000) for _ in range(rng.randint(150, 400))],
+                "total_duration": rng.randrange(10 ** 9, 10 ** 10), "load_duration": rng.randrange(10 ** 7),
+                "prompt_eval_count": rng.randrange(100, 300), "eval_count": rng.randrange(20, 80),
+                "eval_duration": rng.randrange(10 ** 8, 10 ** 9),
+            },
+        })
+    slim = [{k: v for k, v in s.items() if k != "llm_output"} for s in summaries]
+    return {
+        "/collect response": articles,
+        "/summarize response (llm_output)": summaries,
+        "/summarize response (slim)": slim,
+        "/analyze request": {"summaries": slim, "topic": "bench", "include_sentiments": True},
+    }
+
+
+def measure(obj, content_type, encoding, repeat):
+    body = wire.compress(wire.dumps(obj, content_type), encoding)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        wire.compress(wire.dumps(obj, content_type), encoding)
+    encode = (time.perf_counter() - start) / repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        wire.loads(wire.decompress(body, encoding), content_type)
+    decode = (time.perf_counter() - start) / repeat
+    return len(body), encode, decode
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--articles", type=int, default=1000)
+    p.add_argument("--repeat", type=int, default=5)
+    args = p.parse_args()
+
+    formats = [("json", wire.JSON)] + ([("msgpack", wire.MSGPACK)] if "msgpack" in wire.available_formats() else [])
+    encodings = ["identity"] + list(reversed(wire.available_encodings()))
+    for name, obj in payloads(args.articles).items():
+        print(f"\n{name}, {args.articles} articles")
+        print(f"  {'format':<18} {'bytes':>11} {'encode ms':>10} {'decode ms':>10}")
+        for fmt, content_type in formats:
+            for encoding in encodings:
+                size, encode, decode = measure(obj, content_type, encoding, args.repeat)
+                label = fmt if encoding == "identity" else f"{fmt}+{encoding}"
+                print(f"  {label:<18} {size:>11,} {encode * 1000:>10.2f} {decode * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Load test: requests/second and latency percentiles for each service.
+
+Starts each service with ``python -m common.serve`` (gunicorn workers, or the
+Flask dev server with ``--mode dev``) against stubbed dependencies: a NewsAPI
+stub for the collector and an LLM stub for the summarizer. It then sends
+``--requests`` requests from ``--concurrency`` client threads.
+
+Usage:
+  python benchmarks/loadtest.py --mode serve --workers 4 --threads 4
+  python benchmarks/loadtest.py --mode dev --services sentiment
+"""
+import argparse
+import os
+import random
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from benchmarks.stubs import free_port, make_description, start_llm_stub, start_newsapi_stub  # noqa: E402
+from common.stats import percentile  # noqa: E402
+
+
+def start_service(service, mode, env, workers, threads):
+    port = free_port()
+    cmd = [sys.executable, "-m", "common.serve", service, "--bind", f"127.0.0.1:{port}"]
+    if mode == "dev":
+        cmd.append("--dev")
+    else:
+        cmd += ["--workers", str(workers), "--threads", str(threads)]
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=dict(os.environ, **env),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            # Send load only once the service reports itself warm
+            if requests.get(url + "/ready", timeout=1).status_code == 200:
+                return proc, url
+        except requests.RequestException:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError(f"{service} did not start")
+
+
+def stop_service(proc):
+    proc.send_signal(signal.SIGTERM)
+    try:
+        proc.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+def drive(url, make_request, total, concurrency):
+    """Send ``total`` requests from ``concurrency`` threads; returns (seconds, latencies, errors)."""
+    latencies, errors = [], [0]
+    counter = iter(range(total))
+    lock = threading.Lock()
+
+    def client():
+        session = requests.Session()
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            path, payload = make_request(i)
+            start = time.perf_counter()
+            try:
+                ok = session.post(url + path, json=payload, timeout=60).status_code == 200
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                errors[0] += 0 if ok else 1
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start, latencies, errors[0]
+
+
+def workloads(news_url, llm_url, state_dir):
+    rng = random.Random(0)
+    summaries = [{"title": f"t{i}", "summary": make_description(rng)} for i in range(20)]
+    return {
+        "collector": (
+            {"NEWS_API_KEY": "stub", "NEWS_API_URL": news_url, "NEWS_CACHE_SIZE": "0"},
+            lambda i: ("/collect", {"topic": f"topic{i % 50}"}),
+        ),
+        "summarizer": (
+            {"LLM_BACKEND": "ollama", "LOCAL_LLM_API_URL": llm_url, "LLM_BREAKER": "0",
+             "SUMMARY_CACHE_SIZE": "0",
+             "SUMMARY_JOBS_PATH": os.path.join(state_dir, "jobs.db")},
+            lambda i: ("/summarize", {"articles": [
+                {"title": f"a{i}", "description": make_description(random.Random(i)), "source_url": None}]}),
+        ),
+        "sentiment": (
+            {},
+            lambda i: ("/analyze", {"summaries": summaries, "topic": "load"}),
+        ),
+    }
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--services", nargs="+", default=["collector", "summarizer", "sentiment"])
+    p.add_argument("--mode", choices=["serve", "dev"], default="serve")
+    p.add_argument("--workers", type=int, default=4)
+    p.add_argument("--threads", type=int, default=4)
+    p.add_argument("--requests", type=int, default=1000)
+    p.add_argument("--concurrency", type=int, default=16)
+    p.add_argument("--news-latency", type=float, default=0.02, help="NewsAPI stub latency (s)")
+    p.add_argument("--llm-latency", type=float, default=0.05, help="LLM stub latency (s)")
+    args = p.parse_args()
+
+    news, news_url = start_newsapi_stub(latency=args.news_latency)
+    llm, llm_url = start_llm_stub(latency=args.llm_latency)
+    state_dir = tempfile.mkdtemp()
+    plans = workloads(news_url, llm_url, state_dir)
+    if args.mode == "serve" and args.workers > 1:
+        # Moods and trends shared by the workers; a fresh file per run so runs do not skew each other
+        plans["sentiment"][0]["SENTIMENT_STATE_PATH"] = os.path.join(state_dir, "sentiment_state.db")
+    servers = f"workers={args.workers} threads={args.threads} " if args.mode == "serve" else ""
+    print(f"mode={args.mode} {servers}requests={args.requests} concurrency={args.concurrency}")
+    print(f"{'service':<11} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    try:
+        for service in args.services:
+            env, make_request = plans[service]
+            proc, url = start_service(service, args.mode, env, args.workers, args.threads)
+            try:
+                drive(url, make_request, min(50, args.requests), args.concurrency)  # warm-up
+                seconds, latencies, errors = drive(url, make_request, args.requests, args.concurrency)
+            finally:
+                stop_service(proc)
+            print(f"{service:<11} {len(latencies) / seconds:>9.1f} {percentile(latencies, 50) * 1000:>9.1f} "
+                  f"{percentile(latencies, 99) * 1000:>9.1f} {errors:>7}")
+    finally:
+        news.shutdown()
+        llm.shutdown()
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Local stand-ins for the services' external dependencies, for benchmarks and tests.
+
+Each stub is a keep-alive ``start_stub_server`` (the tests use the same
+factory through their ``stub_server`` fixture) that answers after
+``latency`` seconds (plus up to ``jitter`` seconds of uniform noise) and
+fails a fraction ``error_rate`` of requests with HTTP 503. The JSON stubs
+stand in for NewsAPI and the LLM; ``start_article_stub`` serves HTML article
+pages for the full-text fetcher.
+
+    server, url = start_llm_stub(latency=0.05)
+    ...
+    server.shutdown()
+"""
+import json
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+WORDS = ("markets regulators chips energy launch outage merger earnings climate election "
+         "researchers startup funding quarter record growth decline policy court ruling").split()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_stub_server(handle, keep_alive=False, quiet_errors=False):
+    """Serve every GET and POST with ``handle(request)`` from daemon threads on 127.0.0.1.
+
+    ``handle`` receives the ``BaseHTTPRequestHandler`` and writes the whole
+    response (``send_json`` covers the common case). ``keep_alive`` speaks
+    HTTP/1.1, so every response needs a length or chunked encoding.
+    ``quiet_errors`` hides the tracebacks of clients that hang up mid-response.
+    Returns (server, base URL). The tests build their stubs on this too.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1" if keep_alive else "HTTP/1.0"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            handle(self)
+
+        do_POST = do_GET
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+
+        def handle_error(self, request, client_address):
+            if not quiet_errors:
+                super().handle_error(request, client_address)
+
+    server = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def read_body(request):
+    length = int(request.headers.get("Content-Length") or 0)
+    return request.rfile.read(length) if length else b""
+
+
+def send_json(request, payload, status=200, headers=None):
+    data = json.dumps(payload).encode("utf-8")
+    request.send_response(status)
+    request.send_header("Content-Type", "application/json")
+    request.send_header("Content-Length", str(len(data)))
+    for name, value in (headers or {}).items():
+        request.send_header(name, value)
+    request.end_headers()
+    request.wfile.write(data)
+
+
+def _start(respond, latency, jitter, error_rate, seed):
+    rng = random.Random(seed)
+    lock = threading.Lock()
+
+    def handle(request):
+        body = read_body(request)
+        with lock:
+            delay = latency + rng.uniform(0, jitter)
+            failed = rng.random() < error_rate
+        time.sleep(delay)
+        if failed:
+            send_json(request, {"error": "stub failure"}, status=503)
+        else:
+            send_json(request, respond(request.path, body))
+
+    return start_stub_server(handle, keep_alive=True)
+
+
+def make_description(rng, sentences=3):
+    return " ".join(" ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 14))).capitalize() + "."
+                    for _ in range(sentences))
+
+
+def start_newsapi_stub(latency=0.0, jitter=0.0, error_rate=0.0, seed=0):
+    """NewsAPI /v2/everything look-alike; articles are deterministic per query and page."""
+
+    def respond(path, body):
+        query = parse_qs(urlsplit(path).query)
+        topic = query.get("q", ["news"])[0]
+        size = int(query.get("pageSize", ["5"])[0])
+        page = int(query.get("page", ["1"])[0])
+        rng = random.Random(f"{topic}/{page}")
+        articles = [{
+            "title": f"{topic.title()} story {page}-{i}",
+            "description": make_description(rng),
+            "url": f"https://news.example/{topic}/{page}/{i}",
+        } for i in range(size)]
+        return {"status": "ok", "totalResults": len(articles), "articles": articles}
+
+    server, url = _start(respond, latency, jitter, error_rate, seed)
+    return server, url + "/v2/everything"
+
+
+def start_llm_stub(latency=0.0, jitter=0.0, error_rate=0.0, seed=0):
+    """Ollama /api/generate look-alike that echoes the first sentence of the prompt."""
+
+    def respond(path, body):
+        prompt = json.loads(body or b"{}").get("prompt", "")
+        text = prompt.split(":", 1)[-1].strip()
+        return {"model": "stub", "response": text.split(". ")[0], "done": True}
+
+    server, url = _start(respond, latency, jitter, error_rate, seed)
+    return server, url + "/api/generate"
+
+
+def start_article_stub(latency=0.0, page_bytes=64 * 1024, seed=0):
+    """HTML article pages of about ``page_bytes`` bytes, with page chrome around an <article>."""
+    base = random.Random(seed)
+    paragraphs = [f"<p>{make_description(base, sentences=4)}</p>" for _ in range(64)]
+
+    def handle(request):
+        time.sleep(latency)
+        rng = random.Random(request.path)
+        body = ["<html><head><script>var tracking = true;</script></head><body>",
+                "<nav><p>Home | World | Business | Technology | Science | Opinion</p></nav>",
+                f"<article><h1>{request.path}</h1>"]
+        size = sum(map(len, body))
+        while size < page_bytes:
+            body.append(rng.choice(paragraphs))
+            size += len(body[-1])
+        body.append("</article><footer><p>All rights reserved by the example news company.</p></footer></body></html>")
+        data = "".join(body).encode("utf-8")
+        request.send_response(200)
+        request.send_header("Content-Type", "text/html; charset=utf-8")
+        request.send_header("Content-Length", str(len(data)))
+        request.end_headers()
+        try:
+            request.wfile.write(data)
+        except OSError:
+            pass  # the client stopped reading at its byte budget
+
+    # Clients that hit their byte budget reset the connection mid-page
+    return start_stub_server(handle, keep_alive=True, quiet_errors=True)
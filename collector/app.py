@@ -1,55 +1,285 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
+import hashlib
+import json
 import os
-import requests
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import parse_qsl, quote, urlencode, urlsplit, urlunsplit
+from collector.fulltext import FullTextFetcher
+from collector.newscache import NOT_MODIFIED, FetchCache
+from common import config, httpclient, metrics, readiness, wire
+from common.neardup import NearDuplicateIndex, article_text
 from flask_cors import CORS
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
+metrics.instrument_app(app, "collector")
+wire.instrument_app(app)
+
+NEWSAPI_SECONDS = metrics.histogram(
+    "newsapi_request_duration_seconds", "Upstream NewsAPI call latency", ("status",))
+NEWSAPI_ERRORS = metrics.counter(
+    "newsapi_errors_total", "Failed NewsAPI calls by kind", ("kind",))
 
 @app.route("/", methods=["GET"]) 
 def health():
-    return jsonify({"service": "collector", "status": "ok"})
+    cache = _get_news_cache()
+    return jsonify({
+        "service": "collector",
+        "status": "ok",
+        "news_cache": cache.stats() if cache is not None else None,
+        "full_text": _fulltext.stats() if _fulltext is not None else None,
+    })
+
+def _sample_news(topic):
+    slug = quote(str(topic).lower(), safe="")
+    return [
+        {"title": f"{topic.title()} Advances in 2025", "description": "Researchers are making rapid progress.", "source_url": f"https://example.com/{slug}/mock1"},
+        {"title": f"New Breakthroughs in {topic}", "description": "Experts see major industry shifts.", "source_url": f"https://example.com/{slug}/mock2"},
+        {"title": f"The Future of {topic} Technology", "description": "Innovations are shaping the next decade.", "source_url": f"https://example.com/{slug}/mock3"},
+    ]
+
+
+_news_cache = None
+_news_cache_config = None
+_news_cache_lock = threading.Lock()
+
+
+def _get_news_cache():
+    """Return the NewsAPI response cache for the current env config (None if disabled)."""
+    global _news_cache, _news_cache_config
+    ttl = config.env_float("NEWS_CACHE_TTL", 300.0)
+    stale_ttl = config.env_float("NEWS_CACHE_STALE_TTL", 600.0)
+    size = config.env_int("NEWS_CACHE_SIZE", 512)
+    settings = (ttl, stale_ttl, size)
+    with _news_cache_lock:
+        if settings != _news_cache_config:
+            _news_cache = FetchCache(ttl=ttl, stale_ttl=stale_ttl, max_entries=size) if ttl > 0 and size > 0 else None
+            _news_cache_config = settings
+        return _news_cache
+
+
+_fulltext = None
+_fulltext_config = None
+_fulltext_lock = threading.Lock()
 
-@app.route("/collect", methods=["POST"])
-def collect_news():
-    data = request.get_json(silent=True) or {}
-    topic = data.get("topic", "technology")
-    api_key = os.getenv("NEWS_API_KEY")
-    # Don't auto-forward to summarizer; let the caller handle the pipeline
-    enable_get = (os.getenv("ENABLE_GET_TEST_ROUTES", "0").lower() in {"1", "true", "yes"})
 
-    if not api_key:
-        sample_news = [
-            {"title": f"{topic.title()} Advances in 2025", "description": "Researchers are making rapid progress.", "source_url": "https://example.com/mock1"},
-            {"title": f"New Breakthroughs in {topic}", "description": "Experts see major industry shifts.", "source_url": "https://example.com/mock2"},
-            {"title": f"The Future of {topic} Technology", "description": "Innovations are shaping the next decade.", "source_url": "https://example.com/mock3"},
-        ]
-        return jsonify(sample_news)
+def _get_fulltext():
+    """Return the full-text fetcher for the current FULLTEXT_* env config."""
+    global _fulltext, _fulltext_config
+    settings = (
+        config.env_int("FULLTEXT_MAX_BYTES", 512 * 1024, 1024, 64 * 1024 * 1024),
+        config.env_int("FULLTEXT_MAX_CHARS", 20000, 100, 1000000),
+        config.env_int("FULLTEXT_TIMEOUT", 5, 1, 60),
+        config.env_int("FULLTEXT_PER_HOST", 2, 1, 64),
+        config.env_int("FULLTEXT_CONCURRENCY", 8, 1, 64),
+        config.env_int("FULLTEXT_CACHE_SIZE", 2048, 0, 1000000),
+        config.env_int("FULLTEXT_CACHE_TTL", 86400, 1, 30 * 86400),
+    )
+    with _fulltext_lock:
+        if settings != _fulltext_config:
+            _fulltext = FullTextFetcher(*settings, normalize=normalize_url)
+            _fulltext_config = settings
+        return _fulltext
 
-    url = f"https://newsapi.org/v2/everything?q={topic}&pageSize=5&apiKey={api_key}"
+
+def reset_state():
+    """Drop the NewsAPI response cache and full-text fetcher; the next request rebuilds them."""
+    global _news_cache, _news_cache_config, _fulltext, _fulltext_config
+    with _news_cache_lock:
+        _news_cache = _news_cache_config = None
+    with _fulltext_lock:
+        _fulltext = _fulltext_config = None
+
+
+def _full_text_requested(data):
+    """Per-request ``full_text`` flag, falling back to COLLECT_FULL_TEXT (off by default)."""
+    requested = data.get("full_text")
+    if isinstance(requested, bool):
+        return requested
+    return config.env_flag("COLLECT_FULL_TEXT")
+
+
+def _newsapi_get(topic, api_key, page_size, page, validators):
+    """One upstream NewsAPI call; conditional when we hold an ETag/Last-Modified."""
+    url = os.getenv("NEWS_API_URL", "https://newsapi.org/v2/everything")
+    params = {"q": topic, "pageSize": page_size, "page": page, "apiKey": api_key}
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    started = time.perf_counter()
+    try:
+        response = httpclient.get(url, params=params, headers=headers, timeout=10)
+    except Exception as e:
+        NEWSAPI_SECONDS.observe(time.perf_counter() - started, status="error")
+        NEWSAPI_ERRORS.inc(kind=type(e).__name__)
+        raise
+    NEWSAPI_SECONDS.observe(time.perf_counter() - started, status=response.status_code)
+    if response.status_code == 304:
+        return NOT_MODIFIED
     try:
-        response = requests.get(url, timeout=10)
         response.raise_for_status()
-        articles = response.json().get("articles", [])
+    except Exception:
+        NEWSAPI_ERRORS.inc(kind=f"http_{response.status_code}")
+        raise
+    articles = response.json().get("articles", [])
+    validators = {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+    return articles, validators
+
+
+def _fetch_articles(topic, api_key, page_size=5, page=1):
+    cache = _get_news_cache()
+    try:
+        if cache is None:
+            articles = _newsapi_get(topic, api_key, page_size, page, {})[0]
+        else:
+            key = (topic.strip().lower(), page_size, page)
+            articles = cache.get(key, lambda v: _newsapi_get(topic, api_key, page_size, page, v))
     except Exception:
         # Fallback to empty set if API fails
         articles = []
 
-    news_data = [
+    return [
         {"title": a.get("title"), "description": a.get("description", ""), "source_url": a.get("url")}
-        for a in articles[:5]
+        for a in articles[:page_size]
         if a.get("title")
     ]
-    return jsonify(news_data)
+
+
+@app.route("/collect", methods=["POST"])
+def collect_news():
+    data = wire.get_payload() or {}
+    topic = data.get("topic", "technology")
+    api_key = os.getenv("NEWS_API_KEY")
+    # Don't auto-forward to summarizer; let the caller handle the pipeline
+
+    articles = _fetch_articles(topic, api_key) if api_key else _sample_news(topic)
+    if _full_text_requested(data):
+        articles = _get_fulltext().enrich(articles)
+    return wire.respond(articles)
+
+
+def normalize_url(url):
+    """Canonical form of an article URL for de-duplication (scheme/host case, www, tracking params)."""
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_")
+    ))
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https" if parts.scheme in ("http", "https") else parts.scheme, host, path, query, ""))
+
+
+def title_key(title):
+    """Hash of a title with case, punctuation and whitespace differences removed."""
+    words = re.findall(r"\w+", (title or "").lower())
+    return hashlib.sha1(" ".join(words).encode("utf-8")).hexdigest()
+
+
+class ArticleDeduper:
+    """Drops articles whose normalized URL or title hash has already been seen.
+
+    With ``near_duplicates``, articles whose title + description is a near copy
+    of an earlier one (MinHash/LSH, see common/neardup.py) are dropped too.
+    """
+
+    def __init__(self, near_duplicates=False):
+        self.urls = set()
+        self.titles = set()
+        self.near = NearDuplicateIndex() if near_duplicates else None
+        self.duplicates = 0
+
+    def add(self, article):
+        url = normalize_url(article.get("source_url"))
+        title = title_key(article.get("title"))
+        if (url and url in self.urls) or title in self.titles or (
+                self.near is not None and self.near.add(url or title, article_text(article)) is not None):
+            self.duplicates += 1
+            return False
+        if url:
+            self.urls.add(url)
+        self.titles.add(title)
+        return True
+
+
+@app.route("/collect/batch", methods=["POST"])
+def collect_batch():
+    """Fetch many topics (and pages) in parallel and stream de-duplicated articles as NDJSON.
+
+    Body: {"topics": [...], "page_size": 5, "pages": 1, "full_text": false}. Each fetch that completes
+    emits one line {"topic", "page", "articles"}; a final {"done": true, ...} line
+    carries totals.
+    """
+    data = wire.get_payload() or {}
+    topics = data.get("topics")
+    if not isinstance(topics, list) or not topics or not all(isinstance(t, str) and t for t in topics):
+        return wire.respond({"error": "topics must be a non-empty list of strings"}, 400)
+    max_topics = config.env_int("COLLECT_BATCH_MAX_TOPICS", 100, 1, 1000)
+    if len(topics) > max_topics:
+        return wire.respond({"error": f"at most {max_topics} topics per batch"}, 400)
+    page_size = config.to_int(data.get("page_size"), 5, 1, 100)
+    pages = config.to_int(data.get("pages"), 1, 1, 10)
+    workers = config.env_int("COLLECT_MAX_CONCURRENCY", 8, 1, 64)
+    api_key = os.getenv("NEWS_API_KEY")
+
+    def fetch(topic, page):
+        if not api_key:
+            return _sample_news(topic) if page == 1 else []
+        return _fetch_articles(topic, api_key, page_size=page_size, page=page)
+
+    fulltext = _get_fulltext() if _full_text_requested(data) else None
+
+    def generate():
+        deduper = ArticleDeduper(
+            near_duplicates=config.env_flag("COLLECT_NEAR_DUPLICATES"))
+        total = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(fetch, topic, page): (topic, page)
+                for topic in dict.fromkeys(topics)
+                for page in range(1, pages + 1)
+            }
+            for future in as_completed(futures):
+                topic, page = futures[future]
+                fresh = [dict(a, topic=topic) for a in future.result() if deduper.add(a)]
+                if fulltext is not None:
+                    # Only de-duplicated articles are fetched
+                    fresh = fulltext.enrich(fresh)
+                total += len(fresh)
+                yield json.dumps({"topic": topic, "page": page, "articles": fresh}) + "\n"
+        yield json.dumps({"done": True, "articles": total, "duplicates": deduper.duplicates}) + "\n"
+
+    return Response(generate(), mimetype="application/x-ndjson")
 
 # Optional GET route for browser-based testing
 @app.route("/collect", methods=["GET"])
 def collect_news_get():
-    if not (os.getenv("ENABLE_GET_TEST_ROUTES", "0").lower() in {"1", "true", "yes"}):
+    if not config.env_flag("ENABLE_GET_TEST_ROUTES"):
         return jsonify({"error": "GET testing routes disabled"}), 404
     topic = request.args.get("topic", "technology")
     # Re-use POST logic via internal call
     return collect_news.__wrapped__() if hasattr(collect_news, "__wrapped__") else collect_news()
 
+_readiness = readiness.instrument_app(app, "collector", _get_news_cache)
+
+
+def preload():
+    """Run once in the serving master before workers fork (see common/serve.py)."""
+    _readiness.warm_up()
+
+
 if __name__ == "__main__":
+    _readiness.warm_up()
     app.run(host="0.0.0.0", port=5000)
@@ -0,0 +1,224 @@
+"""Optional full-text enrichment: fetch each article's page and extract its main text.
+
+NewsAPI only returns a one-sentence ``description``. ``FullTextFetcher.enrich``
+downloads every article's ``source_url`` concurrently through the shared
+connection pool (``common.httpclient``). At most ``per_host`` requests run
+against any one host at a time. Each page is streamed through an
+incremental HTML parser, and reading stops after ``max_bytes`` bytes,
+``max_chars`` characters of text or ``timeout`` seconds, whichever comes
+first. Extracted text is cached by normalized URL (``FetchCache``), so
+concurrent requests for one page share a single download.
+
+An article whose page yields more text than its description gets that text
+as ``description``; the original is kept as ``teaser``. Articles whose page
+fails to load or parse are returned unchanged.
+"""
+import codecs
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+from collector.newscache import FetchCache
+from common import httpclient, metrics
+
+FETCH_SECONDS = metrics.histogram(
+    "fulltext_fetch_duration_seconds", "Article page download and extraction time", ("outcome",))
+BYTES_READ = metrics.counter(
+    "fulltext_bytes_read_total", "Article page bytes read before the byte budget stopped reading")
+
+_CHARSET = re.compile(r"charset=[\"']?([\w.:-]+)", re.I)
+_SPACE = re.compile(r"\s+")
+
+
+class MainTextParser(HTMLParser):
+    """Collects paragraph text, preferring paragraphs inside ``<article>`` or ``<main>``.
+
+    Text inside page chrome (scripts, navigation, headers, footers, asides,
+    forms) is skipped, as are paragraphs shorter than ``min_paragraph`` characters.
+    """
+
+    SKIP = frozenset(("script", "style", "noscript", "template", "svg", "nav", "header",
+                      "footer", "aside", "form", "button", "figure"))
+    BREAKS = frozenset(("p", "div", "article", "main", "section", "li", "br", "h1", "h2", "h3", "blockquote"))
+
+    def __init__(self, max_chars=20000, min_paragraph=40):
+        super().__init__()
+        self.max_chars = max_chars
+        self.min_paragraph = min_paragraph
+        self.skip_depth = 0
+        self.main_depth = 0
+        self.in_paragraph = False
+        self.buffer = []
+        self.main = []
+        self.other = []
+        self.chars = 0
+
+    @property
+    def full(self):
+        return self.chars >= self.max_chars
+
+    def _flush(self):
+        if self.in_paragraph:
+            text = _SPACE.sub(" ", "".join(self.buffer)).strip()
+            if len(text) >= self.min_paragraph:
+                (self.main if self.main_depth else self.other).append(text)
+                if self.main_depth:
+                    self.chars += len(text)
+        self.in_paragraph = False
+        self.buffer = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self.skip_depth += 1
+            return
+        if tag in self.BREAKS:
+            self._flush()
+        if tag in ("article", "main"):
+            self.main_depth += 1
+        if tag == "p":
+            self.in_paragraph = True
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in self.BREAKS:
+            self._flush()
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP:
+            self.skip_depth = max(0, self.skip_depth - 1)
+            return
+        if tag in self.BREAKS:
+            self._flush()
+        if tag in ("article", "main"):
+            self.main_depth = max(0, self.main_depth - 1)
+
+    def handle_data(self, data):
+        if self.in_paragraph and not self.skip_depth:
+            self.buffer.append(data)
+
+    def text(self):
+        self._flush()
+        paragraphs = self.main or self.other
+        out, total = [], 0
+        for paragraph in paragraphs:
+            if total >= self.max_chars:
+                break
+            out.append(paragraph[:self.max_chars - total])
+            total += len(out[-1]) + 2
+        return "\n\n".join(out)
+
+
+def _charset(content_type):
+    match = _CHARSET.search(content_type or "")
+    if match:
+        try:
+            return codecs.lookup(match.group(1)).name
+        except LookupError:
+            pass
+    return "utf-8"
+
+
+def fetch_text(url, timeout=5.0, max_bytes=512 * 1024, max_chars=20000):
+    """Main text of the HTML page at ``url``; returns (text, bytes read).
+
+    Raises on transport errors, HTTP errors and non-HTML responses.
+    """
+    deadline = time.monotonic() + timeout
+    res = httpclient.get(url, stream=True, timeout=timeout,
+                         headers={"Accept": "text/html,application/xhtml+xml"})
+    try:
+        res.raise_for_status()
+        content_type = res.headers.get("Content-Type", "")
+        if content_type and "html" not in content_type.lower():
+            raise ValueError(f"not an HTML page: {content_type}")
+        decoder = codecs.getincrementaldecoder(_charset(content_type))(errors="replace")
+        parser = MainTextParser(max_chars=max_chars)
+        read = 0
+        for chunk in res.iter_content(chunk_size=16384):
+            chunk = chunk[:max_bytes - read]
+            read += len(chunk)
+            parser.feed(decoder.decode(chunk))
+            # Stop downloading as soon as any budget is spent; the rest of the page is never read
+            if read >= max_bytes or parser.full or time.monotonic() > deadline:
+                break
+        parser.feed(decoder.decode(b"", final=True))
+        return parser.text(), read
+    finally:
+        res.close()
+
+
+class FullTextFetcher:
+    def __init__(self, max_bytes=512 * 1024, max_chars=20000, timeout=5.0, per_host=2,
+                 concurrency=8, cache_size=2048, cache_ttl=86400.0, normalize=None):
+        self.max_bytes = max_bytes
+        self.max_chars = max_chars
+        self.timeout = timeout
+        self.per_host = per_host
+        self.concurrency = concurrency
+        self.cache = FetchCache(ttl=cache_ttl, stale_ttl=0, max_entries=cache_size) if cache_size > 0 else None
+        self.normalize = normalize or (lambda url: url)
+        self._hosts = {}
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.bytes_read = 0
+        self.fetches = 0
+        self.failures = 0
+
+    def _host_slot(self, url):
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            slot = self._hosts.get(host)
+            if slot is None:
+                slot = self._hosts[host] = threading.BoundedSemaphore(self.per_host)
+            return slot
+
+    def _download(self, url):
+        with self._host_slot(url):
+            started = time.perf_counter()
+            try:
+                text, read = fetch_text(url, self.timeout, self.max_bytes, self.max_chars)
+            except Exception:
+                FETCH_SECONDS.observe(time.perf_counter() - started, outcome="error")
+                raise
+        FETCH_SECONDS.observe(time.perf_counter() - started, outcome="ok")
+        BYTES_READ.inc(read)
+        with self._stats_lock:
+            self.fetches += 1
+            self.bytes_read += read
+        return text
+
+    def text(self, url):
+        """Extracted text for ``url`` (None if the page could not be fetched)."""
+        try:
+            if self.cache is None:
+                return self._download(url)
+            return self.cache.get(self.normalize(url), lambda _: (self._download(url), {}))
+        except Exception:
+            with self._stats_lock:
+                self.failures += 1
+            return None
+
+    def enrich(self, articles):
+        """Copies of ``articles`` with ``description`` replaced by the page text where it is longer."""
+        urls = [a.get("source_url") for a in articles]
+        todo = [u for u in dict.fromkeys(urls) if isinstance(u, str) and u.startswith(("http://", "https://"))]
+        if not todo:
+            return list(articles)
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(todo))) as pool:
+            texts = dict(zip(todo, pool.map(self.text, todo)))
+        out = []
+        for article, url in zip(articles, urls):
+            text = texts.get(url)
+            if text and len(text) > len(article.get("description") or ""):
+                article = dict(article, description=text, teaser=article.get("description"))
+            out.append(article)
+        return out
+
+    def stats(self):
+        with self._stats_lock:
+            stats = {"fetches": self.fetches, "failures": self.failures, "bytes_read": self.bytes_read}
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        return stats
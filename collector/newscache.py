@@ -0,0 +1,126 @@
+"""Per-key response cache for upstream fetches (used for NewsAPI).
+
+* Fresh entries (younger than ``ttl``) are served without touching upstream.
+* Stale entries (up to ``ttl + stale_ttl`` old) are served immediately while a
+  background refresh runs (stale-while-revalidate).
+* Concurrent misses for the same key share one upstream fetch (single-flight).
+* A fetch may return ``NOT_MODIFIED`` (e.g. on HTTP 304 for a conditional
+  request) to keep the cached value and just restart its TTL.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+NOT_MODIFIED = object()
+
+
+class _Entry:
+    __slots__ = ("value", "validators", "fetched_at")
+
+    def __init__(self, value, validators, fetched_at):
+        self.value = value
+        self.validators = validators
+        self.fetched_at = fetched_at
+
+
+class _Flight:
+    __slots__ = ("done", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.error = None
+
+
+class FetchCache:
+    def __init__(self, ttl=300.0, stale_ttl=600.0, max_entries=512):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.metrics = {
+            "hits": 0,
+            "misses": 0,
+            "stale_served": 0,
+            "coalesced": 0,
+            "refreshes": 0,
+            "not_modified": 0,
+            "errors": 0,
+        }
+
+    def get(self, key, fetch):
+        """Return the cached value for ``key``, calling ``fetch(validators)`` when needed.
+
+        ``fetch`` returns ``(value, validators)`` or ``NOT_MODIFIED``. If it raises,
+        the last cached value is served when there is one (however old);
+        otherwise the exception propagates to the caller.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = now - entry.fetched_at
+                if age < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.metrics["hits"] += 1
+                    return entry.value
+                if age < self.ttl + self.stale_ttl:
+                    self.metrics["stale_served"] += 1
+                    if key not in self._flights:
+                        self._flights[key] = _Flight()
+                        threading.Thread(target=self._refresh, args=(key, fetch), daemon=True).start()
+                    return entry.value
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.metrics["coalesced"] += 1
+                leader = False
+            else:
+                flight = self._flights[key] = _Flight()
+                self.metrics["misses"] += 1
+                leader = True
+
+        if leader:
+            self._run_flight(key, fetch, flight)
+        else:
+            flight.done.wait()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            return entry.value
+        raise flight.error or RuntimeError(f"fetch for {key!r} failed")
+
+    def _refresh(self, key, fetch):
+        with self._lock:
+            self.metrics["refreshes"] += 1
+            flight = self._flights[key]
+        self._run_flight(key, fetch, flight)
+
+    def _run_flight(self, key, fetch, flight):
+        with self._lock:
+            entry = self._entries.get(key)
+        try:
+            result = fetch(entry.validators if entry is not None else {})
+            with self._lock:
+                if result is NOT_MODIFIED and entry is not None:
+                    self.metrics["not_modified"] += 1
+                    entry.fetched_at = time.time()
+                elif result is not NOT_MODIFIED:
+                    value, validators = result
+                    self._entries[key] = _Entry(value, validators or {}, time.time())
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self.metrics["errors"] += 1
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def stats(self):
+        with self._lock:
+            return dict(self.metrics, entries=len(self._entries), ttl=self.ttl, stale_ttl=self.stale_ttl)
@@ -0,0 +1,127 @@
+"""Embedded SQLite store for collected articles and their pipeline results.
+
+Articles are keyed by a hash of their URL (the title when there is none) and
+carry a hash of their title + description. ``upsert`` records a collection
+pass and splits the articles into ones that still need summarizing/scoring
+(new, changed, or never finished) and ones whose stored results can be
+reused, so repeated polling only sends new work downstream.
+
+    store = ArticleStore("articles.db")
+    pending, done = store.upsert("ai", articles)
+    ...
+    store.save_result(article, summary, polarity)
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    url_hash TEXT PRIMARY KEY,
+    url TEXT,
+    topic TEXT NOT NULL,
+    title TEXT,
+    description TEXT,
+    content_hash TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    summary TEXT,
+    polarity REAL,
+    summarized_at REAL
+);
+CREATE INDEX IF NOT EXISTS articles_topic ON articles (topic, fetched_at);
+CREATE INDEX IF NOT EXISTS articles_fetched_at ON articles (fetched_at);
+"""
+
+
+def _sha1(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def url_hash(article):
+    url = (article.get("source_url") or "").strip()
+    return _sha1(url if url else "title:" + (article.get("title") or ""))
+
+
+def content_hash(article):
+    return _sha1((article.get("title") or "") + "\n" + (article.get("description") or ""))
+
+
+class ArticleStore:
+    def __init__(self, path):
+        self.path = path
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def upsert(self, topic, articles, now=None):
+        """Record ``articles`` as fetched for ``topic``.
+
+        Returns ``(pending, done)``: ``pending`` are the input articles that are new,
+        changed since the last fetch, or not yet summarized and scored; ``done`` are
+        stored results (``title``, ``summary``, ``source_url``, ``polarity``) for the rest.
+        """
+        now = time.time() if now is None else now
+        pending, done = [], []
+        with self._lock, self._db:
+            for article in articles:
+                key, digest = url_hash(article), content_hash(article)
+                row = self._db.execute(
+                    "SELECT content_hash, summary, polarity FROM articles WHERE url_hash = ?", (key,)
+                ).fetchone()
+                if row is not None and row[0] == digest and row[1] is not None and row[2] is not None:
+                    self._db.execute(
+                        "UPDATE articles SET topic = ?, fetched_at = ? WHERE url_hash = ?", (topic, now, key)
+                    )
+                    done.append({
+                        "title": article.get("title"),
+                        "summary": row[1],
+                        "source_url": article.get("source_url"),
+                        "polarity": row[2],
+                    })
+                    continue
+                self._db.execute(
+                    "INSERT INTO articles (url_hash, url, topic, title, description, content_hash, fetched_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(url_hash) DO UPDATE SET topic = excluded.topic, title = excluded.title, "
+                    "description = excluded.description, content_hash = excluded.content_hash, "
+                    "fetched_at = excluded.fetched_at, "
+                    "summary = CASE WHEN content_hash = excluded.content_hash THEN summary END, "
+                    "polarity = CASE WHEN content_hash = excluded.content_hash THEN polarity END",
+                    (key, article.get("source_url"), topic, article.get("title"),
+                     article.get("description"), digest, now),
+                )
+                pending.append(article)
+        return pending, done
+
+    def save_result(self, article, summary=None, polarity=None):
+        """Store the summary and/or polarity for an article (matched by URL, else title)."""
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE articles SET summary = COALESCE(?, summary), polarity = COALESCE(?, polarity), "
+                "summarized_at = ? WHERE url_hash = ?",
+                (summary, polarity, time.time(), url_hash(article)),
+            )
+
+    def recent(self, topic, limit=50):
+        """Most recently fetched articles for ``topic``, newest first."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT title, url, description, summary, polarity, fetched_at FROM articles "
+                "WHERE topic = ? ORDER BY fetched_at DESC LIMIT ?",
+                (topic, limit),
+            ).fetchall()
+        keys = ("title", "source_url", "description", "summary", "polarity", "fetched_at")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def stats(self):
+        with self._lock:
+            total, summarized = self._db.execute(
+                "SELECT COUNT(*), COUNT(summary) FROM articles"
+            ).fetchone()
+        return {"articles": total, "summarized": summarized}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,57 @@
+"""Settings from the environment, parsed the same way by every service.
+
+Settings are read at call time, so tests and operators can change them
+without restarting the process. A missing or malformed value falls back to
+the default, and ``low``/``high`` clamp a parsed value into range.
+
+    workers = config.env_int("JOB_WORKERS", 2, low=1)
+    if config.env_flag("COLLECT_FULL_TEXT"):
+        ...
+
+``to_int``/``to_float`` apply the same rules to values from request bodies.
+"""
+import os
+
+TRUE = frozenset(("1", "true", "yes"))
+
+
+def _clamp(value, low, high):
+    if low is not None:
+        value = max(low, value)
+    if high is not None:
+        value = min(high, value)
+    return value
+
+
+def to_int(value, default, low=None, high=None):
+    """``value`` as an int clamped to [low, high]; ``default`` when missing or malformed."""
+    try:
+        number = value if isinstance(value, int) else int(float(value))
+    except (TypeError, ValueError, OverflowError):
+        return default
+    return _clamp(number, low, high)
+
+
+def to_float(value, default, low=None, high=None):
+    """``value`` as a float clamped to [low, high]; ``default`` when missing or malformed."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return default
+    return _clamp(number, low, high)
+
+
+def env_int(name, default, low=None, high=None):
+    return to_int(os.getenv(name), default, low, high)
+
+
+def env_float(name, default, low=None, high=None):
+    return to_float(os.getenv(name), default, low, high)
+
+
+def env_flag(name, default=False):
+    """True when the variable is "1", "true" or "yes" (any case); ``default`` when unset."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in TRUE
@@ -0,0 +1,75 @@
+"""Shared, connection-pooled HTTP client for inter-service calls.
+
+Each process keeps one ``requests.Session`` with a sized connection pool,
+keep-alive, and retry with backoff on connect errors. Call sites use the
+module-level ``get``/``post`` helpers instead of bare ``requests.get/post``.
+
+Config (env):
+  HTTP_POOL_SIZE       max pooled connections per host (default 20)
+  HTTP_RETRIES         retries on connect errors (default 2)
+  HTTP_RETRY_BACKOFF   backoff factor in seconds (default 0.2)
+"""
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from common import config
+
+_session = None
+_session_pid = None
+_lock = threading.Lock()
+
+
+def build_session(pool_size=None, retries=None, backoff=None):
+    pool_size = pool_size if pool_size is not None else config.env_int("HTTP_POOL_SIZE", 20, low=1)
+    retries = retries if retries is not None else config.env_int("HTTP_RETRIES", 2, low=0)
+    backoff = backoff if backoff is not None else config.env_float("HTTP_RETRY_BACKOFF", 0.2, low=0.0)
+    # Only connection failures are retried: the request never reached the
+    # server, so it is safe even for POST.
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=0,
+        status=0,
+        other=0,
+        backoff_factor=backoff,
+        allowed_methods=None,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session():
+    """Return this process's pooled session, rebuilding it after a fork."""
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _lock:
+            if _session is None or _session_pid != pid:
+                _session = build_session()
+                _session_pid = pid
+    return _session
+
+
+def reset_session():
+    global _session, _session_pid
+    with _lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+        _session_pid = None
+
+
+def get(url, **kwargs):
+    return get_session().get(url, **kwargs)
+
+
+def post(url, **kwargs):
+    return get_session().post(url, **kwargs)
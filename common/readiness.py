@@ -0,0 +1,114 @@
+"""Readiness probes that are separate from the liveness ``/`` routes.
+
+``/`` answers as soon as the process can serve HTTP. ``GET /ready`` returns
+503 until the service's warm-up hook has finished, then 200. Warm-up covers
+loading lexicons, priming caches and recovering queued work. An orchestrator
+should route traffic only to replicas whose ``/ready`` is 200.
+
+    readiness = readiness.instrument_app(app, "sentiment", warm_up)
+    def preload():
+        readiness.warm_up()      # common/serve.py calls this before forking workers
+
+If nothing has run the warm-up yet (for example the Flask dev server or a
+test client), the first ``/ready`` probe starts it in a background thread.
+The time from process start to ready is returned by ``/ready``, logged once,
+and recorded in the ``service_startup_seconds`` histogram.
+"""
+import os
+import sys
+import threading
+import time
+
+from common import metrics
+
+STARTUP_SECONDS = metrics.histogram(
+    "service_startup_seconds", "Process start to ready", ("service",),
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0))
+
+
+def process_start_time():
+    """Wall-clock time this process started (from /proc when available, else now)."""
+    try:
+        with open("/proc/self/stat") as f:
+            # Field 22, start time in clock ticks since boot
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        age = time.clock_gettime(time.CLOCK_BOOTTIME) - start_ticks / os.sysconf("SC_CLK_TCK")
+        return time.time() - max(0.0, age)
+    except (AttributeError, OSError, IndexError, ValueError):
+        return time.time()
+
+
+class Readiness:
+    def __init__(self, service, warm_up=None):
+        self.service = service
+        self._warm_up = warm_up
+        self.started_at = process_start_time()
+        self.ready_at = None
+        self.warm_up_seconds = None
+        self.error = None
+        self._lock = threading.Lock()
+        self._started = False
+        self._done = threading.Event()
+
+    @property
+    def ready(self):
+        return self._done.is_set() and self.error is None
+
+    def warm_up(self):
+        """Run the warm-up hook once (later calls wait for the first); returns True if ready."""
+        with self._lock:
+            run, self._started = not self._started, True
+        if not run:
+            self._done.wait()
+            return self.ready
+        start = time.perf_counter()
+        try:
+            if self._warm_up is not None:
+                self._warm_up()
+        except Exception as exc:
+            self.error = f"{type(exc).__name__}: {exc}"
+            print(f"{self.service}: warm-up failed: {self.error}", file=sys.stderr)
+        self.warm_up_seconds = time.perf_counter() - start
+        self.ready_at = time.time()
+        self._done.set()
+        if self.error is None:
+            STARTUP_SECONDS.observe(self.startup_seconds(), service=self.service)
+            print(f"{self.service}: ready in {self.startup_seconds():.2f}s "
+                  f"(warm-up {self.warm_up_seconds:.2f}s)", file=sys.stderr)
+        return self.ready
+
+    def start_background(self):
+        """Start the warm-up in a daemon thread unless it has already started."""
+        with self._lock:
+            if self._started:
+                return
+        threading.Thread(target=self.warm_up, daemon=True).start()
+
+    def startup_seconds(self):
+        return None if self.ready_at is None else max(0.0, self.ready_at - self.started_at)
+
+    def status(self):
+        return {
+            "service": self.service,
+            "ready": self.ready,
+            "startup_seconds": round(self.startup_seconds(), 3) if self.ready_at is not None else None,
+            "warm_up_seconds": round(self.warm_up_seconds, 3) if self.warm_up_seconds is not None else None,
+            "error": self.error,
+        }
+
+
+def instrument_app(app, service, warm_up=None):
+    """Serve ``GET /ready`` for ``app``; returns the service's ``Readiness``."""
+    from flask import jsonify
+
+    readiness = Readiness(service, warm_up)
+
+    @app.route("/ready", methods=["GET"])
+    def ready():
+        status = readiness.status()
+        if not status["ready"]:
+            readiness.start_background()
+            return jsonify(status), 503
+        return jsonify(status)
+
+    return readiness
@@ -0,0 +1,156 @@
+"""Production launcher for the services.
+
+    python -m common.serve collector|summarizer|sentiment [--workers N] [--threads N]
+
+Runs the service's Flask app under gunicorn with pre-forked worker processes,
+each serving requests on a thread pool (``gthread``). One worker is the
+default, because a lot of state is kept per process and more workers split it:
+
+  - /metrics counters and histograms (each scrape sees one worker's numbers)
+  - the collector's NewsAPI response cache and full-text cache
+  - the summarizer's in-memory summary LRU, circuit breaker and latency window
+  - the sentiment polarity cache, topic moods and trends
+
+Raise ``SERVE_WORKERS`` only for CPU-bound load, and accept those splits when
+you do. With more than one worker, state that must stay consistent across
+workers moves to a file they all share: unless it is already set, the
+service's variable in ``SHARED_STATE`` (``SENTIMENT_STATE_PATH``) points at a
+fresh temporary file that is removed when the server exits. The app module is
+imported once in the master before forking (``preload_app``), and the
+module's optional ``preload()`` hook runs there too, so heavy start-up work
+such as building the sentiment lexicon is shared copy-on-write by every
+worker instead of repeated per worker. Each worker then runs the module's
+optional ``post_fork()`` hook to start its own background threads (threads
+do not survive a fork). On SIGTERM workers stop accepting
+connections, finish in-flight requests for up to ``SERVE_GRACEFUL_TIMEOUT``
+seconds and then run the module's optional ``shutdown()`` hook.
+
+Settings (flags override the environment):
+
+  SERVE_BIND              address to listen on (default 0.0.0.0:5000)
+  SERVE_WORKERS           worker processes (default 1)
+  SERVE_THREADS           request threads per worker (default 8)
+  SERVE_TIMEOUT           seconds before a silent worker is restarted (default 120)
+  SERVE_GRACEFUL_TIMEOUT  seconds to finish requests on shutdown (default 30)
+
+``--dev`` (or gunicorn not being installed) falls back to Flask's threaded
+development server in a single process.
+"""
+import argparse
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+
+from common import config
+
+SERVICES = {
+    "collector": "collector.app",
+    "summarizer": "summarizer.app",
+    "sentiment": "sentiment.app",
+}
+
+# Per-process state that several workers must share through a file: service -> (variable, file name)
+SHARED_STATE = {
+    "sentiment": ("SENTIMENT_STATE_PATH", "sentiment_state.db"),
+}
+
+
+def run_hook(service, name):
+    """Run the service module's optional ``name()`` hook; returns the module."""
+    module = importlib.import_module(SERVICES[service])
+    hook = getattr(module, name, None)
+    if hook is not None:
+        hook()
+    return module
+
+
+def load(service):
+    """Import a service module and run its preload hook; returns the module."""
+    return run_hook(service, "preload")
+
+
+def options(bind=None, workers=None, threads=None):
+    """gunicorn settings from arguments, falling back to SERVE_* environment variables."""
+    return {
+        "bind": bind or os.getenv("SERVE_BIND", "0.0.0.0:5000"),
+        "workers": workers or config.env_int("SERVE_WORKERS", 1, low=1),
+        "threads": threads or config.env_int("SERVE_THREADS", 8, low=1),
+        "worker_class": "gthread",
+        "timeout": config.env_int("SERVE_TIMEOUT", 120, low=1),
+        "graceful_timeout": config.env_int("SERVE_GRACEFUL_TIMEOUT", 30, low=0),
+        "preload_app": True,
+        "accesslog": os.getenv("SERVE_ACCESS_LOG") or None,
+    }
+
+
+def share_state(service, workers):
+    """Point the service's shared-state variable at a new temporary file when several workers run.
+
+    Returns the directory holding the file, or None if nothing was set (one
+    worker, no shared state, or the variable is already set).
+    """
+    if service not in SHARED_STATE or workers <= 1:
+        return None
+    name, filename = SHARED_STATE[service]
+    if name in os.environ:
+        return None
+    directory = tempfile.mkdtemp(prefix=f"{service}-state-")
+    os.environ[name] = os.path.join(directory, filename)
+    return directory
+
+
+def run_gunicorn(service, opts):
+    from gunicorn.app.base import BaseApplication
+
+    class ServiceApplication(BaseApplication):
+        def load_config(self):
+            for key, value in opts.items():
+                self.cfg.set(key, value)
+            self.cfg.set("post_fork", lambda server, worker: run_hook(service, "post_fork"))
+            self.cfg.set("worker_exit", lambda server, worker: run_hook(service, "shutdown"))
+
+        def load(self):
+            return load(service).app
+
+    # Set before the app is preloaded, so the master and every forked worker see the same file
+    state_dir = share_state(service, opts["workers"])
+    try:
+        ServiceApplication().run()
+    finally:
+        if state_dir is not None:
+            shutil.rmtree(state_dir, ignore_errors=True)
+
+
+def run_dev(service, opts):
+    host, _, port = opts["bind"].rpartition(":")
+    app = load(service).app
+    run_hook(service, "post_fork")  # the dev server is its own single worker
+    app.run(host=host or "0.0.0.0", port=int(port), threaded=True)
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Serve one of the services")
+    p.add_argument("service", choices=sorted(SERVICES))
+    p.add_argument("--bind", help="host:port (default $SERVE_BIND or 0.0.0.0:5000)")
+    p.add_argument("--workers", type=int, help="Worker processes (default $SERVE_WORKERS)")
+    p.add_argument("--threads", type=int, help="Threads per worker (default $SERVE_THREADS)")
+    p.add_argument("--dev", action="store_true", help="Use the single-process Flask dev server")
+    args = p.parse_args(argv)
+    opts = options(args.bind, args.workers, args.threads)
+
+    if not args.dev:
+        try:
+            import gunicorn  # noqa: F401
+        except ImportError:
+            print("gunicorn is not installed; falling back to the Flask dev server", file=sys.stderr)
+            args.dev = True
+    if args.dev:
+        run_dev(args.service, opts)
+    else:
+        run_gunicorn(args.service, opts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+"""Small numeric helpers shared by the services, the coordinator and the benchmarks."""
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of ``values`` (0.0 for an empty sequence)."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def mood(avg_polarity):
+    """positive / negative / neutral label for an average polarity, as /analyze reports it."""
+    return "positive" if avg_polarity > 0.1 else "negative" if avg_polarity < -0.1 else "neutral"
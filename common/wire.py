@@ -0,0 +1,193 @@
+"""Content-negotiated request/response encodings for the service APIs.
+
+Bodies are JSON by default. A client may instead send and ask for
+MessagePack (``Content-Type`` / ``Accept: application/msgpack``), and may
+compress request bodies with gzip or zstd (``Content-Encoding``). Responses
+are compressed when the client's ``Accept-Encoding`` allows it and the body
+is at least ``WIRE_COMPRESS_MIN_BYTES`` (default 1024). MessagePack and zstd
+are optional dependencies (``msgpack``, ``zstandard``); without them the
+services only offer JSON and gzip.
+
+Request bodies larger than ``MAX_REQUEST_BYTES`` (default 8 MiB), before or
+after decompression, are rejected with 413 instead of being decoded.
+
+    wire.instrument_app(app)           # once per app: 413 answers in the negotiated format
+    data = wire.get_payload()          # in a Flask view, instead of request.get_json()
+    return wire.respond(result)        # instead of jsonify(result)
+
+    data = wire.post(url, payload, timeout=10, fmt="msgpack")  # client side
+"""
+import gzip
+import io
+import json
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+from common import config
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+_MSGPACK_TYPES = (MSGPACK, "application/x-msgpack", "application/vnd.msgpack")
+MAX_DECODED_BYTES = 64 * 1024 * 1024
+
+
+class PayloadTooLarge(ValueError):
+    """Request exceeds a size or count limit; answered with HTTP 413."""
+
+
+def max_request_bytes():
+    return config.env_int("MAX_REQUEST_BYTES", 8 * 1024 * 1024)
+
+
+def available_formats():
+    return ("json", "msgpack") if msgpack is not None else ("json",)
+
+
+def available_encodings():
+    return ("zstd", "gzip") if zstandard is not None else ("gzip",)
+
+
+def dumps(obj, content_type=JSON):
+    if content_type == MSGPACK:
+        return msgpack.packb(obj, use_bin_type=True)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def loads(body, content_type=JSON):
+    if content_type in _MSGPACK_TYPES:
+        if msgpack is None:
+            raise ValueError("MessagePack support is not installed")
+        return msgpack.unpackb(body, raw=False)
+    return json.loads(body)
+
+
+def compress(body, encoding):
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=5)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(body)
+    return body
+
+
+def decompress(body, encoding, max_size=MAX_DECODED_BYTES):
+    encoding = (encoding or "identity").strip().lower()
+    if encoding == "identity":
+        return body
+    if encoding == "gzip":
+        out = gzip.GzipFile(fileobj=io.BytesIO(body)).read(max_size + 1)
+    elif encoding == "zstd" and zstandard is not None:
+        out = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(body)).read(max_size + 1)
+    else:
+        raise ValueError(f"unsupported Content-Encoding {encoding!r}")
+    if len(out) > max_size:
+        raise PayloadTooLarge(f"decoded body is larger than {max_size} bytes")
+    return out
+
+
+def _media_type(header):
+    return (header or "").split(";", 1)[0].strip().lower()
+
+
+def _accepts(header, value):
+    """True if ``value`` is listed in an Accept-style header with a non-zero q."""
+    for part in (header or "").split(","):
+        name, *params = [p.strip() for p in part.split(";")]
+        if name.lower() != value:
+            continue
+        for param in params:
+            key, _, q = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    return float(q) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+def get_payload():
+    """Decoded request body for the current Flask request (None if empty or undecodable).
+
+    Raises ``PayloadTooLarge`` for bodies over ``MAX_REQUEST_BYTES``.
+    """
+    from flask import request
+
+    limit = max_request_bytes()
+    # Refuse on the declared length before reading anything
+    if request.content_length is not None and request.content_length > limit:
+        raise PayloadTooLarge(f"request body is larger than {limit} bytes")
+    body = request.get_data(cache=True)
+    if not body:
+        return None
+    if len(body) > limit:
+        raise PayloadTooLarge(f"request body is larger than {limit} bytes")
+    try:
+        body = decompress(body, request.headers.get("Content-Encoding"), max_size=limit)
+        return loads(body, _media_type(request.headers.get("Content-Type")) or JSON)
+    except PayloadTooLarge:
+        raise
+    except Exception:
+        return None
+
+
+def respond(obj, status=200):
+    """Flask response for ``obj`` in the format and compression the client accepts."""
+    from flask import Response, request
+
+    content_type = MSGPACK if msgpack is not None and any(
+        _accepts(request.headers.get("Accept"), t) for t in _MSGPACK_TYPES) else JSON
+    body = dumps(obj, content_type)
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if len(body) >= config.env_int("WIRE_COMPRESS_MIN_BYTES", 1024):
+        accept_encoding = request.headers.get("Accept-Encoding")
+        for encoding in available_encodings():
+            if _accepts(accept_encoding, encoding):
+                body = compress(body, encoding)
+                headers["Content-Encoding"] = encoding
+                break
+    return Response(body, status=status, content_type=content_type, headers=headers)
+
+
+def instrument_app(app):
+    """Answer ``PayloadTooLarge`` (and Flask's own 413s) with a 413 error body."""
+    from werkzeug.exceptions import RequestEntityTooLarge
+
+    @app.errorhandler(PayloadTooLarge)
+    def _too_large(error):
+        return respond({"error": str(error)}, 413)
+
+    @app.errorhandler(RequestEntityTooLarge)
+    def _too_large_http(error):
+        return respond({"error": "request body is too large"}, 413)
+
+
+def post(url, payload, timeout=10, fmt="json", encoding=None):
+    """POST ``payload`` encoded as ``fmt`` (json|msgpack), asking for the same format back.
+
+    ``encoding`` (gzip|zstd) compresses the request body. Compressed responses
+    are decoded transparently. Returns the decoded response body; raises on
+    HTTP errors like ``requests``' ``raise_for_status``.
+    """
+    from common import httpclient
+
+    content_type = MSGPACK if fmt == "msgpack" and msgpack is not None else JSON
+    body = dumps(payload, content_type)
+    headers = {
+        "Content-Type": content_type,
+        "Accept": content_type,
+        "Accept-Encoding": ", ".join(available_encodings()),
+    }
+    if encoding:
+        body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+    res = httpclient.post(url, data=body, headers=headers, timeout=timeout)
+    res.raise_for_status()
+    return loads(res.content, _media_type(res.headers.get("Content-Type")) or JSON)
@@ -5,30 +5,48 @@
 
 Usage:
   python coordinator.py --topic ai
+  python coordinator.py --mode async --topic ai --topic science
+  python coordinator.py --store articles.db --topic ai
+
+The async mode pipelines the stages per article: each collected article is
+summarized on its own, and each finished summary is scored right away, with
+bounded queues between the stages for backpressure. Topics run concurrently
+and per-stage timings are printed at the end.
 """
-import requests
+from common import stats, wire
+from common.articlestore import ArticleStore
+from common.neardup import NearDuplicateIndex, article_text, cluster
 import argparse
+import asyncio
+import itertools
+import os
 import sys
 import json
+import time
 
 
 def post(url, payload, timeout=10):
+    # WIRE_FORMAT=msgpack sends and asks for MessagePack (see common/wire.py)
     try:
-        r = requests.post(url, json=payload, timeout=timeout)
-        r.raise_for_status()
-        return r.json()
+        return wire.post(url, payload, timeout=timeout, fmt=os.getenv("WIRE_FORMAT", "json"))
     except Exception as e:
         print(f"ERROR POST {url}: {e}")
         return None
 
 
-def run_pipeline(topic, collector_url, summarizer_url, sentiment_url):
+def run_pipeline(topic, collector_url, summarizer_url, sentiment_url, store=None, near_duplicates=False):
     print(f"1) Collecting news for topic: {topic}")
     collected = post(f"{collector_url}/collect", {"topic": topic})
     if collected is None:
         print("Collect step failed. Exiting.")
         return 1
 
+    reused = []
+    if store is not None and isinstance(collected, list):
+        # Only new or changed articles go downstream; the rest reuse stored results
+        collected, reused = store.upsert(topic, collected)
+        print(f"   {len(reused)} unchanged article(s) reused from the store, {len(collected)} to process")
+
     # If collector already forwarded to summarizer it may return summaries (have 'summary')
     if isinstance(collected, dict) and collected.get("overall_tone"):
         # Collector forwarded all the way through
@@ -39,12 +57,21 @@ def run_pipeline(topic, collector_url, summarizer_url, sentiment_url):
     if isinstance(collected, list) and collected and isinstance(collected[0], dict) and "summary" in collected[0]:
         summaries = collected
         print("Collector returned summaries; skipping summarizer step.")
+    elif not collected:
+        summaries = []
     else:
         print("2) Summarizing articles")
-        summaries = post(f"{summarizer_url}/summarize", {"articles": collected})
+        reps = cluster(collected) if near_duplicates else list(range(len(collected)))
+        unique = [i for i, r in enumerate(reps) if r == i]
+        if len(unique) < len(collected):
+            print(f"   {len(collected) - len(unique)} near-duplicate(s) will reuse their story's summary")
+        summaries = post(f"{summarizer_url}/summarize", {"articles": [collected[i] for i in unique], "include_llm_output": False})
         if summaries is None:
             print("Summarize step failed. Exiting.")
             return 1
+        if isinstance(summaries, list) and len(unique) < len(collected):
+            by_rep = dict(zip(unique, summaries))
+            summaries = [_fan_out(by_rep[r], a) for a, r in zip(collected, reps)]
 
     # If summarizer forwarded to sentiment it may return final analysis
     if isinstance(summaries, dict) and summaries.get("overall_tone"):
@@ -53,25 +80,228 @@ def run_pipeline(topic, collector_url, summarizer_url, sentiment_url):
         return 0
 
     print("3) Analyzing sentiment")
-    analysis = post(f"{sentiment_url}/analyze", {"summaries": summaries, "topic": topic})
+    if store is not None:
+        analysis = {"sentiments": []} if not summaries else post(
+            f"{sentiment_url}/analyze", {"summaries": summaries, "topic": topic, "include_sentiments": True})
+    else:
+        analysis = post(f"{sentiment_url}/analyze", {"summaries": summaries, "topic": topic})
     if analysis is None:
         print("Analyze step failed. Exiting.")
         return 1
+    if store is not None:
+        analysis = _store_results(store, topic, collected, summaries, analysis, reused)
 
     print("Final analysis:")
     print(json.dumps(analysis, indent=2))
     return 0
 
 
+def _fan_out(summary, article):
+    """Copy a cluster representative's summary onto one of its near-duplicates."""
+    return dict(summary, title=article.get("title"), source_url=article.get("source_url"))
+
+
+def _store_results(store, topic, articles, summaries, analysis, reused):
+    """Save new summaries and polarities, then report the mood over all of the topic's articles."""
+    scored = analysis.get("sentiments") or []
+    for article, summary, item in zip(articles, summaries, scored):
+        store.save_result(article, summary.get("summary"), item.get("polarity"))
+    polarities = [r["polarity"] for r in reused] + [item["polarity"] for item in scored]
+    avg = sum(polarities) / len(polarities) if polarities else 0.0
+    mood = stats.mood(avg)
+    return {
+        "message": f"News about {topic} is currently: {mood} 📊",
+        "mood": mood,
+        "average_polarity": round(avg, 2),
+        "scored": len(scored),
+        "reused": len(reused),
+    }
+
+
+async def orchestrate(topics, collector_url, summarizer_url, sentiment_url,
+                      summarize_workers=4, sentiment_workers=2, queue_size=16, sentiment_batch=16,
+                      store=None, near_duplicates=False):
+    """Run collect -> summarize -> analyze for ``topics`` with per-article stage overlap.
+
+    With an ``ArticleStore``, only new or changed articles are summarized and scored;
+    stored polarities of unchanged ones still count toward each topic's mood.
+    With ``near_duplicates``, articles are clustered across all topics with
+    MinHash/LSH and only one per cluster is summarized; the rest get a copy.
+
+    Returns a report dict with per-topic results and per-stage timings.
+    """
+    summarize_q = asyncio.Queue(maxsize=queue_size)
+    sentiment_q = asyncio.Queue(maxsize=queue_size)
+    results = {t: {"collected": 0, "reused": 0, "near_duplicates": 0, "polarities": [], "errors": 0, "ok": True}
+               for t in topics}
+    index = NearDuplicateIndex() if near_duplicates else None
+    rep_summaries = {}  # cluster key -> summary dict, or None if summarizing it failed
+    followers = {}  # cluster key -> [(topic, article)] waiting on that summary
+    keys = itertools.count()
+    timings = {"collect": [], "summarize": [], "analyze": []}
+    spans = {}
+
+    async def call(stage, url, payload, timeout):
+        start = time.perf_counter()
+        out = await asyncio.to_thread(post, url, payload, timeout)
+        end = time.perf_counter()
+        timings[stage].append(end - start)
+        first, last = spans.get(stage, (start, end))
+        spans[stage] = (min(first, start), max(last, end))
+        return out
+
+    async def collect(topic):
+        articles = await call("collect", f"{collector_url}/collect", {"topic": topic}, 10)
+        if not isinstance(articles, list):
+            results[topic]["ok"] = False
+            return
+        results[topic]["collected"] = len(articles)
+        if store is not None:
+            articles, reused = store.upsert(topic, articles)
+            results[topic]["reused"] = len(reused)
+            results[topic]["polarities"].extend(r["polarity"] for r in reused)
+        for article in articles:
+            key = next(keys)
+            rep = index.add(key, article_text(article)) if index is not None else None
+            if rep is None:
+                await summarize_q.put((topic, article, key))
+                continue
+            results[topic]["near_duplicates"] += 1
+            if rep not in rep_summaries:
+                followers.setdefault(rep, []).append((topic, article))
+            elif rep_summaries[rep] is None:
+                results[topic]["errors"] += 1
+            else:
+                await sentiment_q.put((topic, _fan_out(rep_summaries[rep], article)))
+
+    async def summarize_worker():
+        while True:
+            topic, article, key = await summarize_q.get()
+            try:
+                out = await call("summarize", f"{summarizer_url}/summarize", {"articles": [article], "include_llm_output": False}, 20)
+                summary = out[0] if isinstance(out, list) and out else None
+                rep_summaries[key] = summary
+                waiting = [(topic, article)] + followers.pop(key, [])
+                for t, a in waiting:
+                    if summary is None:
+                        results[t]["errors"] += 1
+                    else:
+                        await sentiment_q.put((t, summary if a is article else _fan_out(summary, a)))
+            finally:
+                summarize_q.task_done()
+
+    async def sentiment_worker():
+        while True:
+            batch = [await sentiment_q.get()]
+            # Score whatever else is already waiting in the same request
+            while len(batch) < sentiment_batch and not sentiment_q.empty():
+                batch.append(sentiment_q.get_nowait())
+            try:
+                payload = {"summaries": [s for _, s in batch], "include_sentiments": True}
+                out = await call("analyze", f"{sentiment_url}/analyze", payload, 10)
+                scored = out.get("sentiments") if isinstance(out, dict) else None
+                if isinstance(scored, list) and len(scored) == len(batch):
+                    for (topic, summary), item in zip(batch, scored):
+                        results[topic]["polarities"].append(item["polarity"])
+                        if store is not None:
+                            store.save_result(summary, summary.get("summary"), item["polarity"])
+                else:
+                    for topic, _ in batch:
+                        results[topic]["errors"] += 1
+            finally:
+                for _ in batch:
+                    sentiment_q.task_done()
+
+    start = time.perf_counter()
+    workers = [asyncio.create_task(summarize_worker()) for _ in range(summarize_workers)]
+    workers += [asyncio.create_task(sentiment_worker()) for _ in range(sentiment_workers)]
+    try:
+        await asyncio.gather(*(collect(t) for t in topics))
+        await summarize_q.join()
+        await sentiment_q.join()
+    finally:
+        for w in workers:
+            w.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+    total = time.perf_counter() - start
+
+    report = {"topics": {}, "stages": {}, "total_seconds": round(total, 4)}
+    for topic, r in results.items():
+        avg = sum(r["polarities"]) / len(r["polarities"]) if r["polarities"] else 0.0
+        mood = stats.mood(avg)
+        report["topics"][topic] = {
+            "ok": r["ok"],
+            "message": f"News about {topic} is currently: {mood} 📊",
+            "mood": mood,
+            "average_polarity": round(avg, 2),
+            "collected": r["collected"],
+            "scored": len(r["polarities"]) - r["reused"],
+            "reused": r["reused"],
+            "near_duplicates": r["near_duplicates"],
+            "errors": r["errors"],
+        }
+    for stage, values in timings.items():
+        first, last = spans.get(stage, (0.0, 0.0))
+        report["stages"][stage] = {
+            "calls": len(values),
+            "busy_seconds": round(sum(values), 4),
+            "wall_seconds": round(last - first, 4),
+            "p50_ms": round(stats.percentile(values, 50) * 1000, 1),
+            "p95_ms": round(stats.percentile(values, 95) * 1000, 1),
+            "p99_ms": round(stats.percentile(values, 99) * 1000, 1),
+            "max_ms": round(max(values) * 1000, 1) if values else 0.0,
+        }
+    return report
+
+
+def run_pipeline_async(topics, collector_url, summarizer_url, sentiment_url, **kwargs):
+    print(f"Running async pipeline for topics: {', '.join(topics)}")
+    report = asyncio.run(orchestrate(topics, collector_url, summarizer_url, sentiment_url, **kwargs))
+    for topic, result in report["topics"].items():
+        print(f"\n[{topic}]")
+        print(json.dumps(result, indent=2))
+    print(f"\nStage timings (total {report['total_seconds']:.3f}s):")
+    print(f"  {'stage':<10} {'calls':>6} {'busy s':>9} {'wall s':>9} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for stage, t in report["stages"].items():
+        print(f"  {stage:<10} {t['calls']:>6} {t['busy_seconds']:>9.3f} {t['wall_seconds']:>9.3f} "
+              f"{t['p50_ms']:>9.1f} {t['p95_ms']:>9.1f} {t['max_ms']:>9.1f}")
+    return 0 if all(r["ok"] for r in report["topics"].values()) else 1
+
+
 def main():
     p = argparse.ArgumentParser()
-    p.add_argument("--topic", default="ai", help="Topic to collect")
+    p.add_argument("--topic", action="append", help="Topic to collect (repeat for several topics)")
     p.add_argument("--collector", default="http://localhost:5001", help="Collector base URL")
     p.add_argument("--summarizer", default="http://localhost:5002", help="Summarizer base URL")
     p.add_argument("--sentiment", default="http://localhost:5003", help="Sentiment base URL")
+    p.add_argument("--mode", choices=["sequential", "async"], default="sequential",
+                   help="sequential: one stage after another; async: per-article stage overlap")
+    p.add_argument("--summarize-workers", type=int, default=4, help="Concurrent summarize calls (async mode)")
+    p.add_argument("--sentiment-workers", type=int, default=2, help="Concurrent analyze calls (async mode)")
+    p.add_argument("--queue-size", type=int, default=16, help="Bound on each inter-stage queue (async mode)")
+    p.add_argument("--store", default=os.getenv("ARTICLE_STORE_PATH"),
+                   help="SQLite article store; only new or changed articles are summarized and scored")
+    p.add_argument("--near-duplicates", action="store_true",
+                   help="Summarize one article per cluster of near-duplicate stories and copy the summary to the rest")
     args = p.parse_args()
+    topics = args.topic or ["ai"]
+    store = ArticleStore(args.store) if args.store else None
+
+    if args.mode == "async":
+        sys.exit(run_pipeline_async(
+            topics, args.collector, args.summarizer, args.sentiment,
+            summarize_workers=args.summarize_workers,
+            sentiment_workers=args.sentiment_workers,
+            queue_size=args.queue_size,
+            store=store,
+            near_duplicates=args.near_duplicates,
+        ))
 
-    sys.exit(run_pipeline(args.topic, args.collector, args.summarizer, args.sentiment))
+    code = 0
+    for topic in topics:
+        code = run_pipeline(topic, args.collector, args.summarizer, args.sentiment, store=store,
+                            near_duplicates=args.near_duplicates) or code
+    sys.exit(code)
 
 
 if __name__ == "__main__":
@@ -1,27 +1,140 @@
 from flask import Flask, request, jsonify
-from textblob import TextBlob
 import os
-import requests
+import threading
 from markupsafe import escape
 from flask_cors import CORS
+from common import config, metrics, readiness, stats, wire
+from sentiment import workers
+from sentiment.engine import score_polarities
+from sentiment.moods import MoodBoard, PolarityCache, text_key
+from sentiment.shared import SharedMoodBoard, SharedTrendStore
+from sentiment.trends import TrendStore
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
+metrics.instrument_app(app, "sentiment")
+wire.instrument_app(app)
+
+SCORING_SECONDS = metrics.histogram(
+    "sentiment_scoring_duration_seconds", "Time to score one /analyze batch", ("engine",))
+TEXTS_SCORED = metrics.counter(
+    "sentiment_texts_scored_total", "Summaries scored", ("engine",))
+POLARITY_CACHE_LOOKUPS = metrics.counter(
+    "sentiment_cache_lookups_total", "Polarity cache lookups by result", ("result",))
+
+_state_lock = threading.Lock()
+_polarity_cache = None
+_polarity_cache_config = None
+_moods = None
+_moods_config = None
+_trends = None
+_trends_config = None
+
+
+def _get_polarity_cache():
+    """Polarity cache for the current SENTIMENT_CACHE_SIZE (None if disabled)."""
+    global _polarity_cache, _polarity_cache_config
+    size = config.env_int("SENTIMENT_CACHE_SIZE", 10000)
+    with _state_lock:
+        if size != _polarity_cache_config:
+            _polarity_cache = PolarityCache(size) if size > 0 else None
+            _polarity_cache_config = size
+        return _polarity_cache
+
+
+def _state_path():
+    """SQLite file holding the moods and trends every worker shares ("", the default, keeps them in memory)."""
+    return os.getenv("SENTIMENT_STATE_PATH", "")
+
+
+def _get_moods():
+    global _moods, _moods_config
+    path = _state_path()
+    # Keyed on the pid too, so a forked worker opens its own connection to the state file
+    settings = (config.env_float("MOOD_HALF_LIFE", 3600.0), config.env_int("MOOD_MAX_TOPICS", 10000),
+                path, os.getpid())
+    with _state_lock:
+        if settings != _moods_config:
+            if path:
+                _moods = SharedMoodBoard(path, half_life=settings[0], max_topics=settings[1])
+            else:
+                _moods = MoodBoard(half_life=settings[0], max_topics=settings[1])
+            _moods_config = settings
+        return _moods
+
+
+def _get_trends():
+    global _trends, _trends_config
+    path = _state_path()
+    settings = (config.env_int("TREND_BUCKET_SECONDS", 900, low=1), config.env_int("TREND_MAX_TOPICS", 2000),
+                path, os.getpid())
+    with _state_lock:
+        if settings != _trends_config:
+            if path:
+                _trends = SharedTrendStore(path, bucket_seconds=settings[0], max_topics=settings[1])
+            else:
+                _trends = TrendStore(bucket_seconds=settings[0], max_topics=settings[1])
+            _trends_config = settings
+        return _trends
+
+
+def _score_cached(texts, keys, engine):
+    """Polarities for ``texts``, scoring only those not already in the cache."""
+    cache = _get_polarity_cache()
+    if cache is None:
+        TEXTS_SCORED.inc(len(texts), engine=engine)
+        return workers.score(texts)
+    cache_keys = [(engine, key) for key in keys]
+    polarities = cache.get_many(cache_keys)
+    missing = {}
+    for i, polarity in enumerate(polarities):
+        if polarity is None:
+            missing.setdefault(cache_keys[i], []).append(i)
+    POLARITY_CACHE_LOOKUPS.inc(len(texts) - len(missing), result="hit")
+    POLARITY_CACHE_LOOKUPS.inc(len(missing), result="miss")
+    if missing:
+        # Each distinct missing text is scored once, even if repeated in the request
+        scored = workers.score([texts[indexes[0]] for indexes in missing.values()])
+        TEXTS_SCORED.inc(len(scored), engine=engine)
+        for indexes, polarity in zip(missing.values(), scored):
+            for i in indexes:
+                polarities[i] = polarity
+        cache.put_many(zip(missing, scored))
+    return polarities
+
 
 @app.route("/", methods=["GET"]) 
 def health():
-    return jsonify({"service": "sentiment", "status": "ok"})
+    cache = _get_polarity_cache()
+    # Liveness never touches the shared state file; topic counts are only reported from memory
+    shared = bool(_state_path())
+    return jsonify({
+        "service": "sentiment",
+        "status": "ok",
+        "cache": cache.stats() if cache is not None else None,
+        "topics": None if shared else len(_get_moods()),
+        "trend_topics": None if shared else len(_get_trends()),
+    })
 
 @app.route("/analyze", methods=["POST"])
 def analyze():
-    data = request.get_json(silent=True) or {}
+    data = wire.get_payload() or {}
     summaries = data.get("summaries", [])
+    limit = config.env_int("ANALYZE_MAX_SUMMARIES", 1000)
+    if len(summaries) > limit:
+        raise wire.PayloadTooLarge(f"at most {limit} summaries per request, got {len(summaries)}")
 
     sentiments = []
     total_polarity = 0.0
-    for item in summaries:
-        text = item.get("summary", "") or ""
-        polarity = float(TextBlob(text).sentiment.polarity)
+    texts = [item.get("summary", "") or "" for item in summaries]
+    keys = [text_key(text) for text in texts]
+    engine = os.getenv("SENTIMENT_ENGINE", "batch").lower()
+    with SCORING_SECONDS.time(engine=engine):
+        polarities = _score_cached(texts, keys, engine)
+    if isinstance(data.get("topic"), str) and data["topic"]:
+        fresh = _get_moods().update(data["topic"], keys, polarities)
+        _get_trends().add(data["topic"], fresh)
+    for item, polarity in zip(summaries, polarities):
         sentiments.append({
             "title": item.get("title"),
             "polarity": polarity,
@@ -30,7 +143,7 @@ def analyze():
         total_polarity += polarity
 
     avg_polarity = (total_polarity / len(sentiments)) if sentiments else 0.0
-    mood = "positive" if avg_polarity > 0.1 else "negative" if avg_polarity < -0.1 else "neutral"
+    mood = stats.mood(avg_polarity)
 
     # Extract topic from request if available, otherwise use generic term
     topic = data.get("topic", "this topic")
@@ -38,7 +151,30 @@ def analyze():
     # Simple, user-friendly message
     sentiment_message = f"News about {topic} is currently: {mood} 📊"
 
-    return jsonify({"message": sentiment_message, "mood": mood, "average_polarity": round(avg_polarity, 2)})
+    result = {"message": sentiment_message, "mood": mood, "average_polarity": round(avg_polarity, 2)}
+    # Per-summary scores are opt-in so the default response stays small
+    if data.get("include_sentiments"):
+        result["sentiments"] = sentiments
+    return wire.respond(result)
+
+
+@app.route("/mood/<topic>", methods=["GET"])
+def topic_mood(topic):
+    """Running mood for a topic from every distinct summary analyzed with it; nothing is re-scored."""
+    snapshot = _get_moods().get(topic)
+    if snapshot is None:
+        return jsonify({"error": f"no summaries analyzed for topic {topic!r}"}), 404
+    mood = stats.mood(snapshot["decayed_mean"])
+    return jsonify(dict(snapshot, topic=topic, mood=mood))
+
+
+@app.route("/trend/<topic>", methods=["GET"])
+def topic_trend(topic):
+    """Rolling 1h/24h/7d polarity windows, EWMA and change-point flag for a topic."""
+    trend = _get_trends().get(topic)
+    if trend is None:
+        return jsonify({"error": f"no summaries analyzed for topic {topic!r}"}), 404
+    return jsonify(dict(trend, topic=topic))
 
 
 @app.route("/summarizer", methods=["GET"])
@@ -46,6 +182,9 @@ def summarizer_page():
     """Render a simple HTML page showing summaries for a topic.
     This endpoint will call the collector and summarizer services internally.
     """
+    # Only this debug page makes outbound calls; keep requests out of the service's start-up
+    from common import httpclient
+
     topic = request.args.get("topic", "technology")
     # Allow overriding service locations via env vars (use service names in compose by default)
     collector_url = os.getenv("COLLECTOR_URL", "http://collector:5000")
@@ -56,7 +195,7 @@ def summarizer_page():
     collect_attempts = [collector_url, os.getenv("COLLECTOR_FALLBACK_URL", "http://localhost:5001")]
     for url in collect_attempts:
         try:
-            cresp = requests.post(f"{url}/collect", json={"topic": topic}, timeout=10)
+            cresp = httpclient.post(f"{url}/collect", json={"topic": topic}, timeout=10)
             cresp.raise_for_status()
             articles = cresp.json()
             break
@@ -71,7 +210,7 @@ def summarizer_page():
     summarize_attempts = [summarizer_url, os.getenv("SUMMARIZER_FALLBACK_URL", "http://localhost:5002")]
     for url in summarize_attempts:
         try:
-            sresp = requests.post(f"{url}/summarize", json={"articles": articles}, timeout=20)
+            sresp = httpclient.post(f"{url}/summarize", json={"articles": articles}, timeout=20)
             sresp.raise_for_status()
             summaries = sresp.json()
             break
@@ -104,5 +243,40 @@ def summarizer_page():
     html.append("</body></html>")
     return "\n".join(html)
 
+def _warm_up():
+    # Load the lexicon and prime the selected engine so the first /analyze does no set-up
+    score_polarities(["warm up the sentiment lexicon"])
+    _get_polarity_cache()
+    # The shared mood and trend store is opened lazily in each worker, never in the pre-fork master
+
+
+_readiness = readiness.instrument_app(app, "sentiment", _warm_up)
+
+
+def preload():
+    """Warm up once in the serving master so forked workers share the lexicon index."""
+    _readiness.warm_up()
+
+
+def shutdown():
+    workers.shutdown_pool()
+
+
+def reset_state():
+    """Drop the polarity cache and close the mood and trend stores; the next request rebuilds them."""
+    global _polarity_cache, _polarity_cache_config, _moods, _moods_config, _trends, _trends_config
+    with _state_lock:
+        for store in (_moods, _trends):
+            if isinstance(store, (SharedMoodBoard, SharedTrendStore)):
+                store.close()
+        _polarity_cache = _polarity_cache_config = None
+        _moods = _moods_config = _trends = _trends_config = None
+
+
 if __name__ == "__main__":
+    # Start the scoring pool now so the first large batch does not wait for it
+    pool_workers, _ = workers.pool_config()
+    if pool_workers > 1:
+        workers.get_pool(pool_workers)
+    _readiness.start_background()
     app.run(host="0.0.0.0", port=5000)
@@ -0,0 +1,144 @@
+"""Batch polarity scoring that reproduces TextBlob's PatternAnalyzer.
+
+TextBlob re-tokenizes every string with a chain of regex passes and walks the
+lexicon through a lazy dict for every call. The batch engine instead:
+
+* precompiles the pattern lexicon into a flat ``{word: (polarity, intensity,
+  is_modifier)}`` index once per process,
+* tokenizes each whitespace-separated token with pattern's own tokenizer only
+  the first time it is seen (tokens repeat heavily across news summaries), and
+* scores the whole request in one pass over the pre-resolved token entries.
+
+Polarities match ``TextBlob(text).sentiment.polarity`` to within
+``TOLERANCE`` (float rounding only). The one known divergence is text with a
+blank line (``\\n\\n``) inside it: pattern inserts a sentence marker there that
+can break a "not"/"very" chain across the paragraph; the engine scores the
+text as one paragraph.
+"""
+import os
+import threading
+
+TOLERANCE = 1e-9
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def _clamp(x):
+    return max(-1.0, min(x, 1.0))
+
+
+class BatchSentimentEngine:
+    def __init__(self):
+        from textblob.en import sentiment as lexicon
+        from textblob._text import EMOTICONS, PUNCTUATION, find_tokens
+
+        if dict.__len__(lexicon) == 0:
+            lexicon.load()
+        self._find_tokens = find_tokens
+        self._punctuation = PUNCTUATION
+        self.negations = frozenset(lexicon.negations)
+        # Only the POS-agnostic scores are used for plain strings
+        self.index = {
+            word: (psi[None][0], psi[None][2], "RB" in psi)
+            for word, psi in dict.items(lexicon)
+        }
+        self.emoticons = {}
+        for (_type, polarity), faces in EMOTICONS.items():
+            for face in faces:
+                self.emoticons.setdefault(face.lower(), polarity)
+        self._token_cache = {}
+        self._token_cache_lock = threading.Lock()
+
+    def _tokens(self, raw):
+        """Lowercased pattern tokens for one whitespace-delimited chunk (memoized)."""
+        tokens = self._token_cache.get(raw)
+        if tokens is None:
+            words = " ".join(self._find_tokens(raw)).split()
+            tokens = tuple((w, self.index.get(w)) for w in (w.lower() for w in words))
+            with self._token_cache_lock:
+                if len(self._token_cache) > 200_000:
+                    self._token_cache.clear()
+                self._token_cache[raw] = tokens
+        return tokens
+
+    def polarity(self, text):
+        return self.polarities([text])[0]
+
+    def polarities(self, texts):
+        negations = self.negations
+        emoticons = self.emoticons
+        punctuation = self._punctuation
+        tokens_for = self._tokens
+        results = []
+        for text in texts:
+            # Each assessment is [polarity, intensity, negated]
+            a = []
+            m = None
+            n = None
+            for raw in (text or "").split():
+                for w, entry in tokens_for(raw):
+                    if entry is not None:
+                        p, i, is_modifier = entry
+                        if m is None:
+                            a.append([p, i, False])
+                        else:
+                            last = a[-1]
+                            last[0] = _clamp(p * last[1])
+                            last[1] = i
+                        if n is not None:
+                            a[-1][1] = 1.0 / a[-1][1]
+                            a[-1][2] = True
+                        m = w if is_modifier else None
+                        n = w if w in negations else None
+                        continue
+                    if w in negations:
+                        n = w
+                    elif n and len(w.strip("'")) > 1:
+                        n = None
+                    if n is not None and m is not None and m.endswith("ly"):
+                        a[-1][2] = True
+                        n = None
+                    elif m and len(w) > 2:
+                        m = None
+                    if w == "!" and a:
+                        a[-1][0] = _clamp(a[-1][0] * 1.25)
+                    if w == "(!)":
+                        a.append([0.0, 1.0, False])
+                    if not w.isalpha() and len(w) <= 5 and w not in punctuation:
+                        face = emoticons.get(w)
+                        if face is not None:
+                            a.append([face, 1.0, False])
+            if a:
+                # "not good" = slightly bad, "not bad" = slightly good
+                results.append(sum(p * -0.5 if negated else p for p, _, negated in a) / len(a))
+            else:
+                results.append(0.0)
+        return results
+
+
+def get_engine():
+    """Return the process-wide engine, building the lexicon index on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = BatchSentimentEngine()
+    return _engine
+
+
+def score_polarities(texts):
+    """Polarity for each text, using the engine picked by SENTIMENT_ENGINE.
+
+    ``batch`` (default) scores the whole list with the precompiled lexicon engine;
+    ``textblob`` scores each text with TextBlob. The batch engine falls back to
+    TextBlob if it cannot be loaded.
+    """
+    if os.getenv("SENTIMENT_ENGINE", "batch").lower() == "batch":
+        try:
+            return [float(p) for p in get_engine().polarities(texts)]
+        except Exception:
+            pass
+    from textblob import TextBlob
+
+    return [float(TextBlob(text).sentiment.polarity) for text in texts]
@@ -0,0 +1,137 @@
+"""Polarity cache and incrementally maintained per-topic moods.
+
+``PolarityCache`` remembers the polarity of each summary text (keyed by a
+hash of the text and the scoring engine) with LRU eviction, so re-analyzing
+the same summaries skips scoring.
+
+``MoodBoard`` keeps one running aggregate per topic: count, sum, min, max
+and an exponentially time-decayed mean (weights halve every ``half_life``
+seconds). Each summary text counts once per topic, however often it is
+re-sent, and reading a topic's mood is O(1).
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+def text_key(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class PolarityCache:
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, keys):
+        """Cached polarity for each key (None where missing)."""
+        out = []
+        with self._lock:
+            for key in keys:
+                value = self._entries.get(key)
+                if value is None:
+                    self.misses += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                out.append(value)
+        return out
+
+    def put_many(self, items):
+        with self._lock:
+            for key, value in items:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "max_entries": self.max_entries,
+                    "hits": self.hits, "misses": self.misses}
+
+
+class TopicMood:
+    __slots__ = ("count", "total", "minimum", "maximum", "weighted", "weight", "updated_at", "seen")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+        self.weighted = 0.0
+        self.weight = 0.0
+        self.updated_at = None
+        self.seen = OrderedDict()
+
+    def add(self, polarity, now, half_life):
+        if self.updated_at is not None and now > self.updated_at:
+            # Decay both sums by the same factor; their ratio is the decayed mean
+            factor = 0.5 ** ((now - self.updated_at) / half_life)
+            self.weighted *= factor
+            self.weight *= factor
+        self.weighted += polarity
+        self.weight += 1.0
+        self.count += 1
+        self.total += polarity
+        self.minimum = polarity if self.minimum is None else min(self.minimum, polarity)
+        self.maximum = polarity if self.maximum is None else max(self.maximum, polarity)
+        self.updated_at = max(now, self.updated_at or now)
+
+    def snapshot(self, half_life):
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "mean": round(self.total / self.count, 4) if self.count else 0.0,
+            "decayed_mean": round(self.weighted / self.weight, 4) if self.weight else 0.0,
+            "min": self.minimum,
+            "max": self.maximum,
+            "half_life": half_life,
+            "updated_at": self.updated_at,
+        }
+
+
+class MoodBoard:
+    def __init__(self, half_life=3600.0, max_topics=10000, seen_per_topic=1024):
+        self.half_life = half_life
+        self.max_topics = max_topics
+        self.seen_per_topic = seen_per_topic
+        self._topics = OrderedDict()
+        self._lock = threading.Lock()
+
+    def update(self, topic, keys, polarities, now=None):
+        """Fold newly seen (text key, polarity) pairs into ``topic``; returns the new polarities."""
+        now = time.time() if now is None else now
+        added = []
+        with self._lock:
+            mood = self._topics.get(topic)
+            if mood is None:
+                mood = self._topics[topic] = TopicMood()
+                while len(self._topics) > self.max_topics:
+                    self._topics.popitem(last=False)
+            self._topics.move_to_end(topic)
+            for key, polarity in zip(keys, polarities):
+                if key in mood.seen:
+                    continue
+                mood.seen[key] = None
+                if len(mood.seen) > self.seen_per_topic:
+                    mood.seen.popitem(last=False)
+                mood.add(polarity, now, self.half_life)
+                added.append(polarity)
+        return added
+
+    def get(self, topic):
+        """Snapshot of a topic's aggregate (None if the topic has never been analyzed)."""
+        with self._lock:
+            mood = self._topics.get(topic)
+            if mood is None:
+                return None
+            return mood.snapshot(self.half_life)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._topics)
@@ -0,0 +1,219 @@
+"""Topic moods and trends kept in one SQLite file shared by every worker process.
+
+``MoodBoard`` and ``TrendStore`` live in one process's memory, so under
+several gunicorn workers each worker would see only the summaries it
+happened to analyze. ``SharedMoodBoard`` and ``SharedTrendStore`` have the
+same interfaces and the same arithmetic (``TopicMood``, ``TrendStore.report``),
+but keep their state in ``SENTIMENT_STATE_PATH``: a row per topic aggregate
+and seen summary key, and a row per non-empty trend bucket. Each update is
+one ``BEGIN IMMEDIATE`` transaction, so concurrent workers never lose each
+other's writes. The service uses them only when ``SENTIMENT_STATE_PATH`` is
+set, which ``common.serve`` does when it runs more than one worker.
+
+    board = SharedMoodBoard("sentiment_state.db", half_life=3600)
+    board.update("ai", keys, polarities)
+    board.get("ai")
+"""
+import math
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from sentiment.moods import TopicMood
+from sentiment.trends import TopicSeries, TrendStore
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS moods (
+    topic TEXT PRIMARY KEY,
+    count INTEGER NOT NULL,
+    total REAL NOT NULL,
+    minimum REAL,
+    maximum REAL,
+    weighted REAL NOT NULL,
+    weight REAL NOT NULL,
+    updated_at REAL,
+    seq INTEGER NOT NULL,
+    touched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS moods_touched_at ON moods (touched_at);
+CREATE TABLE IF NOT EXISTS mood_seen (
+    topic TEXT NOT NULL,
+    key BLOB NOT NULL,
+    seq INTEGER NOT NULL,
+    PRIMARY KEY (topic, key)
+);
+CREATE INDEX IF NOT EXISTS mood_seen_seq ON mood_seen (topic, seq);
+"""
+
+_TREND_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trend_topics (
+    topic TEXT PRIMARY KEY,
+    head INTEGER NOT NULL,
+    touched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS trend_topics_touched_at ON trend_topics (touched_at);
+CREATE TABLE IF NOT EXISTS trend_buckets (
+    topic TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    total REAL NOT NULL,
+    squares REAL NOT NULL,
+    PRIMARY KEY (topic, bucket)
+);
+"""
+
+_MOOD_COLUMNS = ("count", "total", "minimum", "maximum", "weighted", "weight", "updated_at")
+
+
+class SharedState:
+    """One connection per process to the shared state file, with write transactions."""
+
+    def __init__(self, path, schema):
+        self.path = path
+        # Transactions are managed explicitly so writes can take the lock up front
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(schema)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def transaction(self):
+        """Exclusive write transaction across threads and processes."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def query(self, sql, params=()):
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class SharedMoodBoard(SharedState):
+    def __init__(self, path, half_life=3600.0, max_topics=10000, seen_per_topic=1024):
+        super().__init__(path, _SCHEMA)
+        self.half_life = half_life
+        self.max_topics = max_topics
+        self.seen_per_topic = seen_per_topic
+
+    def update(self, topic, keys, polarities, now=None):
+        """Fold newly seen (text key, polarity) pairs into ``topic``; returns the new polarities."""
+        now = time.time() if now is None else now
+        added = []
+        with self.transaction() as db:
+            row = db.execute(f"SELECT {', '.join(_MOOD_COLUMNS)}, seq FROM moods WHERE topic = ?",
+                             (topic,)).fetchone()
+            mood, seq = TopicMood(), 0
+            if row is not None:
+                for name, value in zip(_MOOD_COLUMNS, row):
+                    setattr(mood, name, value)
+                seq = row[-1]
+            for key, polarity in zip(keys, polarities):
+                inserted = db.execute("INSERT OR IGNORE INTO mood_seen (topic, key, seq) VALUES (?, ?, ?)",
+                                      (topic, key, seq + 1)).rowcount
+                if not inserted:
+                    continue  # already counted for this topic
+                seq += 1
+                mood.add(polarity, now, self.half_life)
+                added.append(polarity)
+            if added:
+                db.execute("DELETE FROM mood_seen WHERE topic = ? AND seq <= ?", (topic, seq - self.seen_per_topic))
+            db.execute(
+                f"INSERT OR REPLACE INTO moods ({', '.join(_MOOD_COLUMNS)}, seq, topic, touched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                tuple(getattr(mood, name) for name in _MOOD_COLUMNS) + (seq, topic, now),
+            )
+            if row is None:
+                self._evict(db)
+        return added
+
+    def _evict(self, db):
+        """Drop the least recently updated topics beyond ``max_topics``."""
+        excess = db.execute("SELECT COUNT(*) FROM moods").fetchone()[0] - self.max_topics
+        if excess > 0:
+            stale = [r[0] for r in db.execute("SELECT topic FROM moods ORDER BY touched_at LIMIT ?", (excess,))]
+            db.executemany("DELETE FROM moods WHERE topic = ?", [(t,) for t in stale])
+            db.executemany("DELETE FROM mood_seen WHERE topic = ?", [(t,) for t in stale])
+
+    def get(self, topic):
+        """Snapshot of a topic's aggregate (None if the topic has never been analyzed)."""
+        rows = self.query(f"SELECT {', '.join(_MOOD_COLUMNS)} FROM moods WHERE topic = ?", (topic,))
+        if not rows:
+            return None
+        mood = TopicMood()
+        for name, value in zip(_MOOD_COLUMNS, rows[0]):
+            setattr(mood, name, value)
+        return mood.snapshot(self.half_life)
+
+    def __len__(self):
+        return self.query("SELECT COUNT(*) FROM moods")[0][0]
+
+
+class SharedTrendStore(TrendStore):
+    def __init__(self, path, **kwargs):
+        super().__init__(**kwargs)
+        self._state = SharedState(path, _TREND_SCHEMA)
+
+    def add(self, topic, polarities, now=None):
+        """Record ``polarities`` observed for ``topic`` at ``now``; returns how many were kept."""
+        if not polarities:
+            return 0
+        now = time.time() if now is None else now
+        bucket = int(now // self.bucket_seconds)
+        with self._state.transaction() as db:
+            row = db.execute("SELECT head FROM trend_topics WHERE topic = ?", (topic,)).fetchone()
+            head = bucket if row is None else max(row[0], bucket)
+            if bucket <= head - self.buckets:
+                return 0  # older than the retention period
+            db.execute("INSERT OR REPLACE INTO trend_topics (topic, head, touched_at) VALUES (?, ?, ?)",
+                       (topic, head, now))
+            db.execute("DELETE FROM trend_buckets WHERE topic = ? AND bucket <= ?", (topic, head - self.buckets))
+            db.execute(
+                "INSERT INTO trend_buckets (topic, bucket, count, total, squares) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (topic, bucket) DO UPDATE SET count = count + excluded.count, "
+                "total = total + excluded.total, squares = squares + excluded.squares",
+                (topic, bucket, len(polarities), math.fsum(polarities), math.fsum(v * v for v in polarities)),
+            )
+            if row is None:
+                self._evict(db)
+        return len(polarities)
+
+    def _evict(self, db):
+        """Drop the least recently updated topics beyond ``max_topics``."""
+        excess = db.execute("SELECT COUNT(*) FROM trend_topics").fetchone()[0] - self.max_topics
+        if excess > 0:
+            stale = [(r[0],) for r in db.execute(
+                "SELECT topic FROM trend_topics ORDER BY touched_at LIMIT ?", (excess,))]
+            db.executemany("DELETE FROM trend_topics WHERE topic = ?", stale)
+            db.executemany("DELETE FROM trend_buckets WHERE topic = ?", stale)
+
+    def get(self, topic, now=None):
+        """Rolling windows, EWMA and change-point flag for ``topic`` (None if never seen)."""
+        now = time.time() if now is None else now
+        current = int(now // self.bucket_seconds)
+        heads = self._state.query("SELECT head FROM trend_topics WHERE topic = ?", (topic,))
+        if not heads:
+            return None
+        # Rebuild the ring from the stored buckets and report it exactly as the in-memory store would
+        series = TopicSeries(self.buckets)
+        series.head = heads[0][0]
+        for bucket, count, total, squares in self._state.query(
+                "SELECT bucket, count, total, squares FROM trend_buckets WHERE topic = ? AND bucket > ?",
+                (topic, series.head - self.buckets)):
+            series.add_totals(bucket, count, total, squares)
+        return self.report(series, current)
+
+    def __len__(self):
+        return self._state.query("SELECT COUNT(*) FROM trend_topics")[0][0]
+
+    def close(self):
+        self._state.close()
@@ -0,0 +1,184 @@
+"""Per-topic polarity time series in fixed-size ring buffers.
+
+Each topic keeps ``retention / bucket_seconds`` time buckets (7 days of
+15-minute buckets by default). Every bucket holds the count, sum and sum
+of squares of the polarities that arrived in it. The buckets live in three
+``array`` columns, so a topic costs 20 bytes per bucket (about 13 KB by
+default) however many summaries it sees. At most ``max_topics`` topics are
+kept, and the least recently updated topic is dropped first.
+
+Window statistics sum contiguous slices of those columns (at most two per
+window, because the ring wraps). They are therefore computed at bucket
+granularity: the "1h" window is the last ``3600 / bucket_seconds`` buckets,
+including the current, partly filled one.
+
+    store = TrendStore()
+    store.add("ai", [0.4, -0.1])
+    store.get("ai")   # {"windows": {"1h": {...}, "24h": {...}, "7d": {...}}, "ewma": ..., "change_point": ...}
+"""
+import math
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+WINDOWS = (("1h", 3600), ("24h", 86400), ("7d", 7 * 86400))
+
+
+class TopicSeries:
+    __slots__ = ("counts", "sums", "squares", "head")
+
+    def __init__(self, buckets):
+        self.counts = array("I", bytes(4 * buckets))
+        self.sums = array("d", bytes(8 * buckets))
+        self.squares = array("d", bytes(8 * buckets))
+        self.head = None  # id of the newest bucket (time // bucket_seconds)
+
+    def _clear(self, start, stop):
+        """Zero the bucket ids in [start, stop)."""
+        n = len(self.counts)
+        if stop - start >= n:
+            start, stop = 0, n
+        else:
+            start, stop = start % n, stop % n
+        for a, b in ((start, stop),) if start < stop else ((start, n), (0, stop)):
+            self.counts[a:b] = array("I", bytes(4 * (b - a)))
+            self.sums[a:b] = array("d", bytes(8 * (b - a)))
+            self.squares[a:b] = array("d", bytes(8 * (b - a)))
+
+    def add(self, bucket, values):
+        n = len(self.counts)
+        if self.head is None:
+            self.head = bucket
+        elif bucket > self.head:
+            self._clear(self.head + 1, bucket + 1)
+            self.head = bucket
+        elif bucket <= self.head - n:
+            return 0  # older than the retention period
+        return self.add_totals(bucket, len(values), math.fsum(values), math.fsum(v * v for v in values))
+
+    def add_totals(self, bucket, count, total, squares):
+        """Add pre-aggregated totals to a bucket id within the retained range."""
+        slot = bucket % len(self.counts)
+        self.counts[slot] += count
+        self.sums[slot] += total
+        self.squares[slot] += squares
+        return count
+
+    def _slices(self, first, last):
+        """Ring slices holding the stored bucket ids in [first, last]."""
+        n = len(self.counts)
+        first, last = max(first, self.head - n + 1), min(last, self.head)
+        if first > last:
+            return ()
+        a, b = first % n, last % n + 1
+        return ((a, b),) if a < b else ((a, n), (0, b))
+
+    def totals(self, first, last):
+        """(count, sum, sum of squares) over the bucket ids in [first, last]."""
+        count = total = squares = 0.0
+        for a, b in self._slices(first, last):
+            count += sum(self.counts[a:b])
+            total += sum(self.sums[a:b])
+            squares += sum(self.squares[a:b])
+        return int(count), total, squares
+
+    def means(self, first, last):
+        """Per-bucket means, oldest first, for the non-empty buckets in [first, last]."""
+        out = []
+        for a, b in self._slices(first, last):
+            out.extend(s / c for c, s in zip(self.counts[a:b], self.sums[a:b]) if c)
+        return out
+
+
+def _stats(count, total, squares):
+    if not count:
+        return {"count": 0, "mean": None, "std": None}
+    mean = total / count
+    return {"count": count, "mean": round(mean, 4),
+            "std": round(math.sqrt(max(squares / count - mean * mean, 0.0)), 4)}
+
+
+class TrendStore:
+    def __init__(self, bucket_seconds=900, retention=7 * 86400, max_topics=2000,
+                 ewma_alpha=0.3, change_z=3.0, change_min_count=5):
+        self.bucket_seconds = bucket_seconds
+        self.buckets = max(1, math.ceil(retention / bucket_seconds))
+        self.max_topics = max_topics
+        self.ewma_alpha = ewma_alpha
+        self.change_z = change_z
+        self.change_min_count = change_min_count
+        self._topics = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, topic, polarities, now=None):
+        """Record ``polarities`` observed for ``topic`` at ``now``; returns how many were kept."""
+        if not polarities:
+            return 0
+        now = time.time() if now is None else now
+        with self._lock:
+            series = self._topics.get(topic)
+            if series is None:
+                series = self._topics[topic] = TopicSeries(self.buckets)
+                while len(self._topics) > self.max_topics:
+                    self._topics.popitem(last=False)
+            self._topics.move_to_end(topic)
+            return series.add(int(now // self.bucket_seconds), polarities)
+
+    def get(self, topic, now=None):
+        """Rolling windows, EWMA and change-point flag for ``topic`` (None if never seen)."""
+        now = time.time() if now is None else now
+        current = int(now // self.bucket_seconds)
+        with self._lock:
+            series = self._topics.get(topic)
+            if series is None:
+                return None
+            return self.report(series, current)
+
+    def report(self, series, current):
+        """Windows, EWMA and change point of ``series`` as of bucket id ``current``."""
+        # Nothing older than the retention period counts, even before new data wraps the ring
+        oldest = current - self.buckets + 1
+        windows = {}
+        for name, seconds in WINDOWS:
+            span = max(1, round(seconds / self.bucket_seconds))
+            windows[name] = _stats(*series.totals(max(oldest, current - span + 1), current))
+        # Recent hour against the 24h before it
+        recent_span = max(1, round(3600 / self.bucket_seconds))
+        recent = series.totals(current - recent_span + 1, current)
+        baseline = series.totals(max(oldest, current - recent_span - round(86400 / self.bucket_seconds) + 1),
+                                 current - recent_span)
+        means = series.means(oldest, current)
+
+        ewma = None
+        for value in means:
+            ewma = value if ewma is None else self.ewma_alpha * value + (1 - self.ewma_alpha) * ewma
+        return {
+            "windows": windows,
+            "ewma": round(ewma, 4) if ewma is not None else None,
+            "change_point": self._change_point(recent, baseline),
+            "bucket_seconds": self.bucket_seconds,
+            "buckets": len(means),
+        }
+
+    def _change_point(self, recent, baseline):
+        """z-score of the recent mean against the baseline distribution; flagged past ``change_z``."""
+        (rc, rs, _), (bc, bs, bq) = recent, baseline
+        if rc < self.change_min_count or bc < self.change_min_count:
+            return {"flag": False, "z": None, "shift": None}
+        base_mean = bs / bc
+        base_std = math.sqrt(max(bq / bc - base_mean * base_mean, 0.0))
+        shift = rs / rc - base_mean
+        # Floor the spread so a perfectly flat baseline does not divide by zero
+        z = shift / (max(base_std, 0.05) / math.sqrt(rc))
+        return {"flag": abs(z) >= self.change_z, "z": round(z, 2), "shift": round(shift, 4)}
+
+    def memory_bytes(self):
+        """Bytes held by the bucket arrays of all topics."""
+        with self._lock:
+            return sum(s.counts.itemsize * len(s.counts) + s.sums.itemsize * len(s.sums)
+                       + s.squares.itemsize * len(s.squares) for s in self._topics.values())
+
+    def __len__(self):
+        with self._lock:
+            return len(self._topics)
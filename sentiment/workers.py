@@ -0,0 +1,80 @@
+"""Optional process pool for scoring large /analyze batches.
+
+Under the threaded Flask server CPU-bound scoring holds the GIL, so one big
+batch starves every other request. With ``SENTIMENT_WORKERS`` > 1, batches of
+at least ``SENTIMENT_POOL_MIN_BATCH`` summaries are sharded across a pool of
+worker processes, each of which loads the lexicon once at start-up.
+Smaller batches are scored inline, where IPC would cost more than it saves.
+
+The pool may be created from a request thread, and forking a process that
+runs other threads can copy a held lock into the child. Pool processes are
+therefore started by a forkserver, or spawned where forkserver is unavailable.
+"""
+import multiprocessing
+import threading
+
+from common import config
+from sentiment.engine import score_polarities
+
+_pool = None
+_pool_size = None
+_pool_lock = threading.Lock()
+
+
+def pool_config():
+    """Return (workers, min_batch) from the environment."""
+    return config.env_int("SENTIMENT_WORKERS", 0), config.env_int("SENTIMENT_POOL_MIN_BATCH", 256)
+
+
+def _context():
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("forkserver")
+        ctx.set_forkserver_preload(["sentiment.engine"])
+        return ctx
+    return multiprocessing.get_context("spawn")
+
+
+def _init_worker():
+    # Load the lexicon (and TextBlob corpora) once per worker, not per task
+    score_polarities(["warm up the sentiment lexicon"])
+
+
+def get_pool(workers):
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is None or _pool_size != workers:
+            if _pool is not None:
+                _pool.terminate()
+            _pool = _context().Pool(processes=workers, initializer=_init_worker)
+            _pool_size = workers
+        return _pool
+
+
+def shutdown_pool():
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is not None:
+            _pool.terminate()
+            _pool.join()
+        _pool = None
+        _pool_size = None
+
+
+def score_parallel(texts, workers):
+    """Score ``texts`` across ``workers`` processes, returning results in input order."""
+    # A few shards per worker keeps the pool busy when shard costs are uneven
+    shards = workers * 4
+    size = max(1, -(-len(texts) // shards))
+    chunks = [texts[i:i + size] for i in range(0, len(texts), size)]
+    results = []
+    for chunk in get_pool(workers).map(score_polarities, chunks):
+        results.extend(chunk)
+    return results
+
+
+def score(texts):
+    """Score inline or on the pool depending on batch size and configuration."""
+    workers, min_batch = pool_config()
+    if workers > 1 and len(texts) >= min_batch:
+        return score_parallel(texts, workers)
+    return score_polarities(texts)
@@ -1,145 +1,611 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 import os
-import requests
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from flask_cors import CORS
+from requests.exceptions import Timeout
+from common import config, metrics, readiness, wire
+from summarizer.backends import ExtractiveBackend, LLMHTTPError, get_backend
+from summarizer.breaker import CircuitBreaker
+from summarizer.cache import SummaryCache, cache_key
+from summarizer.jobs import JobQueue
 
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
+metrics.instrument_app(app, "summarizer")
+wire.instrument_app(app)
+
+LLM_SECONDS = metrics.histogram(
+    "llm_request_duration_seconds", "LLM call latency including body read", ("outcome",))
+LLM_REQUESTS = metrics.counter(
+    "llm_requests_total", "LLM calls by outcome (ok, http_error, timeout, error, shed)", ("outcome",))
+LLM_FALLBACKS = metrics.counter(
+    "llm_fallbacks_total", "Summaries that fell back to the article text", ("reason",))
+SUMMARY_CACHE_LOOKUPS = metrics.counter(
+    "summary_cache_lookups_total", "Summary cache lookups by result", ("result",))
+LLM_BATCH_ITEMS = metrics.counter(
+    "llm_batch_items_total", "Articles sent in batched prompts, by whether the answer covered them", ("result",))
+SUMMARY_CHUNKS = metrics.counter(
+    "summary_chunks_total", "Chunks summarized separately for long articles")
+SUMMARY_TRUNCATIONS = metrics.counter(
+    "summary_truncations_total", "Long articles whose text was cut to bound the map-reduce work", ("reason",))
 
 
 @app.route("/", methods=["GET"]) 
 def health():
-    return jsonify({"service": "summarizer", "status": "ok"})
+    cache = _get_cache()
+    try:
+        breaker = _get_breaker(get_backend())
+    except ValueError:
+        breaker = None
+    return jsonify({
+        "service": "summarizer",
+        "status": "ok",
+        "cache": cache.stats() if cache is not None else None,
+        "llm_breaker": breaker.stats() if breaker is not None else None,
+    })
 
-@app.route("/summarize", methods=["POST"])
-def summarize():
-    data = request.get_json(silent=True) or {}
-    articles = data.get("articles", [])
-    summaries = []
-    
-    
-    # Default to Ollama's host port if running locally on 11434
-    llm_url = os.getenv("LOCAL_LLM_API_URL", "http://localhost:11434/api/generate")
-    llm_model = os.getenv("LOCAL_LLM_MODEL")
-    include_llm_output = (os.getenv("INCLUDE_LLM_OUTPUT", "1").lower() in {"1", "true", "yes"})
-    sentiment_url = os.getenv("SENTIMENT_URL")
-    for article in articles:
-        text = article.get("description", "")
-        # Build flexible payload; include model if provided (useful for Ollama)
-        if llm_model:
-            payload = {"model": llm_model, "prompt": f"Summarize this: {text}"}
-        else:
-            payload = {"prompt": f"Summarize this: {text}"}
+_extractive = ExtractiveBackend()
+_cache = None
+_cache_config = None
+_cache_lock = threading.Lock()
+
+
+def _get_cache():
+    """Return the summary cache for the current env config (None if disabled)."""
+    global _cache, _cache_config
+    size = config.env_int("SUMMARY_CACHE_SIZE", 1024)
+    ttl = config.env_float("SUMMARY_CACHE_TTL", 3600.0)
+    path = os.getenv("SUMMARY_CACHE_PATH") or None
+    max_rows = config.env_int("SUMMARY_CACHE_MAX_ROWS", 10 * size, low=1)
+    # Keyed on the pid too, so a forked worker never reuses its parent's SQLite connection
+    settings = (size, ttl, path, max_rows, os.getpid())
+    with _cache_lock:
+        if settings != _cache_config:
+            _cache = SummaryCache(max_entries=size, ttl=ttl, path=path, max_rows=max_rows) if size > 0 else None
+            _cache_config = settings
+        return _cache
+
+
+def _llm_max_concurrency():
+    return config.env_int("LLM_MAX_CONCURRENCY", 4, low=1)
+
+
+_llm_slots = None
+_llm_slots_size = None
+_llm_slots_lock = threading.Lock()
+
+
+def _get_llm_slots():
+    """Process-wide semaphore holding in-flight LLM calls to LLM_MAX_CONCURRENCY.
+
+    Request fan-out, chunk fan-out and job workers all nest thread pools, so
+    only a limit taken around the call itself bounds the total.
+    """
+    global _llm_slots, _llm_slots_size
+    size = _llm_max_concurrency()
+    with _llm_slots_lock:
+        if size != _llm_slots_size:
+            _llm_slots = threading.BoundedSemaphore(size)
+            _llm_slots_size = size
+        return _llm_slots
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def _get_breaker(backend):
+    """Circuit breaker for this backend endpoint (None when disabled or not over HTTP)."""
+    if backend.url is None or not config.env_flag("LLM_BREAKER", True):
+        return None
+    settings = (
+        config.env_int("LLM_BREAKER_WINDOW", 50),
+        config.env_int("LLM_BREAKER_MIN_CALLS", 5),
+        config.env_float("LLM_BREAKER_ERROR_RATE", 0.5),
+        config.env_float("LLM_BREAKER_COOLDOWN", 30.0),
+        config.env_float("LLM_TIMEOUT_MIN", 1.0),
+        config.env_float("LLM_TIMEOUT_MAX", 10.0),
+        config.env_float("LLM_TIMEOUT_P95_FACTOR", 2.0),
+    )
+    key = (backend.name, backend.url, settings)
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = _breakers[key] = CircuitBreaker(*settings)
+        return breaker
+
+
+def _call_llm(backend, prompt, stream=False):
+    """Send one prompt through ``backend``, recording latency and outcome metrics.
+
+    Returns (summary, llm_output, outcome): ``summary`` is the parsed text ("" if the
+    LLM answered with nothing usable, None on errors) and ``outcome`` is one of
+    ok, http_error, timeout, error or shed (circuit breaker open; no call made).
+    """
+    breaker = _get_breaker(backend)
+    if breaker is not None and not breaker.allow():
+        LLM_REQUESTS.inc(outcome="shed")
+        return None, None, "shed"
+    tokens = _estimate_tokens(prompt)
+    timeout = breaker.timeout(tokens) if breaker is not None else 10
+    with _get_llm_slots():
+        # Timed inside the slot, so queueing does not count as LLM latency
+        started = time.perf_counter()
         try:
-            # Debug log: show method, URL and a truncated payload so we can diagnose 405/404 issues
-            try:
-                print(f"LLM POST -> {llm_url} payload={str(payload)[:400]}")
-            except Exception:
-                pass
-            res = requests.post(llm_url, json=payload, timeout=10)
-            try:
-                data = res.json()
-            except Exception:
-                data = None
-
-            # If the LLM returned an HTTP error (e.g., 405 Method Not Allowed), capture that
-            if getattr(res, "status_code", 200) >= 400:
-                llm_output = {"status": res.status_code, "body": (res.text or "")}
-                # don't try to parse a summary from an error response
-                summary = None
-            else:
-                summary = None
-                if isinstance(data, dict):
-                    summary = data.get("summary") or data.get("result")
-                    if not summary:
-                        choices = data.get("choices")
-                        if isinstance(choices, list) and choices:
-                            first = choices[0]
-                            summary = first.get("text") or (first.get("message", {}).get("content") if isinstance(first.get("message"), dict) else None)
-                    if not summary and "output" in data:
-                        out = data.get("output")
-                        if isinstance(out, str):
-                            summary = out
-                        elif isinstance(out, list) and out:
-                            summary = " ".join([str(x) for x in out])
-                if not summary:
-                    text_body = res.text or ""
-                    summary = text_body.strip() or text[:100]
-                # capture a safe representation of the LLM output
-                try:
-                    llm_output = data if isinstance(data, (dict, list)) else (res.text or None)
-                except Exception:
-                    llm_output = (res.text or None)
-        except Exception:
-            summary = text[:100] # fallback
+            summary, llm_output = backend.generate(prompt, stream=stream, timeout=timeout)
+            outcome = "ok"
+        except LLMHTTPError as e:
+            summary = None
+            llm_output = {"status": e.status, "body": e.body}
+            outcome = "http_error"
+        except Exception as e:
+            summary = None
             llm_output = None
-        summaries.append({
-            "title": article["title"],
-            "summary": summary,
-            "source_url": article.get("source_url")
-        })
-        # Optionally attach raw LLM output to the last appended summary
-        if include_llm_output:
+            outcome = "timeout" if isinstance(e, Timeout) else "error"
+        elapsed = time.perf_counter() - started
+    if breaker is not None:
+        breaker.record(elapsed, outcome == "ok", tokens)
+    LLM_SECONDS.observe(elapsed, outcome=outcome)
+    LLM_REQUESTS.inc(outcome=outcome)
+    return summary, llm_output, outcome
+
+
+def _cache_lookup(cache, key):
+    cached = cache.get(key) if cache is not None else None
+    if cache is not None:
+        SUMMARY_CACHE_LOOKUPS.inc(result="hit" if cached is not None else "miss")
+    return cached
+
+
+def _chunk_config():
+    """Return (max estimated tokens per chunk, max chunks per article, chunk concurrency)."""
+    return (
+        config.env_int("SUMMARIZE_CHUNK_TOKENS", 1500, low=16),
+        config.env_int("SUMMARIZE_MAX_CHUNKS", 16, low=1),
+        config.env_int("SUMMARIZE_CHUNK_CONCURRENCY", 4, low=1),
+    )
+
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def _split_text(text, max_tokens):
+    """Pack whole sentences into chunks of at most ``max_tokens`` estimated tokens.
+
+    Sentences longer than a chunk are cut at word boundaries.
+    """
+    max_chars = max_tokens * 4
+    chunks, current = [], ""
+    for sentence in _SENTENCE_END.split(text.strip()):
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(sentence[:cut])
+            sentence = sentence[cut:].lstrip()
+        if current and _estimate_tokens(current + " " + sentence) > max_tokens:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _summarize_long(article, backend, include_llm_output, stream, max_tokens, max_chunks, concurrency, depth=0):
+    """Map-reduce: summarize chunks of the text concurrently, then summarize their summaries.
+
+    Combined summaries that are still longer than one chunk are chunked and
+    reduced again, up to ``SUMMARIZE_MAX_DEPTH`` levels. Text dropped to stay
+    within ``max_chunks`` or that depth sets ``"truncated": true`` on the result.
+    """
+    text = article.get("description", "")
+    chunks = _split_text(text, max_tokens)
+    truncated = False
+    if len(chunks) > max_chunks:
+        # Bound the LLM work one article can cause; the tail of very long texts is dropped
+        chunks = chunks[:max_chunks]
+        truncated = True
+        SUMMARY_TRUNCATIONS.inc(reason="max_chunks")
+    SUMMARY_CHUNKS.inc(len(chunks))
+
+    def run(chunk):
+        return _summarize_article(dict(article, description=chunk), backend, include_llm_output)
+
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(chunks))) as pool:
+        partials = list(pool.map(run, chunks))
+    combined = " ".join(p["summary"].strip() for p in partials if p["summary"] and p["summary"].strip())
+    if not combined:
+        # Every chunk failed; reducing nothing would send an empty prompt, so report the first error
+        result = partials[0]
+    elif _estimate_tokens(combined) <= max_tokens:
+        result = _summarize_article(dict(article, description=combined), backend, include_llm_output, stream)
+    elif depth + 1 < config.env_int("SUMMARIZE_MAX_DEPTH", 3, low=1):
+        # Still longer than one chunk: another map-reduce level over the summaries
+        result = _summarize_long(dict(article, description=combined), backend, include_llm_output, stream,
+                                 max_tokens, max_chunks, concurrency, depth + 1)
+    else:
+        # The summaries are not shrinking fast enough; reduce what fits in one chunk and say so
+        truncated = True
+        SUMMARY_TRUNCATIONS.inc(reason="max_depth")
+        result = _summarize_article(dict(article, description=_split_text(combined, max_tokens)[0]),
+                                    backend, include_llm_output, stream)
+    if truncated:
+        result["truncated"] = True
+    return result
+
+
+def _summarize_article(article, backend, include_llm_output, stream=False):
+    text = article.get("description", "")
+    max_tokens, max_chunks, concurrency = _chunk_config()
+    if text and _estimate_tokens(text) > max_tokens:
+        return _summarize_long(article, backend, include_llm_output, stream, max_tokens, max_chunks, concurrency)
+    prompt = f"Summarize this: {text}"
+    result = {
+        "title": article["title"],
+        "summary": None,
+        "source_url": article.get("source_url")
+    }
+
+    cache = _get_cache()
+    key = cache_key(backend.cache_id, prompt) if cache is not None else None
+    cached = _cache_lookup(cache, key)
+    if cached is not None:
+        result["summary"] = cached["summary"]
+        if include_llm_output and cached.get("llm_output") is not None:
+            result["llm_output"] = cached["llm_output"]
+        return result
+
+    summary, llm_output, outcome = _call_llm(backend, prompt, stream=stream)
+    if outcome == "ok":
+        if not summary:
+            summary = text[:100]
+            LLM_FALLBACKS.inc(reason="empty_response")
+        # Only successful LLM answers are cached; errors and fallbacks are retried next time
+        if cache is not None:
+            cache.put(key, {"summary": summary, "llm_output": llm_output})
+    elif outcome == "shed":
+        # Backend is unhealthy: answer right away with a local extractive summary
+        summary = _extractive.summarize_text(text) or text[:100]
+        LLM_FALLBACKS.inc(reason=outcome)
+    elif outcome != "http_error":
+        summary = text[:100] # fallback
+        LLM_FALLBACKS.inc(reason=outcome)
+    result["summary"] = summary
+    # Optionally attach raw LLM output
+    if include_llm_output and llm_output is not None:
+        result["llm_output"] = llm_output
+    return result
+
+
+def _batch_config():
+    """Return (max articles, max estimated prompt tokens) per batched prompt."""
+    return config.env_int("LLM_BATCH_SIZE", 1, low=1), config.env_int("LLM_BATCH_MAX_TOKENS", 2000, low=1)
+
+
+def _estimate_tokens(text):
+    # ~4 characters per token is close enough for English news text
+    return len(text) // 4 + 1
+
+
+BATCH_INSTRUCTIONS = (
+    "Summarize each numbered news item below in one or two sentences. "
+    'Reply with only a JSON array of objects like {"id": 1, "summary": "..."}, '
+    "one object per item, using the item numbers as ids.\n\n"
+)
+
+
+def _batch_prompt(articles):
+    lines = [f"{i}. {a.get('title') or ''}: {a.get('description') or ''}" for i, a in enumerate(articles, 1)]
+    return BATCH_INSTRUCTIONS + "\n".join(lines)
+
+
+def _plan_batches(articles, size, max_tokens):
+    """Greedily pack article indexes into batches bounded by count and prompt tokens."""
+    batches = []
+    current = []
+    tokens = _estimate_tokens(BATCH_INSTRUCTIONS)
+    for i, article in enumerate(articles):
+        cost = _estimate_tokens(f"{article.get('title') or ''}: {article.get('description') or ''}") + 4
+        if current and (len(current) >= size or tokens + cost > max_tokens):
+            batches.append(current)
+            current = []
+            tokens = _estimate_tokens(BATCH_INSTRUCTIONS)
+        current.append(i)
+        tokens += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _parse_batch_summaries(text, count):
+    """Map 0-based item index -> (summary, raw item) from the model's JSON answer (missing items omitted)."""
+    if not text:
+        return {}
+    start, end = text.find("["), text.rfind("]")
+    if start < 0 or end <= start:
+        return {}
+    try:
+        items = json.loads(text[start:end + 1])
+    except ValueError:
+        return {}
+    if not isinstance(items, list):
+        return {}
+    parsed = {}
+    for position, item in enumerate(items):
+        if isinstance(item, dict):
             try:
-                if llm_output is not None:
-                    summaries[-1]["llm_output"] = llm_output
-            except Exception:
-                pass
-        
+                index = int(item.get("id")) - 1
+            except (TypeError, ValueError):
+                continue
+            summary = item.get("summary")
+        else:
+            index, summary = position, item
+        if 0 <= index < count and isinstance(summary, str) and summary.strip():
+            parsed[index] = (summary.strip(), item)
+    return parsed
+
+
+def _batch_item_output(llm_output, item, position, size):
+    """One article's slice of a batched answer: its item plus the call's metadata, without the other items."""
+    out = {}
+    if isinstance(llm_output, dict):
+        out = {k: v for k, v in llm_output.items() if k not in ("response", "message", "choices")}
+    out["batch"] = {"id": position + 1, "items": size}
+    out["item"] = item
+    return out
+
+
+def _summarize_batch(articles, backend, include_llm_output):
+    """Summarize several articles with one prompt; items the model drops get per-article calls.
+
+    Batched summaries are cached under each article's own prompt key. Their
+    ``llm_output`` is the article's slice of the batch answer (``_batch_item_output``).
+    """
+    cache = _get_cache()
+    results = [None] * len(articles)
+    pending = []
+    max_tokens = _chunk_config()[0]
+    for i, article in enumerate(articles):
+        if _estimate_tokens(article.get("description") or "") > max_tokens:
+            continue  # long articles are chunked on their own below
+        key = cache_key(backend.cache_id, f"Summarize this: {article.get('description', '')}") if cache is not None else None
+        cached = _cache_lookup(cache, key)
+        if cached is not None:
+            results[i] = {"title": article["title"], "summary": cached["summary"], "source_url": article.get("source_url")}
+            if include_llm_output and cached.get("llm_output") is not None:
+                results[i]["llm_output"] = cached["llm_output"]
+        else:
+            pending.append((i, key))
+
+    if len(pending) > 1:
+        text, llm_output, outcome = _call_llm(backend, _batch_prompt([articles[i] for i, _ in pending]))
+        parsed = _parse_batch_summaries(text, len(pending)) if outcome == "ok" else {}
+        LLM_BATCH_ITEMS.inc(len(parsed), result="parsed")
+        LLM_BATCH_ITEMS.inc(len(pending) - len(parsed), result="missing")
+        for position, (i, key) in enumerate(pending):
+            if position in parsed:
+                article = articles[i]
+                summary, item = parsed[position]
+                output = _batch_item_output(llm_output, item, position, len(pending))
+                results[i] = {"title": article["title"], "summary": summary, "source_url": article.get("source_url")}
+                if include_llm_output:
+                    results[i]["llm_output"] = output
+                if cache is not None:
+                    cache.put(key, {"summary": summary, "llm_output": output})
+
+    for i, article in enumerate(articles):
+        if results[i] is None:
+            results[i] = _summarize_article(article, backend, include_llm_output)
+    return results
+
+
+def _include_llm_output(data):
+    """Per-request ``include_llm_output`` flag, falling back to INCLUDE_LLM_OUTPUT."""
+    requested = data.get("include_llm_output")
+    if isinstance(requested, bool):
+        return requested
+    return config.env_flag("INCLUDE_LLM_OUTPUT", True)
+
+
+def _check_article_count(articles):
+    limit = config.env_int("SUMMARIZE_MAX_ARTICLES", 100)
+    if len(articles) > limit:
+        raise wire.PayloadTooLarge(f"at most {limit} articles per request, got {len(articles)}")
+
+
+@app.route("/summarize", methods=["POST"])
+def summarize():
+    data = wire.get_payload() or {}
+    articles = data.get("articles", [])
+    _check_article_count(articles)
+
+    # Defaults to Ollama's /api/generate on localhost:11434 (see summarizer/backends.py)
+    backend = get_backend()
+    include_llm_output = _include_llm_output(data)
+
+    batch_size, batch_tokens = _batch_config()
+    if batch_size > 1:
+        # Pack several articles into each prompt; each batch is one unit of work
+        groups = _plan_batches(articles, batch_size, batch_tokens)
+
+        def run(group):
+            return _summarize_batch([articles[i] for i in group], backend, include_llm_output)
+    else:
+        groups = [[i] for i in range(len(articles))]
+
+        def run(group):
+            return [_summarize_article(articles[group[0]], backend, include_llm_output)]
+
+    # Fan out LLM calls with bounded concurrency; map() keeps input order
+    workers = min(_llm_max_concurrency(), len(groups))
+    if workers <= 1:
+        results = [run(g) for g in groups]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run, groups))
+    summaries = [item for group in results for item in group]
+
     # Return the summaries without auto-forwarding to sentiment
     # The UI dashboard will handle calling sentiment separately
-    return jsonify(summaries)
+    return wire.respond(summaries)
+
+@app.route("/summarize/stream", methods=["POST"])
+def summarize_stream():
+    """Summarize articles and emit each result as an NDJSON line as soon as it is ready.
+
+    Lines arrive in completion order; each carries the article's ``index`` in the request.
+    """
+    data = wire.get_payload() or {}
+    articles = data.get("articles", [])
+    _check_article_count(articles)
+
+    backend = get_backend()
+    include_llm_output = _include_llm_output(data)
+    workers = max(1, min(_llm_max_concurrency(), len(articles)))
+
+    def run(article):
+        return _summarize_article(article, backend, include_llm_output, stream=True)
+
+    def generate():
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(run, a): i for i, a in enumerate(articles)}
+            for future in as_completed(futures):
+                item = future.result()
+                item["index"] = futures[future]
+                yield json.dumps(item) + "\n"
+
+    return Response(generate(), mimetype="application/x-ndjson")
+
+_jobs = None
+_jobs_config = None
+_jobs_lock = threading.Lock()
+_jobs_recovered = False
+
+
+def _run_job_article(article):
+    include_llm_output = config.env_flag("INCLUDE_LLM_OUTPUT", True)
+    return _summarize_article(article, get_backend(), include_llm_output)
+
+
+def _jobs_path():
+    return os.getenv("SUMMARY_JOBS_PATH", "summarizer_jobs.db")
+
+
+def _get_job_queue():
+    """Return the running job queue for the current env config, starting its workers."""
+    global _jobs, _jobs_config
+    workers = config.env_int("JOB_WORKERS", 2, low=1)
+    settings = (_jobs_path(), workers)
+    with _jobs_lock:
+        if settings != _jobs_config:
+            if _jobs is not None:
+                _jobs.stop()
+            _jobs = JobQueue(settings[0], _run_job_article, recover=not _jobs_recovered)
+            _jobs.start(workers=workers)
+            _jobs_config = settings
+        return _jobs
+
+
+@app.route("/jobs", methods=["POST"])
+def submit_job():
+    """Queue articles for background summarization; poll ``GET /jobs/<id>`` for results."""
+    data = wire.get_payload() or {}
+    articles = data.get("articles")
+    if not isinstance(articles, list) or not all(isinstance(a, dict) and "title" in a for a in articles):
+        return jsonify({"error": "articles must be a list of objects with a title"}), 400
+    limit = config.env_int("JOB_MAX_ARTICLES", 10000)
+    if len(articles) > limit:
+        raise wire.PayloadTooLarge(f"at most {limit} articles per job, got {len(articles)}")
+    try:
+        priority = int(data.get("priority", 0))
+    except (TypeError, ValueError):
+        return jsonify({"error": "priority must be an integer"}), 400
+    job_id = _get_job_queue().submit(articles, priority=priority)
+    return jsonify({"id": job_id, "status": "queued", "total": len(articles)}), 202
+
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    job = _get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({"error": "unknown job"}), 404
+    return jsonify(job)
+
 
 # Optional GET route for browser-based testing
 @app.route("/summarize", methods=["GET"]) 
 def summarize_get():
-    if not (os.getenv("ENABLE_GET_TEST_ROUTES", "0").lower() in {"1", "true", "yes"}):
+    if not config.env_flag("ENABLE_GET_TEST_ROUTES"):
         return jsonify({"error": "GET testing routes disabled"}), 404
     title = request.args.get("title", "Sample title")
     description = request.args.get("description", "Sample description")
     source_url = request.args.get("source_url")
-    # Perform the same summarization logic for a single article
-    llm_url = os.getenv("LOCAL_LLM_API_URL", "http://localhost:11434/api/generate")
-    llm_model = os.getenv("LOCAL_LLM_MODEL")
-    sentiment_url = os.getenv("SENTIMENT_URL")
-    if llm_model:
-        payload = {"model": llm_model, "prompt": f"Summarize this: {description}"}
-    else:
-        payload = {"prompt": f"Summarize this: {description}"}
-    try:
-        # Debug log: show method, URL and a truncated payload so we can diagnose 405/404 issues
-        try:
-            print(f"LLM POST -> {llm_url} payload={str(payload)[:400]}")
-        except Exception:
-            pass
-        res = requests.post(llm_url, json=payload, timeout=10)
-        try:
-            data = res.json()
-        except Exception:
-            data = None
-        summary = None
-        if isinstance(data, dict):
-            summary = data.get("summary") or data.get("result")
-            if not summary:
-                choices = data.get("choices")
-                if isinstance(choices, list) and choices:
-                    first = choices[0]
-                    summary = first.get("text") or (first.get("message", {}).get("content") if isinstance(first.get("message"), dict) else None)
-            if not summary and "output" in data:
-                out = data.get("output")
-                if isinstance(out, str):
-                    summary = out
-                elif isinstance(out, list) and out:
-                    summary = " ".join([str(x) for x in out])
-        if not summary:
-            summary = (res.text or "").strip() or description[:100]
-    except Exception:
-        summary = description[:100]
-    summaries = [{"title": title, "summary": summary, "source_url": source_url}]
+    # Perform the same summarization logic for a single article (shares the summary cache)
+    article = {"title": title, "description": description, "source_url": source_url}
+    summaries = [_summarize_article(article, get_backend(), include_llm_output=False)]
     # Return summaries without auto-forwarding to sentiment
     return jsonify(summaries)
 
 
+def _warm_up():
+    """Validate the backend config and requeue interrupted jobs.
+
+    Runs in the master before forking, so it must not leave connections open:
+    each worker opens the summary cache lazily on first use.
+    """
+    global _jobs_recovered
+    _get_breaker(get_backend())
+    if not _jobs_recovered:
+        # Workers share the job database; only the master may requeue interrupted work
+        JobQueue(_jobs_path(), _run_job_article).stop()
+        _jobs_recovered = True
+
+
+_readiness = readiness.instrument_app(app, "summarizer", _warm_up)
+
+
+def preload():
+    """Run once in the serving master before workers fork (see common/serve.py)."""
+    _readiness.warm_up()
+
+
+def post_fork():
+    """Start this worker's job threads, so queued and recovered jobs run before any /jobs call."""
+    _get_job_queue()
+
+
+def shutdown():
+    """Let in-flight job articles finish before a worker exits."""
+    global _jobs, _jobs_config
+    with _jobs_lock:
+        if _jobs is not None:
+            _jobs.stop()
+        _jobs = _jobs_config = None
+
+
+def reset_state():
+    """Drop the summary cache, breakers, LLM slots and job queue; the next request rebuilds them."""
+    global _cache, _cache_config, _llm_slots, _llm_slots_size
+    with _cache_lock:
+        _cache = _cache_config = None
+    with _llm_slots_lock:
+        _llm_slots = _llm_slots_size = None
+    with _breakers_lock:
+        _breakers.clear()
+    shutdown()
+
+
 if __name__ == "__main__":
+    # Resume any jobs left unfinished by a previous run
+    _readiness.warm_up()
+    post_fork()
     app.run(host="0.0.0.0", port=5000)
\ No newline at end of file
@@ -0,0 +1,273 @@
+"""LLM backends for the summarizer.
+
+Each backend owns how a prompt becomes an HTTP request, how streamed and
+non-streamed responses are parsed, and what raw output is kept. The backend
+is picked with ``LLM_BACKEND``:
+
+  ollama        Ollama /api/generate (default)
+  ollama-chat   Ollama /api/chat
+  openai        OpenAI-compatible /v1/completions (``OPENAI_API_KEY`` optional)
+  extractive    in-process, deterministic extractive summarizer; no model needed
+
+``generate()`` returns ``(summary, llm_output)``. It raises ``LLMHTTPError``
+for HTTP error responses and lets transport errors (timeouts, refused
+connections) propagate.
+"""
+import json
+import logging
+import os
+import re
+from collections import Counter
+
+from common import config, httpclient
+
+log = logging.getLogger(__name__)
+
+
+class LLMHTTPError(Exception):
+    def __init__(self, status, body):
+        super().__init__(f"LLM returned HTTP {status}")
+        self.status = status
+        self.body = body
+
+
+def extract_text(data):
+    """Best-effort summary text from an arbitrary JSON answer (None if nothing fits)."""
+    if not isinstance(data, dict):
+        return None
+    summary = data.get("summary") or data.get("result") or data.get("response")
+    if not summary and isinstance(data.get("message"), dict):
+        summary = data["message"].get("content")
+    if not summary:
+        choices = data.get("choices")
+        if isinstance(choices, list) and choices and isinstance(choices[0], dict):
+            first = choices[0]
+            summary = first.get("text") or (first.get("message", {}).get("content") if isinstance(first.get("message"), dict) else None)
+    if not summary and "output" in data:
+        out = data.get("output")
+        if isinstance(out, str):
+            summary = out
+        elif isinstance(out, list) and out:
+            summary = " ".join([str(x) for x in out])
+    return summary or None
+
+
+class HTTPBackend:
+    name = None
+    default_url = None
+
+    def __init__(self, url=None, model=None):
+        self.url = url or self.default_url
+        self.model = model
+
+    @property
+    def cache_id(self):
+        return f"{self.name}/{self.model or ''}"
+
+    def build_payload(self, prompt, stream):
+        raise NotImplementedError
+
+    def headers(self):
+        return {}
+
+    def chunk_text(self, chunk):
+        """Text contributed by one decoded stream chunk."""
+        raise NotImplementedError
+
+    def stream_chunks(self, lines):
+        for line in lines:
+            if isinstance(line, bytes):
+                line = line.decode("utf-8")
+            if line and line.strip():
+                yield json.loads(line)
+
+    def aggregate(self, chunks):
+        """Join stream chunks into one response dict (None if the stream was empty)."""
+        parts = []
+        last = None
+        for chunk in chunks:
+            if not isinstance(chunk, dict):
+                return None
+            parts.append(self.chunk_text(chunk) or "")
+            last = chunk
+        if last is None:
+            return None
+        aggregated = dict(last)
+        aggregated["response"] = "".join(parts)
+        return aggregated
+
+    def parse(self, res, stream):
+        """Return (summary, llm_output) for a successful response."""
+        if stream:
+            # Consume the token stream as it arrives
+            body = ""
+            data = self.aggregate(self.stream_chunks(res.iter_lines()))
+        else:
+            body = res.text or ""
+            try:
+                data = res.json()
+            except Exception:
+                # Servers that stream by default send NDJSON; stitch the chunks back together
+                try:
+                    data = self.aggregate(self.stream_chunks(body.splitlines()))
+                except Exception:
+                    data = None
+        summary = extract_text(data) or body.strip()
+        # capture a safe representation of the LLM output
+        llm_output = data if isinstance(data, (dict, list)) else (body or None)
+        return summary, llm_output
+
+    def generate(self, prompt, stream=False, timeout=10):
+        payload = self.build_payload(prompt, stream)
+        # Formatted (and the payload truncated) only when debug logging is enabled
+        log.debug("LLM POST -> %s payload=%.400s", self.url, payload)
+        res = httpclient.post(self.url, json=payload, headers=self.headers(), timeout=timeout, stream=stream)
+        # If the LLM returned an HTTP error (e.g., 405 Method Not Allowed), don't parse a summary
+        if getattr(res, "status_code", 200) >= 400:
+            raise LLMHTTPError(res.status_code, res.text or "")
+        return self.parse(res, stream)
+
+
+class OllamaGenerateBackend(HTTPBackend):
+    name = "ollama"
+    default_url = "http://localhost:11434/api/generate"
+
+    @property
+    def cache_id(self):
+        # Plain model name keeps entries cached before backends existed valid
+        return self.model
+
+    def build_payload(self, prompt, stream):
+        # Include model if provided; Ollama streams NDJSON unless told otherwise
+        payload = {"model": self.model} if self.model else {}
+        payload["prompt"] = prompt
+        payload["stream"] = stream
+        return payload
+
+    def chunk_text(self, chunk):
+        return chunk.get("response")
+
+
+class OllamaChatBackend(HTTPBackend):
+    name = "ollama-chat"
+    default_url = "http://localhost:11434/api/chat"
+
+    def build_payload(self, prompt, stream):
+        payload = {"model": self.model} if self.model else {}
+        payload["messages"] = [{"role": "user", "content": prompt}]
+        payload["stream"] = stream
+        return payload
+
+    def chunk_text(self, chunk):
+        message = chunk.get("message")
+        return message.get("content") if isinstance(message, dict) else None
+
+
+class OpenAICompletionsBackend(HTTPBackend):
+    name = "openai"
+    default_url = "http://localhost:8000/v1/completions"
+
+    def build_payload(self, prompt, stream):
+        payload = {"model": self.model} if self.model else {}
+        payload["prompt"] = prompt
+        payload["max_tokens"] = config.env_int("LLM_MAX_TOKENS", 256, low=1)
+        payload["stream"] = stream
+        return payload
+
+    def headers(self):
+        key = os.getenv("OPENAI_API_KEY")
+        return {"Authorization": f"Bearer {key}"} if key else {}
+
+    def stream_chunks(self, lines):
+        # Server-sent events: "data: {...}" lines ending with "data: [DONE]"
+        for line in lines:
+            if isinstance(line, bytes):
+                line = line.decode("utf-8")
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data != "[DONE]":
+                yield json.loads(data)
+
+    def chunk_text(self, chunk):
+        choices = chunk.get("choices")
+        if isinstance(choices, list) and choices and isinstance(choices[0], dict):
+            return choices[0].get("text")
+        return None
+
+
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"[a-z0-9']+")
+_STOPWORDS = frozenset(
+    "a an the and or but of to in on for with at by from as is are was were be been it its this that "
+    "these those has have had will would can could should may might not no".split()
+)
+_BATCH_ITEM = re.compile(r"^(\d+)\. (.*)$", re.M)
+
+
+class ExtractiveBackend:
+    """Deterministic frequency-based extractive summarizer that runs in-process.
+
+    It understands the summarizer's own prompt formats: ``Summarize this: <text>``
+    and the numbered batch prompt (answered with a JSON array).
+    """
+
+    name = "extractive"
+
+    def __init__(self, url=None, model=None, max_words=None):
+        self.url = None
+        self.model = model
+        self.max_words = max_words or config.env_int("EXTRACTIVE_MAX_WORDS", 40, low=1)
+
+    @property
+    def cache_id(self):
+        return f"{self.name}/{self.max_words}"
+
+    def summarize_text(self, text):
+        sentences = [s.strip() for s in _SENTENCE.split(text.strip()) if s.strip()]
+        if not sentences:
+            return ""
+        if len(sentences) > 1:
+            freq = Counter(w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS)
+
+            def score(item):
+                position, sentence = item
+                words = [w for w in _WORD.findall(sentence.lower()) if w not in _STOPWORDS]
+                return (sum(freq[w] for w in words) / (len(words) or 1), -position)
+
+            best = max(enumerate(sentences), key=score)[0]
+            # Lead sentence plus the most central one, in document order
+            picked = sorted({0, best})
+            sentences = [sentences[i] for i in picked]
+        words = " ".join(sentences).split()
+        if len(words) > self.max_words:
+            return " ".join(words[:self.max_words]) + "..."
+        return " ".join(words)
+
+    def generate(self, prompt, stream=False, timeout=None):
+        items = _BATCH_ITEM.findall(prompt)
+        if items and not prompt.startswith("Summarize this:"):
+            # Batch lines are "N. <title>: <description>"
+            answer = [{"id": int(n), "summary": self.summarize_text(line.split(": ", 1)[-1])} for n, line in items]
+            text = json.dumps(answer)
+        else:
+            text = self.summarize_text(prompt.split(":", 1)[1] if ":" in prompt else prompt)
+        return text, {"backend": self.name, "response": text}
+
+
+BACKENDS = {
+    "ollama": OllamaGenerateBackend,
+    "ollama-generate": OllamaGenerateBackend,
+    "ollama-chat": OllamaChatBackend,
+    "openai": OpenAICompletionsBackend,
+    "extractive": ExtractiveBackend,
+}
+
+
+def get_backend():
+    """Build the backend selected by LLM_BACKEND / LOCAL_LLM_API_URL / LOCAL_LLM_MODEL."""
+    name = os.getenv("LLM_BACKEND", "ollama").lower()
+    cls = BACKENDS.get(name)
+    if cls is None:
+        raise ValueError(f"unknown LLM_BACKEND {name!r}; expected one of {sorted(BACKENDS)}")
+    return cls(url=os.getenv("LOCAL_LLM_API_URL") or None, model=os.getenv("LOCAL_LLM_MODEL"))
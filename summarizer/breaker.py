@@ -0,0 +1,130 @@
+"""Circuit breaker and adaptive timeout for LLM calls.
+
+The breaker keeps a rolling window of recent call latencies and outcomes.
+
+* closed:    calls go through with a timeout of ``p95 * factor``, clamped to
+             ``[min_timeout, max_timeout]`` (``max_timeout`` until there are
+             ``min_calls`` samples).
+             The p95 comes from calls of similar prompt size: each
+             power-of-two band of estimated prompt tokens keeps its own
+             latency window. One long chunk or batch prompt therefore never
+             sets the timeout for short article prompts, and short prompts
+             never set it for long ones.
+* open:      entered when the window's error rate reaches ``error_rate``;
+             calls are shed immediately for ``cooldown`` seconds.
+* half_open: after the cooldown a single probe call is let through with
+             ``max_timeout``; success closes the breaker, failure re-opens it.
+
+Tripping clears the latency windows. Only successful calls add samples, so
+after the LLM gets slower the old windows would otherwise keep timing out
+every call (and every probe) at the old p95; instead the timeout starts
+again from ``max_timeout`` and adapts to the new latencies.
+"""
+import threading
+import time
+from collections import deque
+
+
+def _size_band(tokens):
+    # Prompts within a factor of two of each other share a latency window
+    return max(1, int(tokens)).bit_length()
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, window=50, min_calls=5, error_rate=0.5, cooldown=30.0,
+                 min_timeout=1.0, max_timeout=10.0, timeout_factor=2.0):
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.cooldown = cooldown
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_factor = timeout_factor
+        self._calls = deque(maxlen=window)
+        self._latencies = {}
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self.shed = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def allow(self):
+        """Return True if a call may go to the LLM now."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.shed += 1
+            return False
+
+    def timeout(self, tokens=None):
+        """Timeout for a prompt of ``tokens`` estimated tokens (all recent calls when None)."""
+        with self._lock:
+            if self._current_state() == HALF_OPEN:
+                return self.max_timeout  # the probe must be able to see a slower LLM recover
+            if tokens is None:
+                latencies = sorted(latency for latency, ok in self._calls if ok)
+            else:
+                latencies = sorted(self._latencies.get(_size_band(tokens), ()))
+        if len(latencies) < self.min_calls:
+            return self.max_timeout
+        p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+        return max(self.min_timeout, min(p95 * self.timeout_factor, self.max_timeout))
+
+    def record(self, latency, ok, tokens=None):
+        with self._lock:
+            if ok and tokens is not None:
+                band = _size_band(tokens)
+                if band not in self._latencies:
+                    self._latencies[band] = deque(maxlen=self.window)
+                self._latencies[band].append(latency)
+            state = self._current_state()
+            if state == HALF_OPEN:
+                self._probe_in_flight = False
+                if ok:
+                    self._state = CLOSED
+                    self._calls.clear()
+                    self._calls.append((latency, ok))
+                else:
+                    self._trip()
+                return
+            self._calls.append((latency, ok))
+            if state == CLOSED and len(self._calls) >= self.min_calls:
+                failures = sum(1 for _, call_ok in self._calls if not call_ok)
+                if failures / len(self._calls) >= self.error_rate:
+                    self._trip()
+
+    def _trip(self):
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._latencies.clear()
+
+    def stats(self):
+        timeout = self.timeout()
+        with self._lock:
+            calls = list(self._calls)
+            return {
+                "state": self._current_state(),
+                "calls": len(calls),
+                "errors": sum(1 for _, ok in calls if not ok),
+                "timeout": round(timeout, 3),
+                "shed": self.shed,
+            }
@@ -0,0 +1,120 @@
+"""Content-addressed cache for LLM summaries.
+
+Entries are keyed on a hash of the model name plus the exact prompt, kept in
+an in-memory LRU with a TTL and optionally mirrored to a SQLite file so they
+survive restarts. Every ``prune_every`` writes the file drops its expired
+rows and, past ``max_rows`` (default ten times ``max_entries``), the rows
+closest to expiring.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def cache_key(model, prompt):
+    h = hashlib.sha256()
+    h.update((model or "").encode("utf-8"))
+    h.update(b"\0")
+    h.update((prompt or "").encode("utf-8"))
+    return h.hexdigest()
+
+
+class SummaryCache:
+    def __init__(self, max_entries=1024, ttl=3600.0, path=None, max_rows=None, prune_every=64):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_rows = max_rows if max_rows is not None else 10 * max_entries
+        self.prune_every = max(1, prune_every)
+        self._writes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS summaries "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS summaries_expires_at ON summaries (expires_at)")
+            self._db.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM summaries WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    if row[1] > now:
+                        value = json.loads(row[0])
+                        self._store(key, value, row[1])
+                        self.hits += 1
+                        return value
+                    self._db.execute("DELETE FROM summaries WHERE key = ?", (key,))
+                    self._db.commit()
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._store(key, value, expires_at)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO summaries (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), expires_at),
+                )
+                self._writes += 1
+                if self._writes % self.prune_every == 0:
+                    self._prune()
+                self._db.commit()
+
+    def _prune(self):
+        """Delete expired rows, then the soonest-expiring rows beyond ``max_rows``."""
+        self._db.execute("DELETE FROM summaries WHERE expires_at <= ?", (time.time(),))
+        excess = self._db.execute("SELECT COUNT(*) FROM summaries").fetchone()[0] - self.max_rows
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM summaries WHERE key IN "
+                "(SELECT key FROM summaries ORDER BY expires_at LIMIT ?)", (excess,)
+            )
+
+    def _store(self, key, value, expires_at):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM summaries")
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "persistent": self._db is not None,
+            }
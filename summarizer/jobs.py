@@ -0,0 +1,169 @@
+"""SQLite-backed job queue for long-running summarization batches.
+
+``POST /jobs`` stores the articles and returns a job id right away; worker
+threads then claim articles one at a time, highest job priority first (FIFO
+within a priority), and write each result back as it completes so
+``GET /jobs/<id>`` can report progress and partial results. Articles that
+were in flight when the process died are put back in the queue on start-up.
+
+Several processes (e.g. server workers) may share one database: claiming an
+article is a single UPDATE, so each article goes to exactly one worker. Only
+one process should pass ``recover=True``, before the others start.
+"""
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    priority INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    total INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_items (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    priority INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    state TEXT NOT NULL,
+    article TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    PRIMARY KEY (job_id, idx)
+);
+CREATE INDEX IF NOT EXISTS job_items_queue ON job_items (state, priority DESC, created_at, idx);
+"""
+
+
+class JobQueue:
+    def __init__(self, path, process, recover=True):
+        """``process(article) -> result dict`` is called on a worker thread per article."""
+        self.path = path
+        self.process = process
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition()
+        self._stopping = threading.Event()
+        self._threads = []
+        if recover:
+            self.recover()
+
+    def recover(self):
+        """Queue again anything a previous process claimed but never finished."""
+        with self._lock, self._db:
+            return self._db.execute("UPDATE job_items SET state = ? WHERE state = ?", (PENDING, RUNNING)).rowcount
+
+    def submit(self, articles, priority=0):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO jobs (id, priority, created_at, total) VALUES (?, ?, ?, ?)",
+                (job_id, priority, now, len(articles)),
+            )
+            self._db.executemany(
+                "INSERT INTO job_items (job_id, idx, priority, created_at, state, article) VALUES (?, ?, ?, ?, ?, ?)",
+                [(job_id, i, priority, now, PENDING, json.dumps(a)) for i, a in enumerate(articles)],
+            )
+        with self._wakeup:
+            self._wakeup.notify_all()
+        return job_id
+
+    def get(self, job_id):
+        """Job status with per-state counts and the results finished so far (None if unknown)."""
+        with self._lock:
+            job = self._db.execute(
+                "SELECT priority, created_at, total FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if job is None:
+                return None
+            rows = self._db.execute(
+                "SELECT idx, state, result, error FROM job_items WHERE job_id = ? ORDER BY idx", (job_id,)
+            ).fetchall()
+        counts = {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        results = []
+        for idx, state, result, error in rows:
+            counts[state] += 1
+            if state == DONE:
+                results.append(dict(json.loads(result), index=idx))
+            elif state == FAILED:
+                results.append({"index": idx, "error": error})
+        finished = counts[DONE] + counts[FAILED]
+        if finished == job[2]:
+            status = "done" if counts[FAILED] == 0 else "failed"
+        elif finished or counts[RUNNING]:
+            status = "running"
+        else:
+            status = "queued"
+        return {
+            "id": job_id,
+            "status": status,
+            "priority": job[0],
+            "created_at": job[1],
+            "total": job[2],
+            "completed": finished,
+            "progress": round(finished / job[2], 4) if job[2] else 1.0,
+            "counts": counts,
+            "results": results,
+        }
+
+    def _claim(self):
+        with self._lock, self._db:
+            return self._db.execute(
+                "UPDATE job_items SET state = ? WHERE rowid = ("
+                "SELECT rowid FROM job_items WHERE state = ? ORDER BY priority DESC, created_at, idx LIMIT 1"
+                ") RETURNING job_id, idx, article",
+                (RUNNING, PENDING),
+            ).fetchone()
+
+    def _finish(self, job_id, idx, result=None, error=None):
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE job_items SET state = ?, result = ?, error = ? WHERE job_id = ? AND idx = ?",
+                (DONE if error is None else FAILED, json.dumps(result) if error is None else None, error, job_id, idx),
+            )
+
+    def run_once(self):
+        """Process one queued article; return False if the queue was empty."""
+        claimed = self._claim()
+        if claimed is None:
+            return False
+        job_id, idx, article = claimed
+        try:
+            result = self.process(json.loads(article))
+        except Exception as e:
+            self._finish(job_id, idx, error=f"{type(e).__name__}: {e}")
+        else:
+            self._finish(job_id, idx, result=result)
+        return True
+
+    def _worker(self):
+        while not self._stopping.is_set():
+            if not self.run_once():
+                with self._wakeup:
+                    self._wakeup.wait(timeout=0.5)
+
+    def start(self, workers=2):
+        for _ in range(workers):
+            t = threading.Thread(target=self._worker, daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self):
+        self._stopping.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for t in self._threads:
+            t.join()
+        self._threads = []
+        self._db.close()
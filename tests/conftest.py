@@ -0,0 +1,84 @@
+import sys
+import threading
+
+import pytest
+
+from benchmarks.stubs import start_stub_server
+
+SERVICES = ("collector.app", "summarizer.app", "sentiment.app")
+
+
+def pytest_addoption(parser):
+    parser.addoption("--integration", action="store_true",
+                     help="also run integration tests that start real server processes")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "integration: starts real server processes; needs --integration")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--integration"):
+        return
+    skip = pytest.mark.skip(reason="integration test; run with --integration")
+    for item in items:
+        if "integration" in item.keywords:
+            item.add_marker(skip)
+
+
+def _reset_services():
+    # Only services a test module already imported; importing one here would load it for every test
+    for name in SERVICES:
+        module = sys.modules.get(name)
+        if module is not None:
+            module.reset_state()
+
+
+@pytest.fixture(autouse=True)
+def _fresh_service_state():
+    """Every test starts with empty caches, breakers, moods and trends in the services."""
+    _reset_services()
+    yield
+    _reset_services()
+
+
+class InFlight:
+    """Context manager counting calls: ``calls`` in total and the ``peak`` number that overlapped."""
+
+    def __init__(self):
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        return self
+
+    def __exit__(self, *exc):
+        with self._lock:
+            self.active -= 1
+
+
+@pytest.fixture
+def in_flight():
+    return InFlight()
+
+
+@pytest.fixture
+def stub_server():
+    """``start_stub_server`` whose servers are shut down when the test ends."""
+    servers = []
+
+    def start(handle, **kwargs):
+        server, url = start_stub_server(handle, **kwargs)
+        servers.append(server)
+        return server, url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -2,6 +2,7 @@ import os
 import json
 from unittest.mock import patch
 from collector.app import app
+from benchmarks.stubs import send_json
 
 
 def test_collect_mock_data_no_api_key(monkeypatch):
@@ -16,7 +17,7 @@ def test_collect_mock_data_no_api_key(monkeypatch):
     assert all("title" in x and "description" in x for x in data)
 
 
-@patch("collector.app.requests.get")
+@patch("collector.app.httpclient.get")
 def test_collect_with_api_key_and_forward(mock_get, monkeypatch):
     # Fake NewsAPI response
     mock_get.return_value.json.return_value = {
@@ -31,7 +32,7 @@ def test_collect_with_api_key_and_forward(mock_get, monkeypatch):
     monkeypatch.setenv("SUMMARIZER_URL", "http://summarizer:5000")
 
     # Mock forwarding to summarizer
-    with patch("collector.app.requests.post") as mock_post:
+    with patch("collector.app.httpclient.post") as mock_post:
         mock_post.return_value.json.return_value = [{"title": "AI News 1", "summary": "s1"}]
         mock_post.return_value.raise_for_status.return_value = None
 
@@ -41,3 +42,233 @@ def test_collect_with_api_key_and_forward(mock_get, monkeypatch):
         data = resp.get_json()
         assert isinstance(data, list)
         assert "summary" in data[0]
+
+
+def _ndjson(resp):
+    return [json.loads(line) for line in resp.get_data(as_text=True).splitlines() if line.strip()]
+
+
+def test_collect_batch_dedupes_across_topics(monkeypatch, in_flight):
+    import time
+
+    class FakeResp:
+        status_code = 200
+        headers = {}
+
+        def __init__(self, payload):
+            self._payload = payload
+
+        def json(self):
+            return self._payload
+
+        def raise_for_status(self):
+            return None
+
+    def fake_get(url, params=None, headers=None, timeout=None):
+        with in_flight:
+            time.sleep(0.2)
+        topic, page = params["q"], params["page"]
+        return FakeResp({"articles": [
+            {"title": "Shared Wire Story!", "description": "d", "url": "https://www.wire.com/story/?utm_source=x"},
+            {"title": f"Only {topic} page {page}", "description": "d", "url": f"https://news.com/{topic}/{page}"},
+        ]})
+
+    monkeypatch.setenv("NEWS_API_KEY", "fake")
+    monkeypatch.setenv("NEWS_CACHE_TTL", "0")
+    with patch("collector.app.httpclient.get", side_effect=fake_get):
+        client = app.test_client()
+        resp = client.post("/collect/batch", json={"topics": ["ai", "space", "ai"], "pages": 2})
+        lines = _ndjson(resp)
+
+    assert resp.mimetype == "application/x-ndjson"
+    chunks, summary = lines[:-1], lines[-1]
+    assert len(chunks) == 4  # 2 distinct topics x 2 pages, fetched in parallel
+    assert in_flight.calls == 4 and in_flight.peak == 4
+    titles = [a["title"] for c in chunks for a in c["articles"]]
+    assert titles.count("Shared Wire Story!") == 1
+    assert len(titles) == 5
+    assert summary == {"done": True, "articles": 5, "duplicates": 3}
+
+
+def test_collect_batch_validates_topics(monkeypatch):
+    import gzip
+
+    import msgpack
+
+    client = app.test_client()
+    assert client.post("/collect/batch", json={"topics": []}).status_code == 400
+    assert client.post("/collect/batch", json={"topics": "ai"}).status_code == 400
+
+    # The body goes through the same content negotiation and size limit as the other routes
+    monkeypatch.delenv("NEWS_API_KEY", raising=False)
+    body = gzip.compress(msgpack.packb({"topics": ["ai"]}))
+    resp = client.post("/collect/batch", data=body,
+                       headers={"Content-Type": "application/msgpack", "Content-Encoding": "gzip"})
+    assert resp.status_code == 200 and _ndjson(resp)[-1]["done"]
+    monkeypatch.setenv("MAX_REQUEST_BYTES", "100")
+    assert client.post("/collect/batch", json={"topics": ["x" * 200]}).status_code == 413
+
+
+def test_normalize_url_and_title_key():
+    from collector.app import normalize_url, title_key
+
+    assert normalize_url("http://WWW.Example.com/a/?utm_medium=x&b=1#frag") == normalize_url("https://example.com/a?b=1")
+    assert title_key("Big News: AI wins!") == title_key("big news  ai wins")
+
+
+def _newsapi_stub(stub_server, delay=0.0, etag=None):
+    import time
+
+    calls = []
+
+    def handle(request):
+        calls.append(request.headers.get("If-None-Match"))
+        time.sleep(delay)
+        if etag and request.headers.get("If-None-Match") == etag:
+            request.send_response(304)
+            request.end_headers()
+            return
+        send_json(request, {"articles": [
+            {"title": f"Story {len(calls)}", "description": "d", "url": f"https://news.com/{len(calls)}"},
+        ]}, headers={"ETag": etag} if etag else None)
+
+    server, url = stub_server(handle)
+    return url + "/v2/everything", calls
+
+
+def test_deduper_drops_near_duplicates():
+    from collector.app import ArticleDeduper
+
+    story = "Regulators approved the merger of two regional airlines after a year-long review of fares and routes."
+    first = {"title": "Airline merger approved", "description": story, "source_url": "https://a.example/1"}
+    syndicated = {"title": "Airline merger approved (AP)", "description": story, "source_url": "https://b.example/2"}
+    assert ArticleDeduper().add(first) and ArticleDeduper().add(syndicated)
+    deduper = ArticleDeduper(near_duplicates=True)
+    assert deduper.add(first) is True
+    assert deduper.add(syndicated) is False
+    assert deduper.duplicates == 1
+
+
+def test_news_cache_hits_and_coalesces(monkeypatch, stub_server):
+    from concurrent.futures import ThreadPoolExecutor
+
+    url, calls = _newsapi_stub(stub_server, delay=0.3)
+    monkeypatch.setenv("NEWS_API_KEY", "fake")
+    monkeypatch.setenv("NEWS_API_URL", url)
+    monkeypatch.setenv("NEWS_CACHE_TTL", "60")
+    client = app.test_client()
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        results = list(pool.map(
+            lambda _: app.test_client().post("/collect", json={"topic": "coalesce"}).get_json(), range(5)))
+    again = client.post("/collect", json={"topic": "coalesce"}).get_json()
+    stats = client.get("/").get_json()["news_cache"]
+
+    assert len(calls) == 1
+    assert all(r == results[0] for r in results) and again == results[0]
+    assert stats["misses"] == 1
+    assert stats["coalesced"] == 4
+    assert stats["hits"] == 1
+
+
+def test_news_cache_stale_while_revalidate_and_304(monkeypatch, stub_server):
+    import time
+
+    url, calls = _newsapi_stub(stub_server, etag='"v1"')
+    monkeypatch.setenv("NEWS_API_KEY", "fake")
+    monkeypatch.setenv("NEWS_API_URL", url)
+    monkeypatch.setenv("NEWS_CACHE_TTL", "0.05")
+    monkeypatch.setenv("NEWS_CACHE_STALE_TTL", "60")
+    client = app.test_client()
+    first = client.post("/collect", json={"topic": "swr"}).get_json()
+    time.sleep(0.1)
+    stale = client.post("/collect", json={"topic": "swr"}).get_json()
+    for _ in range(50):
+        if client.get("/").get_json()["news_cache"]["not_modified"]:
+            break
+        time.sleep(0.02)
+    stats = client.get("/").get_json()["news_cache"]
+
+    assert stale == first
+    assert stats["stale_served"] == 1
+    assert stats["not_modified"] == 1
+    assert calls == [None, '"v1"']
+
+
+def _article_stub(stub_server, in_flight, delay=0.0):
+    import time
+
+    requests = []
+    paragraph = "<p>" + "The council approved the new transit budget after a long debate. " * 2 + "</p>"
+
+    def handle(request):
+        requests.append(request.path)
+        with in_flight:
+            time.sleep(delay)
+            if request.path.startswith("/missing"):
+                request.send_response(404)
+                request.send_header("Content-Length", "0")
+                request.end_headers()
+                return
+            request.send_response(200)
+            request.send_header("Content-Type", "text/html; charset=utf-8")
+            request.send_header("Transfer-Encoding", "chunked")
+            request.end_headers()
+            parts = ["<html><head><script>var x = '<p>not text</p>';</script></head><body>",
+                     "<nav><p>Home | World | Politics | Sports | Weather | Contact us</p></nav>",
+                     f"<article><h1>{request.path}</h1>", paragraph, "<p>Short.</p>"]
+            # /huge keeps sending paragraphs; the reader must stop at its byte budget
+            parts += [paragraph] * (5000 if request.path.startswith("/huge") else 2)
+            parts.append("</article><footer><p>Copyright and terms of service apply here.</p></footer></body></html>")
+            for part in parts:
+                data = part.encode()
+                try:
+                    request.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                except OSError:
+                    break
+            else:
+                request.wfile.write(b"0\r\n\r\n")
+
+    server, url = stub_server(handle, keep_alive=True, quiet_errors=True)
+    return url, requests
+
+
+def test_full_text_enrichment_limits_hosts_budget_and_caches(stub_server, in_flight):
+    from collector.app import normalize_url
+    from collector.fulltext import FullTextFetcher
+
+    base, requests = _article_stub(stub_server, in_flight, delay=0.1)
+    fetcher = FullTextFetcher(max_bytes=16 * 1024, per_host=2, concurrency=8, normalize=normalize_url)
+    articles = [{"title": f"a{i}", "description": "teaser", "source_url": f"{base}/a/{i}"} for i in range(6)]
+    articles.append({"title": "gone", "description": "teaser", "source_url": f"{base}/missing"})
+    articles.append({"title": "huge", "description": "teaser", "source_url": f"{base}/huge"})
+    enriched = fetcher.enrich(articles)
+    requests_made = len(requests)
+    stats = fetcher.stats()
+    again = fetcher.enrich(articles)
+
+    assert in_flight.peak <= 2  # per-host limit
+    first = enriched[0]
+    assert first["teaser"] == "teaser"
+    assert first["description"].startswith("The council approved")
+    assert "not text" not in first["description"] and "Home |" not in first["description"]
+    assert "Short." not in first["description"] and "Copyright" not in first["description"]
+    assert enriched[6] == articles[6]  # failed fetches leave the article untouched
+    assert stats["failures"] == 1
+    # Reading stopped at the budget instead of downloading the whole page
+    assert stats["bytes_read"] < 10 * 16 * 1024
+    assert 10 * 1024 < len(enriched[7]["description"]) < 16 * 1024
+    # Cached by URL: the second pass only retries the page that failed
+    assert again[:6] == enriched[:6]
+    assert len(requests) == requests_made + 1
+
+
+def test_collect_full_text_flag(monkeypatch, stub_server, in_flight):
+    base, _ = _article_stub(stub_server, in_flight)
+    monkeypatch.delenv("NEWS_API_KEY", raising=False)
+    monkeypatch.setattr("collector.app._sample_news", lambda topic: [
+        {"title": "t", "description": "teaser", "source_url": f"{base}/story"}])
+    client = app.test_client()
+    plain = client.post("/collect", json={"topic": "ai"}).get_json()
+    full = client.post("/collect", json={"topic": "ai", "full_text": True}).get_json()
+    assert plain[0]["description"] == "teaser"
+    assert full[0]["description"].startswith("The council approved") and full[0]["teaser"] == "teaser"
@@ -0,0 +1,172 @@
+from common import httpclient
+
+
+def test_session_is_shared_per_process(monkeypatch):
+    httpclient.reset_session()
+    first = httpclient.get_session()
+    assert httpclient.get_session() is first
+
+    # A forked worker (different pid) gets its own pool
+    monkeypatch.setattr(httpclient.os, "getpid", lambda: -1)
+    assert httpclient.get_session() is not first
+    httpclient.reset_session()
+
+
+def test_session_pool_and_retry_config(monkeypatch):
+    monkeypatch.setenv("HTTP_POOL_SIZE", "7")
+    monkeypatch.setenv("HTTP_RETRIES", "3")
+    session = httpclient.build_session()
+    adapter = session.get_adapter("http://example.com")
+    assert adapter._pool_maxsize == 7
+    assert adapter.max_retries.connect == 3
+    assert adapter.max_retries.read == 0
+
+
+def test_metrics_registry_renders_prometheus_text():
+    from common.metrics import Registry
+
+    registry = Registry()
+    calls = registry.counter("calls_total", "Calls", ("outcome",))
+    latency = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    calls.inc(outcome="ok")
+    calls.inc(2, outcome="ok")
+    latency.observe(0.05, route="/x")
+    latency.observe(0.5, route="/x")
+    latency.observe(5, route="/x")
+
+    text = registry.render()
+    assert "# TYPE calls_total counter" in text
+    assert 'calls_total{outcome="ok"} 3.0' in text
+    assert 'latency_seconds_bucket{route="/x",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/x",le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{route="/x",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{route="/x"} 3' in text
+    assert registry.counter("calls_total", "Calls", ("outcome",)) is calls
+
+
+def test_article_store_only_returns_new_or_changed(tmp_path):
+    from common.articlestore import ArticleStore
+
+    store = ArticleStore(str(tmp_path / "articles.db"))
+    a = {"title": "A", "description": "one", "source_url": "https://x/a"}
+    b = {"title": "B", "description": "two", "source_url": "https://x/b"}
+    pending, done = store.upsert("ai", [a, b])
+    assert pending == [a, b] and done == []
+    store.save_result(a, "sum a", 0.5)
+
+    pending, done = store.upsert("ai", [a, b])
+    assert pending == [b]  # b was never summarized
+    assert done == [{"title": "A", "summary": "sum a", "source_url": "https://x/a", "polarity": 0.5}]
+
+    changed = dict(a, description="one, updated")
+    pending, done = store.upsert("ai", [changed])
+    assert pending == [changed] and done == []
+    assert store.recent("ai", limit=1)[0]["summary"] is None
+    assert store.stats() == {"articles": 2, "summarized": 0}
+
+
+def test_near_duplicate_clustering():
+    from common.neardup import cluster
+
+    wire = "The central bank raised interest rates by a quarter point on Tuesday, citing persistent inflation and a strong labour market."
+    articles = [
+        {"title": "Central bank raises rates", "description": wire},
+        {"title": "Chip maker opens new plant", "description": "The company will hire two thousand workers at a new factory in Ohio next year."},
+        {"title": "Central bank raises rates - Reuters", "description": wire.replace("Tuesday", "Tue")},
+        {"title": "Central Bank Raises Rates | CNN", "description": wire + " Markets fell."},
+    ]
+    assert cluster(articles) == [0, 1, 0, 0]
+
+
+def test_serve_options_from_env(monkeypatch):
+    from common import serve
+
+    monkeypatch.setenv("SERVE_WORKERS", "3")
+    monkeypatch.setenv("SERVE_THREADS", "8")
+    monkeypatch.setenv("SERVE_GRACEFUL_TIMEOUT", "5")
+    opts = serve.options(bind="127.0.0.1:9000")
+    assert opts["bind"] == "127.0.0.1:9000"
+    assert (opts["workers"], opts["threads"], opts["graceful_timeout"]) == (3, 8, 5)
+    assert opts["preload_app"] is True and opts["worker_class"] == "gthread"
+    assert serve.options(workers=2)["workers"] == 2
+
+    monkeypatch.delenv("SERVE_WORKERS")
+    monkeypatch.delenv("SERVE_THREADS")
+    # One worker by default: caches, breakers and metrics are per process
+    assert (serve.options()["workers"], serve.options()["threads"]) == (1, 8)
+
+
+def test_serve_shares_state_only_with_several_workers(monkeypatch):
+    import os
+    from common import serve
+
+    monkeypatch.delenv("SENTIMENT_STATE_PATH", raising=False)
+    assert serve.share_state("sentiment", 1) is None
+    assert serve.share_state("collector", 4) is None
+    assert "SENTIMENT_STATE_PATH" not in os.environ
+
+    directory = serve.share_state("sentiment", 2)
+    try:
+        assert os.environ["SENTIMENT_STATE_PATH"] == os.path.join(directory, "sentiment_state.db")
+        # An explicit setting wins
+        assert serve.share_state("sentiment", 2) is None
+    finally:
+        del os.environ["SENTIMENT_STATE_PATH"]
+        os.rmdir(directory)
+
+
+def test_wire_post_round_trips_through_a_service():
+    import threading
+    from werkzeug.serving import make_server
+    from common import wire
+    from sentiment.app import app
+
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/analyze"
+        payload = {"summaries": [{"title": f"t{i}", "summary": "A terrible loss."} for i in range(200)]}
+        for fmt in wire.available_formats():
+            for encoding in (None,) + wire.available_encodings():
+                out = wire.post(url, payload, fmt=fmt, encoding=encoding)
+                assert out["mood"] == "negative"
+    finally:
+        server.shutdown()
+
+
+def test_ready_probe_waits_for_warm_up():
+    from flask import Flask
+
+    from common import readiness
+
+    app = Flask(__name__)
+    calls = []
+    state = readiness.instrument_app(app, "probe-test", lambda: calls.append(1))
+    client = app.test_client()
+    # Not warm yet: the probe answers 503 and kicks off the warm-up in the background
+    first = client.get("/ready")
+    assert first.status_code == 503 and first.get_json()["ready"] is False
+    assert state.warm_up() and calls == [1]
+    body = client.get("/ready").get_json()
+    assert body["ready"] and body["startup_seconds"] >= body["warm_up_seconds"] >= 0
+
+    failing = Flask(__name__)
+    state = readiness.instrument_app(failing, "probe-fail", lambda: 1 / 0)
+    assert not state.warm_up()
+    resp = failing.test_client().get("/ready")
+    assert resp.status_code == 503 and "ZeroDivisionError" in resp.get_json()["error"]
+
+
+def test_env_settings_fall_back_and_clamp(monkeypatch):
+    from common import config
+
+    monkeypatch.setenv("SOME_INT", "12")
+    monkeypatch.setenv("SOME_FLOAT", "oops")
+    monkeypatch.setenv("SOME_FLAG", "Yes")
+    assert config.env_int("SOME_INT", 3, high=10) == 10
+    assert config.env_int("UNSET_INT", 3) == 3
+    assert config.env_float("SOME_FLOAT", 0.5) == 0.5
+    assert config.env_flag("SOME_FLAG") is True
+    assert config.env_flag("UNSET_FLAG", True) is True
+    assert config.to_int("7.9", 1, 1, 100) == 7
+    assert config.to_int(None, 5, 1, 100) == 5
@@ -0,0 +1,94 @@
+import asyncio
+import contextlib
+import time
+
+import coordinator
+
+
+def _fake_post(delays, in_flight=None):
+    def post(url, payload, timeout=10):
+        if url.endswith("/collect"):
+            time.sleep(delays.get("collect", 0))
+            topic = payload["topic"]
+            return [{"title": f"{topic}-{i}", "description": "great news" if topic == "up" else "terrible news"}
+                    for i in range(3)]
+        if url.endswith("/summarize"):
+            with in_flight or contextlib.nullcontext():
+                time.sleep(delays.get("summarize", 0))
+            return [{"title": a["title"], "summary": a["description"]} for a in payload["articles"]]
+        if url.endswith("/analyze"):
+            return {"sentiments": [{"title": s["title"], "polarity": 0.8 if "great" in s["summary"] else -1.0}
+                                   for s in payload["summaries"]]}
+        return None
+    return post
+
+
+def test_async_orchestrator_multi_topic(monkeypatch, in_flight):
+    monkeypatch.setattr(coordinator, "post", _fake_post({"summarize": 0.1}, in_flight))
+    report = asyncio.run(coordinator.orchestrate(
+        ["up", "down"], "http://c", "http://s", "http://a", summarize_workers=6, queue_size=2))
+
+    assert report["topics"]["up"]["mood"] == "positive"
+    assert report["topics"]["up"]["scored"] == 3
+    assert report["topics"]["down"]["mood"] == "negative"
+    assert report["topics"]["down"]["average_polarity"] == -1.0
+    assert report["stages"]["summarize"]["calls"] == 6
+    # 6 per-article summarize calls overlap instead of running back to back
+    assert in_flight.calls == 6 and in_flight.peak > 1
+
+
+def test_async_orchestrator_collect_failure(monkeypatch):
+    monkeypatch.setattr(coordinator, "post", lambda url, payload, timeout=10: None)
+    report = asyncio.run(coordinator.orchestrate(["ai"], "http://c", "http://s", "http://a"))
+    assert report["topics"]["ai"]["ok"] is False
+    assert report["stages"]["summarize"]["calls"] == 0
+
+
+def _counting_post(calls):
+    inner = _fake_post({})
+
+    def post(url, payload, timeout=10):
+        key = url.rsplit("/", 1)[-1]
+        calls[key] = calls.get(key, 0) + len(payload.get("articles") or payload.get("summaries") or [None])
+        return inner(url, payload, timeout)
+    return post
+
+
+def test_store_skips_unchanged_articles(monkeypatch, tmp_path):
+    from common.articlestore import ArticleStore
+
+    store = ArticleStore(str(tmp_path / "articles.db"))
+    calls = {}
+    monkeypatch.setattr(coordinator, "post", _counting_post(calls))
+    assert coordinator.run_pipeline("up", "http://c", "http://s", "http://a", store=store) == 0
+    assert calls == {"collect": 1, "summarize": 3, "analyze": 3}
+
+    # Second poll returns the same articles: nothing new is summarized or scored
+    report = asyncio.run(coordinator.orchestrate(["up"], "http://c", "http://s", "http://a", store=store))
+    assert calls == {"collect": 2, "summarize": 3, "analyze": 3}
+    assert report["topics"]["up"]["reused"] == 3
+    assert report["topics"]["up"]["mood"] == "positive"
+
+
+def test_near_duplicates_summarized_once(monkeypatch):
+    story = "great news: the regional rail line reopened ahead of schedule after months of repairs"
+    collected = [{"title": f"Rail line reopens - {src}", "description": story, "source_url": f"https://{src}/x"}
+                 for src in ("ap", "bbc", "cnn")]
+    calls = {}
+    inner = _counting_post(calls)
+
+    def post(url, payload, timeout=10):
+        if url.endswith("/collect"):
+            calls["collect"] = calls.get("collect", 0) + 1
+            return collected
+        return inner(url, payload, timeout)
+
+    monkeypatch.setattr(coordinator, "post", post)
+    report = asyncio.run(coordinator.orchestrate(["up"], "http://c", "http://s", "http://a", near_duplicates=True))
+    assert calls["summarize"] == 1
+    assert report["topics"]["up"]["near_duplicates"] == 2
+    assert report["topics"]["up"]["scored"] == 3
+
+    calls.clear()
+    assert coordinator.run_pipeline("up", "http://c", "http://s", "http://a", near_duplicates=True) == 0
+    assert calls == {"collect": 1, "summarize": 1, "analyze": 3}
@@ -0,0 +1,60 @@
+import json
+
+import ui_dashboard
+
+
+class _FakeResp:
+    def __init__(self, data=None, lines=()):
+        self._data = data
+        self._lines = lines
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._data
+
+    def iter_lines(self):
+        return iter(self._lines)
+
+
+def _fake_post(url, **kwargs):
+    payload = kwargs["json"]
+    if url.endswith("/collect"):
+        return _FakeResp([{"title": f"a{i}", "description": "good" if i else "bad"} for i in range(3)])
+    if url.endswith("/summarize/stream"):
+        # Completion order differs from request order
+        items = [{"index": i, "title": a["title"], "summary": a["description"]}
+                 for i, a in reversed(list(enumerate(payload["articles"])))]
+        return _FakeResp(lines=[json.dumps(item).encode() for item in items])
+    if url.endswith("/analyze"):
+        s = payload["summaries"][0]
+        return _FakeResp({"sentiments": [{"title": s["title"], "polarity": 0.7 if s["summary"] == "good" else -0.4}]})
+    raise AssertionError(url)
+
+
+def test_pipeline_streams_server_sent_events(monkeypatch):
+    monkeypatch.setattr(ui_dashboard.httpclient, "post", _fake_post)
+    resp = ui_dashboard.app.test_client().get("/pipeline?topic=ai")
+    assert resp.mimetype == "text/event-stream"
+
+    events = []
+    for block in resp.get_data(as_text=True).strip().split("\n\n"):
+        name, data = block.split("\n")
+        events.append((name[len("event: "):], json.loads(data[len("data: "):])))
+
+    names = [name for name, _ in events]
+    assert names[0] == "collected" and names[-1] == "done"
+    assert names.count("summary") == 3 and names.count("sentiment") == 3
+    assert [d["index"] for n, d in events if n == "summary"] == [2, 1, 0]
+    done = events[-1][1]
+    assert done["scored"] == 3 and done["average_polarity"] == 0.33 and done["mood"] == "positive"
+
+
+def test_pipeline_reports_collect_failure(monkeypatch):
+    def failing(url, **kwargs):
+        raise ConnectionError("collector down")
+
+    monkeypatch.setattr(ui_dashboard.httpclient, "post", failing)
+    events = list(ui_dashboard.pipeline_events("ai"))
+    assert events == [("error", {"stage": "collect", "message": "collector down"})]
@@ -1,3 +1,5 @@
+import pytest
+
 from sentiment.app import app
 
 
@@ -17,3 +19,244 @@ def test_analyze_positive_text():
     assert resp.status_code == 200
     data = resp.get_json()
     assert data["overall_tone"] in {"positive", "neutral", "negative"}
+
+
+def test_batch_engine_matches_textblob():
+    from textblob import TextBlob
+    from sentiment.engine import TOLERANCE, get_engine
+
+    texts = [
+        "This is great and wonderful.",
+        "Markets fell sharply after a terrible quarter!",
+        "The results were not very good.",
+        "Not a bad outcome :-) (!)",
+        "U.S. regulators said the deal is really not good",
+        "",
+    ]
+    got = get_engine().polarities(texts)
+    expected = [TextBlob(t).sentiment.polarity for t in texts]
+    assert all(abs(a - b) <= TOLERANCE for a, b in zip(got, expected))
+
+
+def test_analyze_engines_agree(monkeypatch):
+    summaries = [{"title": "t1", "summary": "This is great and wonderful."},
+                 {"title": "t2", "summary": "A terrible, awful day."}]
+    client = app.test_client()
+    monkeypatch.setenv("SENTIMENT_ENGINE", "batch")
+    batch = client.post("/analyze", json={"summaries": summaries}).get_json()
+    monkeypatch.setenv("SENTIMENT_ENGINE", "textblob")
+    textblob = client.post("/analyze", json={"summaries": summaries}).get_json()
+    assert batch == textblob
+
+
+def test_analyze_process_pool_matches_inline(monkeypatch):
+    from sentiment import workers
+
+    texts = ["good news", "bad news", "not very good", "great!", "terrible results"] * 20
+    inline = workers.score_polarities(texts)
+    monkeypatch.setenv("SENTIMENT_WORKERS", "2")
+    monkeypatch.setenv("SENTIMENT_POOL_MIN_BATCH", "50")
+    try:
+        assert workers.score(texts) == inline
+        # Never forked from the (threaded) server process
+        assert workers.get_pool(2)._ctx.get_start_method() in ("forkserver", "spawn")
+        # Below the threshold the pool is not used
+        assert workers.score(texts[:3]) == inline[:3]
+        client = app.test_client()
+        summaries = [{"title": str(i), "summary": t} for i, t in enumerate(texts)]
+        data = client.post("/analyze", json={"summaries": summaries}).get_json()
+        assert data["average_polarity"] == round(sum(inline) / len(inline), 2)
+    finally:
+        workers.shutdown_pool()
+
+
+def test_analyze_msgpack_and_gzip_negotiation(monkeypatch):
+    import gzip
+    import pytest
+    msgpack = pytest.importorskip("msgpack")
+
+    monkeypatch.setenv("WIRE_COMPRESS_MIN_BYTES", "0")
+    client = app.test_client()
+    body = gzip.compress(msgpack.packb({"summaries": [{"title": "t", "summary": "A great day."}]}))
+    resp = client.post("/analyze", data=body, headers={
+        "Content-Type": "application/msgpack", "Content-Encoding": "gzip",
+        "Accept": "application/msgpack", "Accept-Encoding": "gzip",
+    })
+    assert resp.status_code == 200
+    assert resp.headers["Content-Type"] == "application/msgpack"
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert msgpack.unpackb(gzip.decompress(resp.data))["mood"] == "positive"
+
+    # Plain JSON clients are unaffected
+    plain = client.post("/analyze", json={"summaries": [{"summary": "A great day."}]})
+    assert plain.headers["Content-Type"] == "application/json"
+    assert plain.get_json()["mood"] == "positive"
+
+
+def test_polarity_cache_skips_rescoring(monkeypatch):
+    from sentiment import app as sentiment_app
+
+    monkeypatch.setenv("SENTIMENT_CACHE_SIZE", "100")
+    scored = []
+    real_score = sentiment_app.workers.score
+
+    def counting_score(texts):
+        scored.extend(texts)
+        return real_score(texts)
+
+    monkeypatch.setattr(sentiment_app.workers, "score", counting_score)
+    client = app.test_client()
+    body = {"summaries": [{"summary": "A great win."}, {"summary": "A sad loss."}, {"summary": "A great win."}],
+            "include_sentiments": True}
+    first = client.post("/analyze", json=body).get_json()
+    second = client.post("/analyze", json=body).get_json()
+    assert scored == ["A great win.", "A sad loss."]
+    assert first == second
+    assert client.get("/").get_json()["cache"]["hits"] == 3
+
+
+def test_topic_mood_is_incremental(monkeypatch):
+    from sentiment.moods import MoodBoard
+
+    board = MoodBoard(half_life=10.0)
+    assert board.update("ai", [b"a", b"b"], [1.0, -0.5], now=0.0) == [1.0, -0.5]
+    assert board.update("ai", [b"a"], [1.0], now=5.0) == []  # already counted
+    assert board.update("ai", [b"c"], [0.0], now=10.0) == [0.0]
+    snap = board.get("ai")
+    assert (snap["count"], snap["min"], snap["max"]) == (3, -0.5, 1.0)
+    assert snap["mean"] == round(0.5 / 3, 4)
+    # Older scores carry half the weight after one half-life
+    assert snap["decayed_mean"] == round((0.5 * 0.5 + 0.0) / (2 * 0.5 + 1), 4)
+
+    monkeypatch.setenv("MOOD_HALF_LIFE", "3600")
+    client = app.test_client()
+    client.post("/analyze", json={"topic": "mood-test", "summaries": [{"summary": "Wonderful, great news."}]})
+    mood = client.get("/mood/mood-test").get_json()
+    assert mood["count"] == 1 and mood["mood"] == "positive"
+    assert client.get("/mood/never-seen").status_code == 404
+
+
+def test_shared_mood_board_is_seen_by_every_process(tmp_path):
+    from sentiment.shared import SharedMoodBoard
+
+    path = str(tmp_path / "state.db")
+    # Two connections to one file stand in for two gunicorn workers
+    first, second = SharedMoodBoard(path, half_life=10.0), SharedMoodBoard(path, half_life=10.0)
+    assert first.update("ai", [b"a", b"b"], [1.0, -0.5], now=0.0) == [1.0, -0.5]
+    assert second.update("ai", [b"a"], [1.0], now=5.0) == []  # already counted by the other worker
+    assert second.update("ai", [b"c"], [0.0], now=10.0) == [0.0]
+    snap = first.get("ai")
+    assert (snap["count"], snap["min"], snap["max"]) == (3, -0.5, 1.0)
+    assert snap["decayed_mean"] == round((0.5 * 0.5 + 0.0) / (2 * 0.5 + 1), 4)
+    assert second.get("nope") is None
+
+    capped = SharedMoodBoard(path, max_topics=2)
+    capped.update("science", [b"x"], [0.1], now=20.0)
+    capped.update("sports", [b"y"], [0.2], now=30.0)
+    assert len(first) == 2 and first.get("ai") is None
+
+
+def test_shared_trends_match_the_in_memory_store(tmp_path):
+    from sentiment.shared import SharedTrendStore
+    from sentiment.trends import TrendStore
+
+    path = str(tmp_path / "state.db")
+    memory = TrendStore(bucket_seconds=600, retention=86400 * 2)
+    workers = [SharedTrendStore(path, bucket_seconds=600, retention=86400 * 2) for _ in range(2)]
+    day = 86400.0
+    for i, minute in enumerate(range(0, 25 * 60, 10)):
+        values = [-0.1, -0.2] if minute < 24 * 60 else [0.6, 0.8]
+        memory.add("ai", values, now=day + minute * 60)
+        # Alternate workers, as gunicorn would
+        workers[i % 2].add("ai", values, now=day + minute * 60)
+    for now in (day + 25 * 3600 - 1, 5 * day):
+        assert workers[0].get("ai", now=now) == workers[1].get("ai", now=now) == memory.get("ai", now=now)
+    assert workers[1].add("ai", [0.1], now=0.0) == 0  # older than the retention period
+    assert workers[0].get("never-seen") is None and len(workers[1]) == 1
+
+
+@pytest.mark.integration
+def test_moods_and_trends_are_shared_across_gunicorn_workers():
+    import json
+    import os
+    import socket
+    import subprocess
+    import sys
+    import time
+    import urllib.error
+    import urllib.request
+
+    pytest.importorskip("gunicorn")
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    # No SENTIMENT_STATE_PATH: serving several workers must switch to the shared store by itself
+    env = {k: v for k, v in os.environ.items() if k != "SENTIMENT_STATE_PATH"}
+    env.update(SERVE_BIND=f"127.0.0.1:{port}", SENTIMENT_ENGINE="batch", PYTHONPATH=root)
+    proc = subprocess.Popen([sys.executable, "-m", "common.serve", "sentiment", "--workers", "3"],
+                            cwd=root, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{port}"
+
+    def call(path, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(base + path, data=data, headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(req, timeout=10) as res:
+                return res.status
+        except urllib.error.HTTPError as exc:
+            return exc.code
+
+    try:
+        deadline = time.time() + 30
+        while True:
+            try:
+                if call("/ready") == 200:
+                    break
+            except OSError:
+                pass
+            assert time.time() < deadline, "sentiment service did not start"
+            time.sleep(0.1)
+        assert call("/analyze", {"topic": "ai", "summaries": [{"summary": "Wonderful, great news."}]}) == 200
+        # Each request opens a new connection, so the workers take turns answering
+        assert [call("/mood/ai") for _ in range(30)] == [200] * 30
+        assert [call("/trend/ai") for _ in range(30)] == [200] * 30
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+def test_trend_windows_and_change_point():
+    from sentiment.trends import TrendStore
+
+    store = TrendStore(bucket_seconds=600, retention=86400 * 2)
+    day = 86400.0
+    # A flat, slightly negative day, then a clearly positive last hour
+    for minute in range(0, 24 * 60, 10):
+        store.add("ai", [-0.1, -0.2], now=day + minute * 60)
+    for minute in range(0, 60, 10):
+        store.add("ai", [0.6, 0.8], now=2 * day + minute * 60)
+    trend = store.get("ai", now=2 * day + 3599)
+    assert trend["windows"]["1h"] == {"count": 12, "mean": 0.7, "std": 0.1}
+    assert trend["windows"]["24h"]["count"] == 288  # the first hour of the flat day has rolled out
+    assert trend["change_point"]["flag"] and trend["change_point"]["z"] > 0
+    assert 0.0 < trend["ewma"] < 0.7
+    # Data older than the retention period no longer counts
+    assert store.get("ai", now=5 * day)["windows"]["7d"]["count"] == 0
+    store.add("ai", [0.5], now=5 * day)
+    assert store.get("ai", now=5 * day)["windows"]["7d"]["count"] == 1
+    assert store.memory_bytes() == 20 * store.buckets
+
+    client = app.test_client()
+    client.post("/analyze", json={"topic": "trend-test", "summaries": [{"summary": "Terrible, awful news."}]})
+    trend = client.get("/trend/trend-test").get_json()
+    assert trend["topic"] == "trend-test" and trend["windows"]["1h"]["count"] == 1
+    assert client.get("/trend/never-seen").status_code == 404
+
+
+def test_analyze_rejects_too_many_summaries(monkeypatch):
+    monkeypatch.setenv("ANALYZE_MAX_SUMMARIES", "3")
+    client = app.test_client()
+    resp = client.post("/analyze", json={"summaries": [{"summary": "ok"}] * 4})
+    assert resp.status_code == 413 and "at most 3 summaries" in resp.get_json()["error"]
+    assert client.post("/analyze", json={"summaries": [{"summary": "ok"}] * 3}).status_code == 200
@@ -1,5 +1,6 @@
 from unittest.mock import patch
 from summarizer.app import app
+from benchmarks.stubs import read_body, send_json
 
 
 def test_summarize_no_articles():
@@ -9,7 +10,7 @@ def test_summarize_no_articles():
     assert resp.get_json() == []
 
 
-@patch("summarizer.app.requests.post")
+@patch("summarizer.backends.httpclient.post")
 def test_summarize_and_forward_to_sentiment(mock_post, monkeypatch):
     # First call: LLM summary
     class MockResp:
@@ -46,3 +47,631 @@ def test_summarize_and_forward_to_sentiment(mock_post, monkeypatch):
     data = resp.get_json()
     assert isinstance(data, dict)
     assert data.get("overall_tone") in {"positive", "neutral", "negative"}
+
+
+def _slow_llm(stub_server, delay, in_flight):
+    import json
+    import time
+
+    def handle(request):
+        body = json.loads(read_body(request))
+        with in_flight:
+            time.sleep(delay)
+        send_json(request, {"summary": "S:" + body["prompt"]})
+
+    server, url = stub_server(handle)
+    return url + "/api/generate"
+
+
+def test_summarize_concurrent_fan_out_keeps_order(monkeypatch, stub_server, in_flight):
+    monkeypatch.setenv("LOCAL_LLM_API_URL", _slow_llm(stub_server, 0.3, in_flight))
+    monkeypatch.setenv("LLM_MAX_CONCURRENCY", "4")
+    monkeypatch.setenv("SUMMARY_CACHE_SIZE", "0")
+    articles = [{"title": f"t{i}", "description": f"desc{i}"} for i in range(8)]
+
+    client = app.test_client()
+    resp = client.post("/summarize", json={"articles": articles})
+
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert [x["title"] for x in data] == [a["title"] for a in articles]
+    assert [x["summary"] for x in data] == [f"S:Summarize this: desc{i}" for i in range(8)]
+    # 8 articles at concurrency 4 -> 4 calls in flight at a time instead of 1
+    assert in_flight.calls == 8 and in_flight.peak == 4
+
+
+@patch("summarizer.backends.httpclient.post", side_effect=Exception("boom"))
+def test_summarize_fallback_per_article(mock_post, monkeypatch):
+    monkeypatch.setenv("LLM_BREAKER", "0")
+    monkeypatch.setenv("LLM_MAX_CONCURRENCY", "2")
+    client = app.test_client()
+    resp = client.post("/summarize", json={"articles": [
+        {"title": "t1", "description": "x" * 150},
+        {"title": "t2", "description": "short"},
+    ]})
+    data = resp.get_json()
+    assert data[0]["summary"] == "x" * 100
+    assert data[1]["summary"] == "short"
+
+
+def test_summary_cache_hit_skips_llm(monkeypatch):
+    monkeypatch.setenv("LLM_BREAKER", "0")
+    class MockResp:
+        status_code = 200
+        text = ""
+
+        def json(self):
+            return {"summary": "cached summary"}
+
+    monkeypatch.setenv("SUMMARY_CACHE_SIZE", "16")
+    monkeypatch.setenv("LLM_MAX_CONCURRENCY", "1")
+    with patch("summarizer.backends.httpclient.post", return_value=MockResp()) as mock_post:
+        client = app.test_client()
+        body = {"articles": [{"title": "t1", "description": "cache me once"}]}
+        first = client.post("/summarize", json=body).get_json()
+        second = client.post("/summarize", json=body).get_json()
+
+    assert mock_post.call_count == 1
+    assert first == second
+    assert second[0]["summary"] == "cached summary"
+    stats = client.get("/").get_json()["cache"]
+    assert stats["hits"] >= 1
+
+
+def test_summary_cache_lru_ttl_and_disk(tmp_path):
+    from summarizer.cache import SummaryCache, cache_key
+
+    cache = SummaryCache(max_entries=2, ttl=60)
+    for i in range(3):
+        cache.put(cache_key("m", f"p{i}"), {"summary": i})
+    assert cache.get(cache_key("m", "p0")) is None
+    assert cache.get(cache_key("m", "p2")) == {"summary": 2}
+    assert cache_key("m1", "p") != cache_key("m2", "p")
+
+    expired = SummaryCache(ttl=-1)
+    expired.put("k", {"summary": "old"})
+    assert expired.get("k") is None
+
+    path = str(tmp_path / "summaries.db")
+    SummaryCache(path=path).put("k", {"summary": "disk"})
+    assert SummaryCache(path=path).get("k") == {"summary": "disk"}
+
+    # Writes prune expired rows and cap the file at max_rows
+    stale = SummaryCache(ttl=-1, path=path)
+    stale.put("gone", {"summary": "expired"})
+    capped = SummaryCache(max_entries=1, path=path, max_rows=3, prune_every=1)
+    for i in range(5):
+        capped.put(f"k{i}", {"summary": i})
+    keys = [row[0] for row in capped._db.execute("SELECT key FROM summaries ORDER BY expires_at")]
+    assert keys == ["k2", "k3", "k4"]
+
+
+def test_warm_up_leaves_the_cache_to_each_worker(monkeypatch, tmp_path):
+    import summarizer.app as summarizer_app
+
+    monkeypatch.setenv("LLM_BACKEND", "extractive")
+    monkeypatch.setenv("SUMMARY_CACHE_PATH", str(tmp_path / "summaries.db"))
+    monkeypatch.setenv("SUMMARY_JOBS_PATH", str(tmp_path / "jobs.db"))
+    monkeypatch.setattr(summarizer_app, "_jobs_recovered", False)
+    summarizer_app._warm_up()
+    assert summarizer_app._cache is None
+
+    parent = summarizer_app._get_cache()
+    assert summarizer_app._get_cache() is parent
+    # A forked worker (different pid) opens its own connection
+    monkeypatch.setattr(summarizer_app.os, "getpid", lambda: -1)
+    assert summarizer_app._get_cache() is not parent
+
+
+def _ndjson_llm(stub_server, gates):
+    import json
+
+    def handle(request):
+        text = json.loads(read_body(request))["prompt"].split(": ", 1)[1]
+        # Hold this prompt's answer until the test opens its gate
+        if text in gates and not gates[text].wait(5):
+            text = "gate timed out"
+        # No Content-Length: the stream ends when the (HTTP/1.0) connection closes
+        request.send_response(200)
+        request.send_header("Content-Type", "application/x-ndjson")
+        request.end_headers()
+        for token in ["sum", "mary ", text]:
+            request.wfile.write((json.dumps({"response": token, "done": False}) + "\n").encode())
+            request.wfile.flush()
+        request.wfile.write((json.dumps({"response": "", "done": True}) + "\n").encode())
+
+    server, url = stub_server(handle)
+    return url + "/api/generate"
+
+
+def test_summarize_aggregates_ndjson_stream(monkeypatch, stub_server):
+    monkeypatch.setenv("LOCAL_LLM_API_URL", _ndjson_llm(stub_server, {}))
+    monkeypatch.setenv("SUMMARY_CACHE_SIZE", "0")
+    client = app.test_client()
+    resp = client.post("/summarize", json={"articles": [{"title": "t1", "description": "ndjson"}]})
+    data = resp.get_json()
+    assert data[0]["summary"] == "summary ndjson"
+    assert data[0]["llm_output"]["done"] is True
+
+
+def test_summarize_stream_emits_results_as_completed(monkeypatch, stub_server):
+    import json
+    import threading
+
+    release = threading.Event()
+    monkeypatch.setenv("LOCAL_LLM_API_URL", _ndjson_llm(stub_server, {"slow": release}))
+    monkeypatch.setenv("SUMMARY_CACHE_SIZE", "0")
+    monkeypatch.setenv("LLM_MAX_CONCURRENCY", "2")
+    client = app.test_client()
+    resp = client.post("/summarize/stream", json={"articles": [
+        {"title": "t-slow", "description": "slow"},
+        {"title": "t-fast", "description": "fast"},
+    ]}, buffered=False)
+    assert resp.mimetype == "application/x-ndjson"
+    chunks = iter(resp.response)
+    first = json.loads(next(chunks))
+    # The slow answer is only released once the fast one has reached the client
+    release.set()
+    rest = [json.loads(line) for line in b"".join(chunks).splitlines() if line.strip()]
+
+    assert first["title"] == "t-fast" and first["index"] == 1
+    assert first["summary"] == "summary fast"
+    assert [r["index"] for r in rest] == [0]
+    assert rest[0]["summary"] == "summary slow"
+
+
+@patch("summarizer.backends.httpclient.post", side_effect=Exception("boom"))
+def test_metrics_endpoint_counts_llm_fallbacks(mock_post, monkeypatch):
+    monkeypatch.setenv("LLM_BREAKER", "0")
+    monkeypatch.setenv("SUMMARY_CACHE_SIZE", "0")
+    from summarizer.app import LLM_FALLBACKS
+
+    before = LLM_FALLBACKS.value(reason="error")
+    client = app.test_client()
+    client.post("/summarize", json={"articles": [{"title": "t", "description": "metrics"}]})
+    assert LLM_FALLBACKS.value(reason="error") == before + 1
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    text = resp.get_data(as_text=True)
+    assert 'llm_requests_total{outcome="error"}' in text
+    assert 'http_request_duration_seconds_count{service="summarizer",method="POST",route="/summarize",status="200"}' in text
+
+
+def test_batched_prompting_with_per_article_fallback(monkeypatch):
+    monkeypatch.setenv("LLM_BREAKER", "0")
+    import json
+    import re
+
+    prompts = []
+
+    class MockResp:
+        status_code = 200
+
+        def __init__(self, text):
+            self.text = text
+
+        def json(self):
+            return {"response": self.text}
+
+    def fake_post(url, **kwargs):
+        prompt = kwargs["json"]["prompt"]
+        prompts.append(prompt)
+        if prompt.startswith("Summarize this:"):
+            return MockResp("single " + prompt.split(": ", 1)[1])
+        items = re.findall(r"^(\d+)\. (\S+):", prompt, re.M)
+        # The model "forgets" any item titled skip-me
+        answer = [{"id": int(n), "summary": f"batched {title}"} for n, title in items if title != "skip-me"]
+        return MockResp("```json\n" + json.dumps(answer) + "\n```")
+
+    monkeypatch.setenv("SUMMARY_CACHE_SIZE", "0")
+    monkeypatch.setenv("LLM_BATCH_SIZE", "4")
+    monkeypatch.setenv("LLM_MAX_CONCURRENCY", "1")
+    titles = ["a", "b", "skip-me", "d", "e", "f", "g", "h"]
+    articles = [{"title": t, "description": f"desc-{t}"} for t in titles]
+    with patch("summarizer.backends.httpclient.post", side_effect=fake_post):
+        data = app.test_client().post("/summarize", json={"articles": articles}).get_json()
+
+    assert [x["title"] for x in data] == titles
+    assert data[0]["summary"] == "batched a"
+    assert data[2]["summary"] == "single desc-skip-me"
+    # 2 batched prompts + 1 per-article retry instead of 8 calls
+    assert len(prompts) == 3
+    # Each batched article keeps its own slice of the raw answer, not the whole batch
+    assert data[1]["llm_output"] == {"batch": {"id": 2, "items": 4}, "item": {"id": 2, "summary": "batched b"}}
+    assert data[2]["llm_output"] == {"response": "single desc-skip-me"}
+
+
+def test_plan_batches_respects_token_budget():
+    from summarizer.app import _plan_batches
+
+    articles = [{"title": "t", "description": "x" * 400}] * 5  # ~100 tokens each
+    batches = _plan_batches(articles, size=10, max_tokens=300)
+    assert all(len(b) <= 2 for b in batches)
+    assert [i for b in batches for i in b] == list(range(5))
+
+
+class _FakeLLMResponse:
+    status_code = 200
+
+    def __init__(self, text):
+        self.text = text
+
+    def json(self):
+        import json
+        return json.loads(self.text)
+
+    def iter_lines(self):
+        return iter(self.text.splitlines())
+
+
+def test_backends_build_and_parse():
+    import json
+    from summarizer.backends import OllamaChatBackend, OllamaGenerateBackend, OpenAICompletionsBackend
+
+    gen = OllamaGenerateBackend(model="llama2")
+    assert gen.build_payload("p", stream=False) == {"model": "llama2", "prompt": "p", "stream": False}
+    ndjson = "\n".join(json.dumps({"response": t, "done": t == "!"}) for t in ["Hi", " there", "!"])
+    assert gen.parse(_FakeLLMResponse(ndjson), stream=True)[0] == "Hi there!"
+
+    chat = OllamaChatBackend(model="llama2")
+    assert chat.build_payload("p", stream=True)["messages"] == [{"role": "user", "content": "p"}]
+    answer = json.dumps({"message": {"role": "assistant", "content": "chat summary"}, "done": True})
+    assert chat.parse(_FakeLLMResponse(answer), stream=False)[0] == "chat summary"
+
+    openai = OpenAICompletionsBackend(model="m")
+    sse = "\n".join(["data: " + json.dumps({"choices": [{"text": t}]}) for t in ["a", "b"]] + ["data: [DONE]"])
+    assert openai.parse(_FakeLLMResponse(sse), stream=True)[0] == "ab"
+    assert openai.parse(_FakeLLMResponse(json.dumps({"choices": [{"text": "c"}]})), stream=False)[0] == "c"
+
+
+def test_extractive_backend_end_to_end(monkeypatch):
+    monkeypatch.setenv("LLM_BACKEND", "extractive")
+    monkeypatch.setenv("SUMMARY_CACHE_SIZE", "0")
+    monkeypatch.setenv("LLM_BATCH_SIZE", "3")
+    article = {"title": "t", "description": "Chips are scarce. Chip makers expand chip plants. Weather was mild."}
+    client = app.test_client()
+    first = client.post("/summarize", json={"articles": [article] * 4}).get_json()
+    second = client.post("/summarize", json={"articles": [article]}).get_json()
+    assert first[0]["summary"] == "Chips are scarce. Chip makers expand chip plants."
+    assert all(x["summary"] == first[0]["summary"] for x in first + second)
+
+
+def test_unknown_backend_is_rejected(monkeypatch):
+    import pytest
+    from summarizer.backends import get_backend
+
+    monkeypatch.setenv("LLM_BACKEND", "nope")
+    with pytest.raises(ValueError):
+        get_backend()
+
+
+def test_circuit_breaker_states_and_adaptive_timeout():
+    import time
+    from summarizer.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+    breaker = CircuitBreaker(window=10, min_calls=4, error_rate=0.5, cooldown=0.05,
+                             min_timeout=0.1, max_timeout=10, timeout_factor=2)
+    assert breaker.timeout() == 10
+    for _ in range(4):
+        breaker.record(0.2, True)
+    assert breaker.timeout() == 0.4
+    # Short and long prompts keep separate latency windows
+    for _ in range(4):
+        breaker.record(0.2, True, tokens=50)
+        breaker.record(3.0, True, tokens=3000)
+    assert breaker.timeout(40) == 0.4
+    assert breaker.timeout(2500) == 6.0
+    assert breaker.timeout(200) == 10  # no samples for this size yet
+    for _ in range(8):
+        breaker.record(0.01, False)
+    assert breaker.state == OPEN
+    assert breaker.allow() is False
+
+    time.sleep(0.06)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() is True
+    assert breaker.allow() is False  # only one probe at a time
+    breaker.record(0.2, True)
+    assert breaker.state == CLOSED
+
+
+def test_circuit_breaker_recovers_after_latency_step_up():
+    import time
+    from summarizer.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+    breaker = CircuitBreaker(window=20, min_calls=5, error_rate=0.5, cooldown=0.05,
+                             min_timeout=0.5, max_timeout=10, timeout_factor=2.5)
+    for _ in range(20):
+        breaker.record(0.4, True, tokens=100)
+    assert breaker.timeout(100) == 1.0
+    # The LLM now takes 3s: every call times out at the old p95 and the breaker trips
+    for _ in range(20):
+        if breaker.state == OPEN:
+            break
+        breaker.record(breaker.timeout(100), False, tokens=100)
+    assert breaker.state == OPEN
+
+    time.sleep(0.06)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() is True
+    assert breaker.timeout(100) == 10  # the probe is not held to the stale 1s timeout
+    breaker.record(3.0, True, tokens=100)
+    assert breaker.state == CLOSED
+    # The old fast samples are gone; the timeout adapts to the new latency
+    assert breaker.timeout(100) == 10
+    for _ in range(5):
+        breaker.record(3.0, True, tokens=100)
+    assert breaker.timeout(100) == 7.5
+
+
+def test_open_breaker_sheds_to_extractive_fallback(monkeypatch):
+    import time
+
+    calls = []
+
+    class ErrorResp:
+        status_code = 503
+        text = "overloaded"
+
+    def failing_post(url, **kwargs):
+        calls.append(url)
+        time.sleep(0.05)
+        return ErrorResp()
+
+    monkeypatch.setenv("LOCAL_LLM_API_URL", "http://breaker-test/api/generate")
+    monkeypatch.setenv("SUMMARY_CACHE_SIZE", "0")
+    monkeypatch.setenv("LLM_MAX_CONCURRENCY", "1")
+    monkeypatch.setenv("LLM_BREAKER_MIN_CALLS", "3")
+    monkeypatch.setenv("LLM_BREAKER_COOLDOWN", "60")
+    articles = [{"title": f"t{i}", "description": f"Story {i} happened. It was big."} for i in range(3)]
+    client = app.test_client()
+    with patch("summarizer.backends.httpclient.post", side_effect=failing_post):
+        client.post("/summarize", json={"articles": articles})
+        assert len(calls) == 3
+        data = client.post("/summarize", json={"articles": articles}).get_json()
+
+    assert len(calls) == 3  # no further LLM calls while open
+    from summarizer.backends import ExtractiveBackend
+    assert data[0]["summary"] == ExtractiveBackend().summarize_text(articles[0]["description"])
+    assert client.get("/").get_json()["llm_breaker"]["state"] == "open"
+
+
+def test_job_api_runs_in_background(monkeypatch, tmp_path):
+    import time
+
+    monkeypatch.setenv("LLM_BACKEND", "extractive")
+    monkeypatch.setenv("SUMMARY_CACHE_SIZE", "0")
+    monkeypatch.setenv("SUMMARY_JOBS_PATH", str(tmp_path / "jobs.db"))
+    monkeypatch.setenv("JOB_WORKERS", "2")
+    articles = [{"title": f"t{i}", "description": f"Story {i} happened. It was big."} for i in range(5)]
+    client = app.test_client()
+
+    res = client.post("/jobs", json={"articles": articles, "priority": 5})
+    assert res.status_code == 202
+    job_id = res.get_json()["id"]
+    deadline = time.time() + 5
+    while (job := client.get(f"/jobs/{job_id}").get_json())["status"] != "done":
+        assert time.time() < deadline
+        time.sleep(0.02)
+
+    assert job["completed"] == job["total"] == 5
+    assert [r["index"] for r in job["results"]] == list(range(5))
+    from summarizer.backends import ExtractiveBackend
+    assert job["results"][3]["summary"] == ExtractiveBackend().summarize_text(articles[3]["description"])
+    assert client.get("/jobs/nope").status_code == 404
+    assert client.post("/jobs", json={"articles": "x"}).status_code == 400
+
+
+def test_serving_worker_runs_pending_jobs_without_a_jobs_call(monkeypatch, tmp_path):
+    import time
+    from common import serve
+    from summarizer.jobs import JobQueue
+
+    monkeypatch.setenv("LLM_BACKEND", "extractive")
+    monkeypatch.setenv("SUMMARY_CACHE_SIZE", "0")
+    monkeypatch.setenv("SUMMARY_JOBS_PATH", str(tmp_path / "jobs.db"))
+    # Left in the queue by a previous server process
+    queue = JobQueue(str(tmp_path / "jobs.db"), None)
+    job_id = queue.submit([{"title": "t", "description": "Story happened. It was big."}])
+
+    serve.load("summarizer")
+    serve.run_hook("summarizer", "post_fork")  # what each gunicorn worker runs after forking
+    deadline = time.time() + 5
+    while queue.get(job_id)["status"] != "done":
+        assert time.time() < deadline, "pending job never ran"
+        time.sleep(0.02)
+    queue.stop()
+
+
+def test_job_queue_priority_and_restart_recovery(tmp_path):
+    from summarizer.jobs import JobQueue
+
+    path = str(tmp_path / "jobs.db")
+    seen = []
+
+    def process(article):
+        seen.append(article["title"])
+        return {"summary": article["title"].upper()}
+
+    queue = JobQueue(path, process)
+    low = queue.submit([{"title": "low"}], priority=0)
+    high = queue.submit([{"title": "high-a"}, {"title": "high-b"}], priority=9)
+    assert queue.run_once()
+    assert seen == ["high-a"]
+    assert queue.get(high)["status"] == "running"
+    assert queue.get(high)["results"] == [{"index": 0, "summary": "HIGH-A"}]
+    # Simulate a crash while the next article is in flight
+    assert queue._claim()[:2] == (high, 1)
+    queue._db.close()
+
+    restarted = JobQueue(path, process)
+    while restarted.run_once():
+        pass
+    assert seen == ["high-a", "high-b", "low"]
+    assert restarted.get(high)["status"] == restarted.get(low)["status"] == "done"
+
+
+def test_job_queue_shared_by_processes_claims_each_article_once(tmp_path):
+    from summarizer.jobs import JobQueue
+
+    path = str(tmp_path / "jobs.db")
+    first = JobQueue(path, lambda a: {"summary": "first"})
+    second = JobQueue(path, lambda a: {"summary": "second"}, recover=False)
+    job = first.submit([{"title": str(i)} for i in range(6)])
+    assert first._claim()[1] == 0
+    assert second._claim()[1] == 1
+    # A late-starting sibling must not requeue work another worker holds
+    JobQueue(path, lambda a: {}, recover=False)
+    assert first.get(job)["counts"]["running"] == 2
+
+
+def test_slim_mode_omits_llm_output(monkeypatch):
+    monkeypatch.setenv("LLM_BACKEND", "extractive")
+    monkeypatch.setenv("SUMMARY_CACHE_SIZE", "0")
+    monkeypatch.setenv("INCLUDE_LLM_OUTPUT", "1")
+    article = {"title": "t", "description": "Short story. It ends."}
+    client = app.test_client()
+    full = client.post("/summarize", json={"articles": [article]}).get_json()
+    slim = client.post("/summarize", json={"articles": [article], "include_llm_output": False}).get_json()
+    assert "llm_output" in full[0]
+    assert "llm_output" not in slim[0] and slim[0]["summary"] == full[0]["summary"]
+
+
+def test_long_article_is_map_reduced_concurrently(monkeypatch, in_flight):
+    import threading
+    import time
+
+    import summarizer.app as summarizer_app
+
+    prompts = []
+    lock = threading.Lock()
+
+    class FakeBackend:
+        name = "fake"
+        url = None
+        cache_id = "fake"
+
+        def generate(self, prompt, stream=False, timeout=None):
+            with lock:
+                prompts.append(prompt)
+            with in_flight:
+                time.sleep(0.05)
+            return " ".join(prompt.split(": ", 1)[1].split()[:3]).rstrip(".") + ".", None
+
+    monkeypatch.setattr(summarizer_app, "get_backend", FakeBackend)
+    monkeypatch.setenv("SUMMARY_CACHE_SIZE", "0")
+    monkeypatch.setenv("SUMMARIZE_CHUNK_TOKENS", "50")
+    monkeypatch.setenv("SUMMARIZE_CHUNK_CONCURRENCY", "8")
+    monkeypatch.setenv("LLM_MAX_CONCURRENCY", "8")
+    sentences = [f"Sentence number {i} talks about markets and energy policy today." for i in range(24)]
+    assert len(summarizer_app._split_text(" ".join(sentences), 50)) == 8
+
+    client = app.test_client()
+    resp = client.post("/summarize", json={"articles": [{"title": "long", "description": " ".join(sentences)}]})
+    assert resp.status_code == 200
+    # 8 chunk summaries in parallel, then one summary of the summaries
+    assert len(prompts) == 9
+    assert prompts[-1].startswith("Summarize this: Sentence number 0. Sentence number ")
+    assert resp.get_json()[0]["summary"] == "Sentence number 0."
+    assert in_flight.peak > 1
+
+    # Two long articles fan out into nested pools, but LLM_MAX_CONCURRENCY bounds the calls in flight
+    monkeypatch.setenv("LLM_MAX_CONCURRENCY", "2")
+    in_flight.peak = 0
+    long_article = {"title": "long", "description": " ".join(sentences)}
+    resp = client.post("/summarize", json={"articles": [long_article, dict(long_article, title="again")]})
+    assert resp.status_code == 200 and len(resp.get_json()) == 2
+    assert in_flight.peak == 2
+
+
+def test_long_article_skips_reduce_when_every_chunk_fails(monkeypatch):
+    import summarizer.app as summarizer_app
+    from summarizer.backends import LLMHTTPError
+
+    prompts = []
+
+    class FailingBackend:
+        name = "fake"
+        url = None
+        cache_id = "fake"
+
+        def generate(self, prompt, stream=False, timeout=None):
+            prompts.append(prompt)
+            raise LLMHTTPError(503, "overloaded")
+
+    monkeypatch.setattr(summarizer_app, "get_backend", FailingBackend)
+    monkeypatch.setenv("SUMMARY_CACHE_SIZE", "0")
+    monkeypatch.setenv("SUMMARIZE_CHUNK_TOKENS", "50")
+    text = " ".join(f"Sentence number {i} talks about markets and energy policy today." for i in range(9))
+    chunks = summarizer_app._split_text(text, 50)
+
+    resp = app.test_client().post("/summarize", json={"articles": [{"title": "long", "description": text}]})
+    result = resp.get_json()[0]
+    assert len(prompts) == len(chunks)  # no reduce call
+    assert "Summarize this: " not in prompts
+    assert result["summary"] is None and result["llm_output"] == {"status": 503, "body": "overloaded"}
+
+
+def test_long_article_reduces_hierarchically_and_marks_truncation(monkeypatch):
+    import summarizer.app as summarizer_app
+
+    prompts = []
+
+    class EchoBackend:
+        name = "fake"
+        url = None
+        cache_id = "fake"
+
+        def generate(self, prompt, stream=False, timeout=None):
+            # Summaries that do not shrink the text at all
+            prompts.append(prompt)
+            return prompt.split(": ", 1)[1], None
+
+    monkeypatch.setattr(summarizer_app, "get_backend", EchoBackend)
+    monkeypatch.setenv("SUMMARY_CACHE_SIZE", "0")
+    monkeypatch.setenv("SUMMARIZE_CHUNK_TOKENS", "50")
+    monkeypatch.setenv("SUMMARIZE_MAX_DEPTH", "2")
+    client = app.test_client()
+    text = " ".join(f"Sentence number {i} talks about markets and energy policy today." for i in range(9))
+    chunks = summarizer_app._split_text(text, 50)
+    before = summarizer_app.SUMMARY_TRUNCATIONS.value(reason="max_depth")
+
+    result = client.post("/summarize", json={"articles": [{"title": "long", "description": text}]}).get_json()[0]
+    # Two map levels over the same text, then only the first chunk is reduced, and the cut is reported
+    assert len(prompts) == 2 * len(chunks) + 1
+    assert prompts[-1] == f"Summarize this: {chunks[0]}"
+    assert result["summary"] == chunks[0] and result["truncated"] is True
+    assert summarizer_app.SUMMARY_TRUNCATIONS.value(reason="max_depth") == before + 1
+
+    # Summaries that shrink get another level instead of being cut
+    prompts.clear()
+    monkeypatch.setattr(EchoBackend, "generate", lambda self, prompt, stream=False, timeout=None: (
+        prompts.append(prompt) or " ".join(prompt.split(": ", 1)[1].split()[:14]), None))
+    result = client.post("/summarize", json={"articles": [{"title": "long", "description": text}]}).get_json()[0]
+    assert len(prompts) > len(chunks) + 1 and "truncated" not in result
+
+    monkeypatch.setenv("SUMMARIZE_MAX_CHUNKS", "2")
+    result = client.post("/summarize", json={"articles": [{"title": "long", "description": text}]}).get_json()[0]
+    assert result["truncated"] is True
+
+
+def test_oversized_requests_get_413(monkeypatch):
+    monkeypatch.setenv("SUMMARIZE_MAX_ARTICLES", "2")
+    monkeypatch.setenv("MAX_REQUEST_BYTES", "2000")
+    client = app.test_client()
+    articles = [{"title": f"t{i}", "description": "d"} for i in range(3)]
+    resp = client.post("/summarize", json={"articles": articles})
+    assert resp.status_code == 413 and "at most 2 articles" in resp.get_json()["error"]
+    assert client.post("/summarize/stream", json={"articles": articles}).status_code == 413
+    resp = client.post("/summarize", json={"articles": [{"title": "t", "description": "x" * 5000}]})
+    assert resp.status_code == 413
+
+    import gzip
+    import json
+
+    # A small compressed body that inflates past the limit is refused too
+    body = gzip.compress(json.dumps({"articles": [{"title": "t", "description": "x" * 5000}]}).encode())
+    resp = client.post("/summarize", data=body,
+                       headers={"Content-Type": "application/json", "Content-Encoding": "gzip"})
+    assert len(body) < 2000 and resp.status_code == 413
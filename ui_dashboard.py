@@ -5,9 +5,19 @@ Run this alongside the other services to get a clickable interface.
 Usage:
   python ui_dashboard.py
   Then open http://localhost:5000/ui
+
+"Run Full Pipeline" uses the server-side ``GET /pipeline?topic=...`` endpoint:
+the dashboard calls the services itself, scores each summary while the rest
+are still being written, and pushes progress to the page as server-sent
+events, so article and summary payloads never pass through the browser.
 """
-from flask import Flask, render_template_string
+from flask import Flask, Response, render_template_string, request
+import json
 import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from common import httpclient, stats
 
 app = Flask(__name__)
 
@@ -200,6 +210,42 @@ HTML_TEMPLATE = """
             el.classList.add(isError ? 'error' : 'success');
         }
         
+        // POST to the summarizer's NDJSON stream and call onItem as each summary arrives.
+        // Resolves with the summaries in the original article order.
+        async function streamSummaries(articles, onItem) {
+            const resp = await fetch('{{ summarizer_url }}/summarize/stream', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ articles })
+            });
+            if (!resp.ok || !resp.body) {
+                throw new Error('summarizer returned HTTP ' + resp.status);
+            }
+            const reader = resp.body.getReader();
+            const decoder = new TextDecoder();
+            const results = new Array(articles.length);
+            let buffer = '';
+            let done = 0;
+            while (true) {
+                const chunk = await reader.read();
+                if (chunk.done) break;
+                buffer += decoder.decode(chunk.value, { stream: true });
+                let nl;
+                while ((nl = buffer.indexOf('\\n')) >= 0) {
+                    const line = buffer.slice(0, nl).trim();
+                    buffer = buffer.slice(nl + 1);
+                    if (!line) continue;
+                    const item = JSON.parse(line);
+                    const index = item.index;
+                    delete item.index;
+                    results[index] = item;
+                    done += 1;
+                    onItem(item, done, results.filter(Boolean));
+                }
+            }
+            return results.filter(Boolean);
+        }
+
         async function runCollect() {
             const topic = document.getElementById('topic').value;
             showOutput('collectOutput', '⏳ Loading...');
@@ -240,12 +286,10 @@ HTML_TEMPLATE = """
                 return;
             }
             try {
-                const resp = await fetch('{{ summarizer_url }}/summarize', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ articles })
+                // Stream results so each summary shows up as soon as the LLM finishes it
+                const data = await streamSummaries(articles, (item, done, partial) => {
+                    showOutput('summarizeOutput', '⏳ ' + done + '/' + articles.length + ' summarized\\n\\n' + JSON.stringify(partial, null, 2));
                 });
-                const data = await resp.json();
                 lastSummarized = data;
                 // Display as JSON (keeping detail for debugging summarizer)
                 showOutput('summarizeOutput', JSON.stringify(data, null, 2));
@@ -291,37 +335,37 @@ HTML_TEMPLATE = """
             }
         }
         
-        async function runPipeline() {
+        function runPipeline() {
             const topic = document.getElementById('pipelineTopic').value;
             showOutput('pipelineOutput', '📰 Step 1: Collecting articles...');
-            try {
-                const cResp = await fetch('{{ collector_url }}/collect', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ topic })
-                });
-                const articles = await cResp.json();
-                showOutput('pipelineOutput', '📰 Collected ' + articles.length + ' articles\\n✍️ Step 2: Summarizing...');
-                
-                const sResp = await fetch('{{ summarizer_url }}/summarize', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ articles })
-                });
-                const summaries = await sResp.json();
-                
-                showOutput('pipelineOutput', '📰 Collected ' + articles.length + ' articles\\n✍️ Summarized ' + summaries.length + ' articles\\n💭 Step 3: Analyzing sentiment...');
-                const aResp = await fetch('{{ sentiment_url }}/analyze', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ summaries, topic })
-                });
-                const sentimentData = await aResp.json();
-                
-                showOutput('pipelineOutput', '✅ Pipeline Complete!\\n\\n' + sentimentData.message);
-            } catch (e) {
-                showOutput('pipelineOutput', '❌ Error: ' + e.message, true);
-            }
+            // The dashboard server runs the stages and streams progress back as server-sent events
+            const source = new EventSource('/pipeline?topic=' + encodeURIComponent(topic));
+            let total = 0, summarized = 0, scored = 0, latest = '';
+            const progress = () => '📰 Collected ' + total + ' articles\\n✍️ Summarized ' + summarized + '/' + total
+                + (latest ? ' (latest: ' + latest + ')' : '') + '\\n💭 Scored ' + scored + '/' + total;
+            source.addEventListener('collected', (e) => {
+                total = JSON.parse(e.data).count;
+                showOutput('pipelineOutput', progress());
+            });
+            source.addEventListener('summary', (e) => {
+                summarized += 1;
+                latest = JSON.parse(e.data).title;
+                showOutput('pipelineOutput', progress());
+            });
+            source.addEventListener('sentiment', () => {
+                scored += 1;
+                showOutput('pipelineOutput', progress());
+            });
+            source.addEventListener('done', (e) => {
+                source.close();
+                showOutput('pipelineOutput', '✅ Pipeline Complete!\\n\\n' + JSON.parse(e.data).message);
+            });
+            source.addEventListener('error', (e) => {
+                source.close();
+                // Server-reported failures carry data; connection failures do not
+                const message = e.data ? JSON.parse(e.data).stage + ': ' + JSON.parse(e.data).message : 'connection to dashboard lost';
+                showOutput('pipelineOutput', '❌ Error: ' + message, true);
+            });
         }
     </script>
 </body>
@@ -337,6 +381,99 @@ def dashboard():
         sentiment_url=SENTIMENT_URL
     )
 
+def pipeline_events(topic, sentiment_workers=2):
+    """Run collect -> summarize -> analyze for ``topic``, yielding (event, data) progress pairs.
+
+    Summaries are read from the summarizer's NDJSON stream and each one is scored
+    as soon as it arrives, so sentiment overlaps with the remaining LLM calls.
+    Events: collected, summary, sentiment, then done (or error).
+    """
+    try:
+        resp = httpclient.post(f"{COLLECTOR_URL}/collect", json={"topic": topic}, timeout=10)
+        resp.raise_for_status()
+        articles = resp.json()
+    except Exception as e:
+        yield "error", {"stage": "collect", "message": str(e)}
+        return
+    if not isinstance(articles, list):
+        yield "error", {"stage": "collect", "message": "collector did not return a list"}
+        return
+    yield "collected", {"count": len(articles), "titles": [a.get("title") for a in articles]}
+
+    events = queue.Queue()
+
+    def score(index, item):
+        try:
+            r = httpclient.post(f"{SENTIMENT_URL}/analyze",
+                                json={"summaries": [item], "topic": topic, "include_sentiments": True}, timeout=10)
+            r.raise_for_status()
+            polarity = r.json()["sentiments"][0]["polarity"]
+            events.put(("sentiment", {"index": index, "title": item.get("title"), "polarity": polarity}))
+        except Exception as e:
+            events.put(("sentiment_error", {"index": index, "message": str(e)}))
+
+    def read_summaries(pool):
+        try:
+            r = httpclient.post(f"{SUMMARIZER_URL}/summarize/stream", json={"articles": articles, "include_llm_output": False},
+                                timeout=120, stream=True)
+            r.raise_for_status()
+            for line in r.iter_lines():
+                if not line or not line.strip():
+                    continue
+                item = json.loads(line)
+                index = item.pop("index")
+                events.put(("summary", {"index": index, "title": item.get("title"), "summary": item.get("summary")}))
+                pool.submit(score, index, item)
+        except Exception as e:
+            events.put(("error", {"stage": "summarize", "message": str(e)}))
+        finally:
+            # Waits for the scoring calls still in flight before signalling the end
+            pool.shutdown(wait=True)
+            events.put(None)
+
+    pool = ThreadPoolExecutor(max_workers=sentiment_workers)
+    threading.Thread(target=read_summaries, args=(pool,), daemon=True).start()
+    polarities, failed = [], 0
+    while True:
+        event = events.get()
+        if event is None:
+            break
+        name, data = event
+        if name == "sentiment":
+            polarities.append(data["polarity"])
+        elif name == "sentiment_error":
+            failed += 1
+            continue
+        elif name == "error":
+            yield event
+            return
+        yield event
+
+    avg = sum(polarities) / len(polarities) if polarities else 0.0
+    mood = stats.mood(avg)
+    yield "done", {
+        "message": f"News about {topic} is currently: {mood} 📊",
+        "mood": mood,
+        "average_polarity": round(avg, 2),
+        "articles": len(articles),
+        "scored": len(polarities),
+        "errors": failed,
+    }
+
+
+@app.route("/pipeline", methods=["GET"])
+def pipeline():
+    """Server-sent event stream of a full pipeline run (see pipeline_events)."""
+    topic = request.args.get("topic", "technology")
+
+    def generate():
+        for event, data in pipeline_events(topic):
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    return Response(generate(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 @app.route("/health", methods=["GET"])
 def health():
     return {"status": "ok", "service": "ui_dashboard"}